@@ -1,17 +1,29 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
+from uuid import uuid4
+from jose import JWTError
 import bcrypt as bcrypt_lib
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.hashing_pool import HashingPoolFull, hashing_pool
+from app.password_cost import password_cost
+from app.principal_cache import Principal, principal_cache
+from app.read_routing import track_writer
+from app.revocation import revocation_list
+from app.token_keys import token_keys
 from app import models, schemas
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+# `type` claim of refresh tokens; access tokens carry none
+REFRESH_TOKEN_TYPE = "refresh"
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -19,11 +31,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    salt = bcrypt_lib.gensalt()
+    """Hash a password at the current work factor (stored in the hash itself)"""
+    salt = bcrypt_lib.gensalt(password_cost.rounds)
     return bcrypt_lib.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 
+async def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the dedicated hashing pool"""
+    return await _run_on_hashing_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_pooled(password: str) -> str:
+    """Hash a password on the dedicated hashing pool"""
+    return await _run_on_hashing_pool(get_password_hash, password)
+
+
+async def _run_on_hashing_pool(fn, *args):
+    try:
+        return await hashing_pool.run(fn, *args)
+    except HashingPoolFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -32,16 +65,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
+    encoded_jwt = token_keys.encode(to_encode)
     return encoded_jwt
 
 
+def create_refresh_token(user_id: str) -> str:
+    """Create a long-lived, single-use JWT refresh token"""
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {"sub": user_id, "exp": expire, "jti": uuid4().hex, "type": REFRESH_TOKEN_TYPE}
+    return token_keys.encode(to_encode)
+
+
+def create_token_pair(user_id: str) -> dict:
+    """Access and refresh token response for a user"""
+    return {
+        "access_token": create_access_token(data={"sub": user_id}),
+        "refresh_token": create_refresh_token(user_id),
+        "token_type": "bearer"
+    }
+
+
+def decode_token(token: str) -> dict:
+    """Verify a token's signature and expiry with the configured keys; raises JWTError"""
+    return token_keys.decode(token)
+
+
+def decode_refresh_token(token: str) -> dict:
+    """Verify a refresh token and return its claims"""
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        payload = {}
+    if payload.get("type") != REFRESH_TOKEN_TYPE or not payload.get("sub") or not payload.get("jti"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+def token_expiry(payload: dict) -> datetime:
+    """`exp` claim as a naive UTC datetime"""
+    return datetime.fromtimestamp(payload["exp"], timezone.utc).replace(tzinfo=None)
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> models.User:
-    """Get current authenticated user"""
+    """
+    Get current authenticated user.
+    
+    Tokens seen recently are answered from the principal cache without
+    verifying the signature again or querying the users table. Every token,
+    cached or not, is screened by the in-memory revocation filter.
+    """
+    cached = principal_cache.lookup(token)
+    if cached is not None:
+        principal, jti = cached
+        if jti is None or not revocation_list.is_revoked(db, jti):
+            track_writer(db, principal.id)
+            return principal
+        principal_cache.invalidate_token(token)
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,20 +137,47 @@ def get_current_user(
     )
     
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token(token)
         user_id: str = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("type") == REFRESH_TOKEN_TYPE:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
+    jti = payload.get("jti")
+    if jti is not None and revocation_list.is_revoked(db, jti):
+        raise credentials_exception
+    
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if user is None:
         raise credentials_exception
     
+    principal_cache.put(token, Principal.from_user(user), payload.get("exp"), jti)
+    track_writer(db, user.id)
     return user
 
 
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> models.User:
+    """get_current_user for async routes; cache hits only query when the revocation filter needs it"""
+    cached = principal_cache.lookup(token)
+    if cached is not None:
+        principal, jti = cached
+        if jti is None or not await db.run_sync(lambda session: revocation_list.is_revoked(session, jti)):
+            track_writer(db.sync_session, principal.id)
+            return principal
+    return await db.run_sync(lambda session: get_current_user(token, session))
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_cached_principal(mapper, connection, target):
+    """Drop the cached principal whenever a user row changes"""
+    principal_cache.invalidate_user(target.id)
+
+
 def get_current_admin_user(
     current_user: models.User = Depends(get_current_user)
 ) -> models.User:
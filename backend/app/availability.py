@@ -0,0 +1,284 @@
+"""
+Slot availability as per-court, per-day bitmaps
+
+Bit i of an occupancy bitmap is set when slot i of the day's slot template
+overlaps at least one active reservation.
+"""
+from collections import defaultdict
+from datetime import date as date_type, datetime, timedelta
+from functools import lru_cache
+from heapq import nsmallest
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app import interval_rtree, models
+from app.interval_rtree import interval_rtree_enabled
+
+MINUTES_PER_DAY = 24 * 60
+ONE_MINUTE = timedelta(minutes=1)
+
+# Schedule of courts without explicit opening hours
+DEFAULT_OPENING = "12:00"
+DEFAULT_CLOSING = "20:00"
+DEFAULT_SLOT_MINUTES = 60
+
+# Reservation statuses that block a slot
+BLOCKING_STATUSES = [models.ReservationStatus.CONFIRMED, models.ReservationStatus.PENDING]
+
+
+def _format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def parse_minute(value: str) -> int:
+    """Minutes since midnight of an "HH:MM" string ("24:00" is end of day)"""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def day_bounds(day: date_type) -> Tuple[datetime, datetime]:
+    """[start, end) datetimes of a calendar day, for index-friendly range filters"""
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def local_now() -> datetime:
+    """Current naive local wall-clock time, the clock slot and booking times are kept in"""
+    return datetime.now()
+
+
+def _minutes_since(value: datetime, day_start: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return min(max((value - day_start) // ONE_MINUTE, 0), MINUTES_PER_DAY)
+
+
+def minute_of_day(value: datetime, day: date_type) -> int:
+    """Minutes since midnight of `day`, clamped to the day"""
+    day_start, _ = day_bounds(day)
+    return _minutes_since(value, day_start)
+
+
+class SlotTemplate:
+    """Fixed-length slots between an opening and a closing minute of the day"""
+
+    def __init__(self, opening_minute: int, closing_minute: int, slot_minutes: int):
+        if slot_minutes <= 0 or closing_minute <= opening_minute:
+            raise ValueError("Invalid slot template")
+        self.opening_minute = opening_minute
+        self.slot_minutes = slot_minutes
+        count = (closing_minute - opening_minute) // slot_minutes
+        self.closing_minute = opening_minute + count * slot_minutes
+        self.full_mask = (1 << count) - 1
+        self.slots: List[Dict[str, str]] = []
+        for i in range(count):
+            start = _format_minute(opening_minute + i * slot_minutes)
+            end = _format_minute(opening_minute + (i + 1) * slot_minutes)
+            self.slots.append({"start": start, "end": end, "label": f"{start} - {end}"})
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def interval_mask(self, start_minute: int, end_minute: int) -> int:
+        """Bits of every slot overlapping [start_minute, end_minute)"""
+        start = max(start_minute, self.opening_minute) - self.opening_minute
+        end = min(end_minute, self.closing_minute) - self.opening_minute
+        if end <= start:
+            return 0
+        first = start // self.slot_minutes
+        last = (end - 1) // self.slot_minutes
+        return ((1 << (last - first + 1)) - 1) << first
+
+    def occupancy(self, day: date_type, intervals: Iterable[Tuple[datetime, datetime]]) -> int:
+        """Build the occupancy bitmap of a day from reservation (start, end) pairs"""
+        day_start, _ = day_bounds(day)
+        bitmap = 0
+        for start_time, end_time in intervals:
+            bitmap |= self.interval_mask(
+                _minutes_since(start_time, day_start),
+                _minutes_since(end_time, day_start)
+            )
+        return bitmap
+
+    def available(self, bitmap: int) -> List[Dict[str, str]]:
+        """Slots whose bit is clear"""
+        free = ~bitmap & self.full_mask
+        return [slot for i, slot in enumerate(self.slots) if free >> i & 1]
+
+    def run_starts(self, bitmap: int, length: int) -> int:
+        """Bits of the slots that start `length` consecutive free slots"""
+        free = ~bitmap & self.full_mask
+        runs = free
+        for shift in range(1, length):
+            runs &= free >> shift
+        return runs
+
+    def is_aligned(self, start_minute: int, end_minute: int) -> bool:
+        """Whether [start_minute, end_minute) is a run of whole slots of this template"""
+        return (
+            self.opening_minute <= start_minute < end_minute <= self.closing_minute
+            and (start_minute - self.opening_minute) % self.slot_minutes == 0
+            and (end_minute - self.opening_minute) % self.slot_minutes == 0
+        )
+
+
+@lru_cache(maxsize=512)
+def get_template(opening: str, closing: str, slot_minutes: int) -> SlotTemplate:
+    """Shared, precomputed template for one schedule"""
+    return SlotTemplate(parse_minute(opening), parse_minute(closing), slot_minutes)
+
+
+# 12:00 to 20:00 in one-hour slots
+DEFAULT_TEMPLATE = get_template(DEFAULT_OPENING, DEFAULT_CLOSING, DEFAULT_SLOT_MINUTES)
+
+
+def court_template(court: models.Court, day: date_type) -> Optional[SlotTemplate]:
+    """Slot template of a court on a given day, or None if it is closed"""
+    slot_minutes = court.slot_minutes or DEFAULT_SLOT_MINUTES
+    if court.opening_hours is None:
+        return get_template(DEFAULT_OPENING, DEFAULT_CLOSING, slot_minutes)
+    # JSON object keys come back from the database as strings
+    weekday = day.weekday()
+    hours = court.opening_hours.get(str(weekday), court.opening_hours.get(weekday))
+    if not hours:
+        return None
+    return get_template(hours["open"], hours["close"], slot_minutes)
+
+
+def schedule_error(
+    court: models.Court,
+    day: datetime,
+    start_time: datetime,
+    end_time: datetime
+) -> Optional[str]:
+    """Why a reservation does not fit the court's slot grid, or None if it does"""
+    day = day.date() if isinstance(day, datetime) else day
+    if end_time <= start_time:
+        return "End time must be after start time"
+    if start_time.date() != day:
+        return "Start time must be on the reservation date"
+    template = court_template(court, day)
+    if template is None:
+        return "Court is closed on this day"
+    if not template.is_aligned(minute_of_day(start_time, day), minute_of_day(end_time, day)):
+        return (
+            f"Reservation must cover whole {template.slot_minutes}-minute slots "
+            f"between {_format_minute(template.opening_minute)} and "
+            f"{_format_minute(template.closing_minute)}"
+        )
+    return None
+
+
+def load_day_intervals(db: Session, court_id: str, day: date_type) -> List[Tuple[datetime, datetime]]:
+    """(start, end) of a court's blocking reservations on one day"""
+    if interval_rtree_enabled(db.get_bind()):
+        return interval_rtree.day_intervals(db, court_id, day, BLOCKING_STATUSES)
+    day_start, day_end = day_bounds(day)
+    return db.query(
+        models.Reservation.start_time,
+        models.Reservation.end_time
+    ).filter(
+        models.Reservation.court_id == court_id,
+        models.Reservation.date >= day_start,
+        models.Reservation.date < day_end,
+        models.Reservation.status.in_(BLOCKING_STATUSES)
+    ).all()
+
+
+def occupancy_matrix(
+    db: Session,
+    courts: Sequence[models.Court],
+    first_day: date_type,
+    last_day: date_type
+) -> Dict[str, List[int]]:
+    """
+    Occupancy bitmaps for many courts over a date range, from a single query.
+    
+    Returns, per court id, one bitmap per day from first_day to last_day,
+    laid out on that court's template for the day (0 when closed).
+    """
+    days = (last_day - first_day).days + 1
+    matrix = {court.id: [0] * days for court in courts}
+    if not courts or days <= 0:
+        return matrix
+    
+    range_start, _ = day_bounds(first_day)
+    _, range_end = day_bounds(last_day)
+    rows = db.query(
+        models.Reservation.court_id,
+        models.Reservation.date,
+        models.Reservation.start_time,
+        models.Reservation.end_time
+    ).filter(
+        models.Reservation.court_id.in_(list(matrix)),
+        models.Reservation.date >= range_start,
+        models.Reservation.date < range_end,
+        models.Reservation.status.in_(BLOCKING_STATUSES)
+    ).order_by(
+        models.Reservation.court_id,
+        models.Reservation.date
+    ).all()
+    
+    grouped: Dict[Tuple[str, date_type], List[Tuple[datetime, datetime]]] = defaultdict(list)
+    for court_id, day, start_time, end_time in rows:
+        grouped[(court_id, day.date())].append((start_time, end_time))
+    courts_by_id = {court.id: court for court in courts}
+    for (court_id, day), intervals in grouped.items():
+        template = court_template(courts_by_id[court_id], day)
+        if template is not None:
+            matrix[court_id][(day - first_day).days] = template.occupancy(day, intervals)
+    return matrix
+
+
+def day_occupancy(
+    db: Session,
+    court_id: str,
+    day: date_type,
+    template: SlotTemplate = DEFAULT_TEMPLATE
+) -> int:
+    """Occupancy bitmap of one court on one day"""
+    return template.occupancy(day, load_day_intervals(db, court_id, day))
+
+
+def find_free_slots(
+    courts: Sequence[models.Court],
+    matrix: Dict[str, List[int]],
+    first_day: date_type,
+    duration_minutes: int,
+    limit: int,
+    not_before: Optional[datetime] = None
+) -> List[Tuple[datetime, datetime, models.Court]]:
+    """
+    Earliest `limit` free (start, end, court) openings across courts.
+    
+    `matrix` is the output of occupancy_matrix for the same courts starting
+    at first_day. A booking covers the fewest whole slots lasting at least
+    `duration_minutes`.
+    """
+    if not_before is not None and not_before.tzinfo is not None:
+        # An instant (e.g. "...Z"): compare it on the local wall clock of the slots
+        not_before = not_before.astimezone().replace(tzinfo=None)
+
+    def candidates() -> Iterator[Tuple[datetime, float, str, datetime, models.Court]]:
+        for court in courts:
+            for offset, bitmap in enumerate(matrix[court.id]):
+                day = first_day + timedelta(days=offset)
+                template = court_template(court, day)
+                if template is None:
+                    continue
+                length = -(-duration_minutes // template.slot_minutes)
+                runs = template.run_starts(bitmap, length)
+                day_start, _ = day_bounds(day)
+                while runs:
+                    low = runs & -runs
+                    runs ^= low
+                    first_minute = template.opening_minute + (low.bit_length() - 1) * template.slot_minutes
+                    start = day_start + timedelta(minutes=first_minute)
+                    if not_before is not None and start < not_before:
+                        continue
+                    end = start + timedelta(minutes=length * template.slot_minutes)
+                    yield start, court.price_per_hour, court.id, end, court
+
+    return [
+        (start, end, court)
+        for start, _, _, end, court in nsmallest(limit, candidates())
+    ]
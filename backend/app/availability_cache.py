@@ -0,0 +1,210 @@
+"""
+Bounded LRU cache of per-court, per-day occupancy bitmaps
+
+Each worker has its own cache, so entries are tagged with the court's
+`availability_version`. Mapper events bump that column in the same
+transaction as every ORM write to the court's reservations or schedule,
+and a reader compares it with the version of the court row it just loaded:
+a booking made by any worker turns the other workers' entries into misses.
+"""
+import time
+from collections import OrderedDict
+from datetime import date as date_type, timedelta
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, event, inspect
+from sqlalchemy.orm import Session
+from app import models
+from app.availability import SlotTemplate, day_occupancy, occupancy_matrix
+from app.config import settings
+from app.read_routing import replica_lag
+
+CacheKey = Tuple[str, date_type]
+
+_courts = models.Court.__table__
+_BUMP_VERSION = _courts.update().where(
+    _courts.c.id == bindparam("court")
+).values(availability_version=_courts.c.availability_version + 1)
+
+
+class AvailabilityCache:
+    """
+    Caches occupancy bitmaps keyed by (court_id, day), each tagged with
+    the court's availability_version it was computed at; a lookup with
+    any other version is a miss.
+
+    Within a process, every invalidation bumps a global version. A reader takes the version
+    before querying the database and its result is only stored if no
+    invalidation happened in between, so a bitmap computed before a booking
+    committed can never be cached after that booking's invalidation. Reads
+    from a lagging replica are also refused until the replica can have
+    caught up with the last invalidation.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[int, int]]" = OrderedDict()
+        self._lock = Lock()
+        self._version = 0
+        self._invalidated_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, court_id: str, day: date_type, court_version: int) -> Optional[int]:
+        key = (court_id, day)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != court_version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(
+        self,
+        court_id: str,
+        day: date_type,
+        court_version: int,
+        bitmap: int,
+        version: int,
+        lag: float = 0.0
+    ) -> bool:
+        """Store a bitmap computed at `version` from data up to `lag` seconds old; returns False if it went stale"""
+        if self.max_entries <= 0:
+            return False
+        key = (court_id, day)
+        with self._lock:
+            if version != self._version or time.monotonic() - self._invalidated_at < lag:
+                return False
+            self._entries[key] = (court_version, bitmap)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, court_id: str, day: date_type) -> None:
+        """Forget one court/day after a reservation on it changed"""
+        with self._lock:
+            self._version += 1
+            self._invalidated_at = time.monotonic()
+            self.invalidations += 1
+            self._entries.pop((court_id, day), None)
+
+    def invalidate_court(self, court_id: str) -> None:
+        """Forget every day of a court after the court itself changed"""
+        with self._lock:
+            self._version += 1
+            self._invalidated_at = time.monotonic()
+            self.invalidations += 1
+            for key in [key for key in self._entries if key[0] == court_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+availability_cache = AvailabilityCache(settings.AVAILABILITY_CACHE_SIZE)
+
+
+def cached_day_occupancy(
+    db: Session,
+    court: models.Court,
+    day: date_type,
+    template: SlotTemplate
+) -> int:
+    """Occupancy bitmap of one court/day, read through the cache"""
+    occupancy = availability_cache.get(court.id, day, court.availability_version)
+    if occupancy is None:
+        version = availability_cache.version
+        occupancy = day_occupancy(db, court.id, day, template)
+        availability_cache.put(court.id, day, court.availability_version, occupancy, version, replica_lag(db))
+    return occupancy
+
+
+def cached_occupancy_matrix(
+    db: Session,
+    courts: Sequence[models.Court],
+    first_day: date_type,
+    last_day: date_type
+) -> Dict[str, List[int]]:
+    """
+    occupancy_matrix served from the cache where possible.
+    
+    Courts with at least one missing day are loaded with a single query
+    and their missing days are stored back.
+    """
+    days = [first_day + timedelta(days=d) for d in range((last_day - first_day).days + 1)]
+    matrix: Dict[str, List[int]] = {}
+    missing = []
+    for court in courts:
+        row = [availability_cache.get(court.id, day, court.availability_version) for day in days]
+        matrix[court.id] = row
+        if None in row:
+            missing.append(court)
+    
+    if missing:
+        version = availability_cache.version
+        loaded = occupancy_matrix(db, missing, first_day, last_day)
+        for court in missing:
+            row = matrix[court.id]
+            for offset, day in enumerate(days):
+                if row[offset] is None:
+                    row[offset] = loaded[court.id][offset]
+                    availability_cache.put(
+                        court.id, day, court.availability_version, row[offset], version, replica_lag(db)
+                    )
+    return matrix
+
+
+def _bump_versions(connection, court_ids) -> None:
+    connection.execute(_BUMP_VERSION, [{"court": court_id} for court_id in set(court_ids)])
+
+
+@event.listens_for(models.Reservation, "after_insert")
+@event.listens_for(models.Reservation, "after_delete")
+def _reservation_written(mapper, connection, target):
+    _bump_versions(connection, [target.court_id])
+
+
+@event.listens_for(models.Reservation, "after_update")
+def _reservation_updated(mapper, connection, target):
+    state = inspect(target)
+    fields = ("court_id", "date", "start_time", "end_time", "status")
+    if any(state.attrs[field].history.has_changes() for field in fields):
+        _bump_versions(connection, [*state.attrs.court_id.history.deleted, target.court_id])
+
+
+@event.listens_for(models.Court, "before_update")
+def _court_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in ("slot_minutes", "opening_hours", "is_active")):
+        # Incremented in SQL: the loaded value may predate other workers' bumps
+        target.availability_version = models.Court.availability_version + 1
@@ -0,0 +1,70 @@
+"""
+Cap on in-flight HTTP requests
+
+A sync request keeps its pooled connection until its session closes, and
+in between it queues for the shared threadpool again (e.g. to serialize the
+response). With more requests in flight than pooled connections, threads
+holding no connection can block on the pool while requests holding one wait
+for a thread, until the pool timeout fires. Keeping in-flight requests at or
+below the pool size rules that out; extra requests wait cheaply here.
+
+Endpoints marked with `concurrency_exempt` skip the cap: probes and scrapes
+that must answer while the API is saturated, long streams that would hold
+a slot for minutes, and async routes, which wait on their own pool without
+holding a threadpool thread.
+"""
+from typing import Callable, Optional, TypeVar
+import anyio
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+Endpoint = TypeVar("Endpoint", bound=Callable)
+
+
+def concurrency_exempt(endpoint: Endpoint) -> Endpoint:
+    """Serve `endpoint` without waiting for a request slot"""
+    endpoint.concurrency_exempt = True
+    return endpoint
+
+
+def is_exempt(scope: Scope) -> bool:
+    """Whether the route `scope` will be dispatched to is marked exempt"""
+    app = scope.get("app")
+    if app is None:
+        return False
+    # The same first full match the router picks
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(getattr(route, "endpoint", None), "concurrency_exempt", False)
+    return False
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(self, app: ASGIApp, limit: int):
+        self.app = app
+        self.limit = limit
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self.waiting = 0
+
+    @property
+    def in_flight(self) -> int:
+        return int(self._limiter.borrowed_tokens) if self._limiter else 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.limit <= 0 or scope["type"] != "http" or is_exempt(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._limiter is None:
+            # Created inside the event loop that serves requests
+            self._limiter = anyio.CapacityLimiter(self.limit)
+        borrower = object()
+        self.waiting += 1
+        try:
+            await self._limiter.acquire_on_behalf_of(borrower)
+        finally:
+            self.waiting -= 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._limiter.release_on_behalf_of(borrower)
@@ -4,18 +4,86 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./courts.db"
+    DATABASE_ASYNC: bool = False  # serve the hot routes through an async engine
+    ASYNC_DATABASE_URL: str = ""  # defaults to DATABASE_URL with its async driver
+    READ_DATABASE_URL: str = ""  # read replica for GET routes; empty reads the primary
+    REPLICA_LAG_SECONDS: float = 5  # users who just wrote read the primary this long
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = -1
+    MAX_CONCURRENT_REQUESTS: int = 40  # <= DB_POOL_SIZE + DB_MAX_OVERFLOW; 0 disables
+    
+    # SQLite connection profile (applied to every new connection)
+    SQLITE_TUNING_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
     
     # Security
     SECRET_KEY: str
-    ALGORITHM: str = "HS256"
+    ALGORITHM: str = "HS256"  # HS256 (SECRET_KEY), RS256 or ES256
+    JWT_KEYS_DIR: str = ""  # <kid>.pem private keys for RS256/ES256
+    JWT_ACTIVE_KID: str = ""  # signing key id; defaults to the newest
+    JWT_JWKS_URL: str = ""  # verify-only nodes: public keys of the auth node
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    REVOCATION_FILTER_BITS: int = 1048576
+    REVOCATION_FILTER_HASHES: int = 7
+    REVOCATION_SYNC_SECONDS: int = 5  # how often each worker pulls other workers' revocations
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    BCRYPT_POOL_WORKERS: int = 2
+    BCRYPT_POOL_MAX_QUEUE: int = 32
+    BCRYPT_ROUNDS: int = 0  # 0 = calibrate to BCRYPT_TARGET_HASH_MS at startup
+    BCRYPT_TARGET_HASH_MS: int = 250
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 16
+    
+    # Reservations
+    RESERVATION_INDEX_ENABLED: bool = False  # single writer process only; other workers' bookings never reach it
+    RESERVATION_INDEX_MAX_BUCKETS: int = 100000  # court/day buckets kept in memory
+    RESERVATION_RTREE_ENABLED: bool = False  # SQLite only; answers overlaps from the database
+    AVAILABILITY_CACHE_SIZE: int = 10000
+    RESERVATION_WRITE_QUEUE_ENABLED: bool = False  # group-commit bookings and cancellations
+    RESERVATION_WRITE_QUEUE_MAX_BATCH: int = 64
+    RESERVATION_WRITE_QUEUE_MAX_WAIT_MS: float = 0  # linger for more writes before committing
+    RESERVATION_WRITE_QUEUE_TIMEOUT_SECONDS: float = 30  # then 503; a write already being applied may still commit
+    
+    # Rate limiting (requests per window; 0 disables a limit)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_USER: int = 5  # per account and client IP
+    REGISTER_RATE_LIMIT_PER_IP: int = 5
+    RESERVATION_RATE_LIMIT_PER_USER: int = 30
+    RESERVATION_RATE_LIMIT_PER_IP: int = 120
+    RESERVATION_ITEM_RATE_LIMIT_PER_USER: int = 500  # reservations asked for through /batch and /series
+    RESERVATION_ITEM_RATE_LIMIT_PER_IP: int = 2000
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
+    # Observability
+    METRICS_ENABLED: bool = True  # Prometheus text format at /metrics
+    SQL_INSTRUMENTATION_ENABLED: bool = False  # per-request query counts and Server-Timing
+    SLOW_QUERY_MS: float = 100  # log statements slower than this (instrumented requests; 0 disables)
+    N_PLUS_ONE_THRESHOLD: int = 10  # flag a statement repeated this often in one request; 0 disables
+    PROFILING_ENABLED: bool = True  # admins profile a request with X-Profile: 1 or ?profile=1
+    PROFILING_INTERVAL_MS: float = 2  # stack sampling interval
+    PROFILING_SAMPLE_RATE: float = 0  # also profile this fraction of all requests
+    PROFILING_MAX_PROFILES: int = 100  # profiles kept for /api/profiling
+    PROFILING_SLOWEST_SIZE: int = 20
+    PROFILING_WINDOW_SECONDS: int = 3600  # the slowest list covers this long
+    
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    LOG_LEVEL: str = "INFO"
     
     class Config:
         env_file = ".env"
@@ -1,17 +1,139 @@
-from sqlalchemy import create_engine
+import time
+from functools import lru_cache
+from typing import Any, Dict
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
+from app.metrics import db_pool_checkout_wait_seconds
+from app.read_routing import reads_primary
+from app.sql_instrumentation import instrument_engine
 
-# Create SQLite engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+# Async driver for each sync database URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def is_memory_sqlite(url: str) -> bool:
+    return is_sqlite(url) and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """PRAGMAs applied to every new SQLite connection"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def is_async_url(url: str) -> bool:
+    """aiosqlite, asyncpg, aiomysql, asyncmy, psycopg_async..."""
+    driver = url.split("://", 1)[0].partition("+")[2]
+    return driver.startswith(("aio", "async")) or driver.endswith("_async")
+
+
+class CheckoutTimingMixin:
+    """Records how long each checkout waited for a pooled connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if settings.METRICS_ENABLED:
+                db_pool_checkout_wait_seconds.observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_engine keyword arguments for `url` from the settings"""
+    options: Dict[str, Any] = {}
+    if is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}  # Needed for SQLite
+    if not is_memory_sqlite(url):
+        # aiosqlite would otherwise default to a connection (and thread) per checkout
+        options["poolclass"] = TimedAsyncAdaptedQueuePool if is_async_url(url) else TimedQueuePool
+        # Keep pool_size + max_overflow at least the request threadpool size
+        # (40), or sync requests can starve each other of connections
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+
+def configure_engine(sync_engine: Engine, url: str) -> None:
+    if is_sqlite(url) and settings.SQLITE_TUNING_ENABLED:
+        event.listen(sync_engine, "connect", apply_sqlite_pragmas)
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        # Cursor events slow every statement down even as no-ops
+        instrument_engine(sync_engine)
+
+
+def database_settings(sync_engine: Engine) -> Dict[str, Any]:
+    """Effective pool and, for SQLite, PRAGMA values, read back from the database"""
+    pool = sync_engine.pool
+    values: Dict[str, Any] = {"pool": type(pool).__name__}
+    if hasattr(pool, "size"):
+        values.update(pool_size=pool.size(), max_overflow=pool._max_overflow, pool_timeout=pool._timeout)
+    if is_sqlite(str(sync_engine.url)):
+        with sync_engine.connect() as connection:
+            for name in sqlite_pragmas():
+                values[name] = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+    return values
+
+
+# Create database engine
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+configure_engine(engine, settings.DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replica; without one, reads go to the primary
+if settings.READ_DATABASE_URL:
+    read_engine = create_engine(settings.READ_DATABASE_URL, **engine_options(settings.READ_DATABASE_URL))
+    configure_engine(read_engine, settings.READ_DATABASE_URL)
+    ReadSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=read_engine, info={"replica": True}
+    )
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
 # Create Base class
 Base = declarative_base()
 
@@ -23,3 +145,43 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency for read-only routes: the replica, unless the caller just wrote
+def get_read_db(request: Request):
+    db = SessionLocal() if reads_primary(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def async_database_url(url: str) -> str:
+    """Same database as `url`, through its async driver"""
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """Async engine, created on first use so the async driver stays optional"""
+    url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(url, **engine_options(url))
+    configure_engine(async_engine.sync_engine, url)
+    return async_engine
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker:
+    # Objects stay readable after commit; async sessions cannot lazy-load them again
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
@@ -0,0 +1,84 @@
+"""
+Streaming serializers for the admin reservation export
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, Mapping
+
+# Flattened reservation fields, in CSV column order
+EXPORT_COLUMNS = [
+    "id",
+    "date",
+    "start_time",
+    "end_time",
+    "status",
+    "total_price",
+    "notes",
+    "series_id",
+    "created_at",
+    "court_id",
+    "court_name",
+    "court_location",
+    "sport_name",
+    "user_id",
+    "user_email",
+    "user_first_name",
+    "user_last_name",
+]
+
+# Rows buffered before a chunk is handed to the response
+CHUNK_ROWS = 500
+
+# Spreadsheets evaluate text cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def flatten_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Pick the export columns from a result row and make them JSON/CSV friendly"""
+    return {column: _plain(row[column]) for column in EXPORT_COLUMNS}
+
+
+def csv_safe(value: Any) -> Any:
+    """Quote user text that a spreadsheet would otherwise run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_ndjson(rows: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+    """Yield newline-delimited JSON, a few hundred rows per chunk"""
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(flatten_row(row)))
+        if len(chunk) >= CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk.clear()
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def iter_csv(rows: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+    """Yield CSV with a header line, a few hundred rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow({column: csv_safe(value) for column, value in flatten_row(row).items()})
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,101 @@
+"""
+Dedicated, bounded worker pool for bcrypt hashing and verification
+
+Password hashing is CPU-bound and slow on purpose. Running it here instead
+of in the shared request threadpool keeps a login/registration burst from
+starving unrelated endpoints; when the pool and its queue are full new work
+is rejected immediately instead of piling up.
+"""
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+from app.config import settings
+
+
+class HashingPoolFull(Exception):
+    """Raised when the pool has no worker and no queue slot left"""
+
+
+class HashingPool:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+        self._pending = 0
+        self._active = 0
+        self.started = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue `fn(*args)`; raises HashingPoolFull instead of waiting for room"""
+        submitted_at = time.perf_counter()
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HashingPoolFull()
+            self._pending += 1
+            executor = self._get_executor()
+
+        def run():
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                self._active += 1
+                self.started += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._pending -= 1
+                    self.completed += 1
+
+        try:
+            return executor.submit(run)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Await `fn(*args)` on the pool without holding a request thread"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queue_depth": self._pending - self._active,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_avg": self.wait_seconds_total / self.started if self.started else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the workers; the pool starts new ones on next use"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hashing_pool = HashingPool(settings.BCRYPT_POOL_WORKERS, settings.BCRYPT_POOL_MAX_QUEUE)
@@ -3,16 +3,17 @@ Initialize database with sample data
 """
 from sqlalchemy.orm import Session
 from uuid import uuid4
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal
 from app import models
 from app.auth import get_password_hash
+from app.migrate import upgrade_database
 
 
 def init_db():
     """Initialize database with tables and sample data"""
-    print("🔨 Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tables created successfully!")
+    print("🔨 Migrating database tables...")
+    upgrade_database()
+    print("✅ Tables migrated successfully!")
     
     db = SessionLocal()
     
@@ -0,0 +1,235 @@
+"""
+Optional SQLite R*Tree over active reservation intervals
+
+Each active reservation is a rectangle (court key x [start, end) minute)
+in the `reservation_intervals` virtual table, so "which reservations of this
+court overlap this time range" is a single R*Tree range search instead of a
+B-tree scan of the court's rows for the day. The table is kept in sync by
+mapper events on Reservation, i.e. by every ORM write path; rows inserted
+around the ORM are picked up by `rebuild_interval_rtree`.
+
+Filling the table scans every active reservation, so it is a deploy step,
+never a worker startup one:
+
+    python -m app.interval_rtree install   # create and fill, if missing
+    python -m app.interval_rtree rebuild   # refill from the reservations table
+    python -m app.interval_rtree drop
+"""
+import argparse
+import zlib
+from datetime import date as date_type, datetime, timedelta
+from typing import Iterable, List, Tuple
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+from app.database import engine as default_engine
+
+RTREE_TABLE = "reservation_intervals"
+EPOCH = datetime(1970, 1, 1)
+ONE_MINUTE = timedelta(minutes=1)
+
+_CREATE = text(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} USING rtree_i32("
+    "id, court_lo, court_hi, start_minute, end_minute, "
+    "+reservation_id TEXT, +court_id TEXT, +status TEXT)"
+)
+_INSERT = text(
+    f"INSERT INTO {RTREE_TABLE} "
+    "(court_lo, court_hi, start_minute, end_minute, reservation_id, court_id, status) "
+    "VALUES (:key, :key, :start, :end, :reservation_id, :court_id, :status)"
+)
+# Aux columns cannot be indexed: narrow down spatially, then match the id
+_DELETE = text(
+    f"DELETE FROM {RTREE_TABLE} WHERE id IN ("
+    f"SELECT id FROM {RTREE_TABLE} WHERE court_lo <= :key AND court_hi >= :key "
+    "AND start_minute < :end AND end_minute > :start AND reservation_id = :reservation_id)"
+)
+_OVERLAPPING = text(
+    f"SELECT start_minute, end_minute, status FROM {RTREE_TABLE} "
+    "WHERE court_lo <= :key AND court_hi >= :key "
+    "AND start_minute < :end AND end_minute > :start AND court_id = :court_id"
+)
+
+
+def court_key(court_id: str) -> int:
+    """Stable 31-bit coordinate for a court id; collisions only add candidates"""
+    return zlib.crc32(court_id.encode("utf-8")) & 0x7FFFFFFF
+
+
+def to_minute(value: datetime, round_up: bool = False) -> int:
+    """Minutes since the epoch; ends round up so overlaps are never missed"""
+    value = value.replace(tzinfo=None) if value.tzinfo is not None else value
+    minutes, remainder = divmod(value - EPOCH, ONE_MINUTE)
+    return minutes + 1 if round_up and remainder else minutes
+
+
+def from_minute(minute: int) -> datetime:
+    return EPOCH + minute * ONE_MINUTE
+
+
+def _status_name(status) -> str:
+    return status.name if isinstance(status, models.ReservationStatus) else str(status)
+
+
+def _params(reservation_id: str, court_id: str, start: datetime, end: datetime, status) -> dict:
+    return {
+        "key": court_key(court_id),
+        "start": to_minute(start),
+        "end": to_minute(end, round_up=True),
+        "reservation_id": reservation_id,
+        "court_id": court_id,
+        "status": _status_name(status),
+    }
+
+
+def _is_active(status) -> bool:
+    return _status_name(status) != models.ReservationStatus.CANCELLED.name
+
+
+def interval_rtree_enabled(bind) -> bool:
+    """Whether the R*Tree is on for `bind` (an engine or connection)"""
+    return settings.RESERVATION_RTREE_ENABLED and bind.dialect.name == "sqlite"
+
+
+def interval_rtree_installed(connection: Connection) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": RTREE_TABLE}
+    ).first() is not None
+
+
+def install_interval_rtree(connection: Connection) -> bool:
+    """Create the R*Tree if missing and fill it; returns True if it was created"""
+    if interval_rtree_installed(connection):
+        return False
+    connection.execute(_CREATE)
+    _fill(connection)
+    return True
+
+
+def rebuild_interval_rtree(connection: Connection) -> None:
+    """Refill the R*Tree from the reservations table"""
+    connection.execute(_CREATE)
+    connection.execute(text(f"DELETE FROM {RTREE_TABLE}"))
+    _fill(connection)
+
+
+def drop_interval_rtree(connection: Connection) -> None:
+    connection.execute(text(f"DROP TABLE IF EXISTS {RTREE_TABLE}"))
+
+
+def _fill(connection: Connection) -> None:
+    table = models.Reservation.__table__
+    rows = connection.execute(
+        table.select().with_only_columns(
+            table.c.id, table.c.court_id, table.c.start_time, table.c.end_time, table.c.status
+        ).where(
+            table.c.status != models.ReservationStatus.CANCELLED
+        ).execution_options(yield_per=10_000)
+    )
+    for partition in rows.partitions():
+        connection.execute(_INSERT, [_params(*row) for row in partition])
+
+
+def check_interval_rtree(engine: Engine) -> None:
+    """Fail at startup if the R*Tree is enabled but was never installed"""
+    if not interval_rtree_enabled(engine):
+        return
+    with engine.connect() as connection:
+        if not interval_rtree_installed(connection):
+            raise RuntimeError(
+                f"RESERVATION_RTREE_ENABLED is set but {RTREE_TABLE} does not exist; "
+                "run `python -m app.interval_rtree install` first"
+            )
+
+
+def _overlapping(db: Session, court_id: str, start: datetime, end: datetime):
+    params = {
+        "key": court_key(court_id),
+        "start": to_minute(start),
+        "end": to_minute(end, round_up=True),
+        "court_id": court_id,
+    }
+    return db.execute(_OVERLAPPING, params)
+
+
+def has_overlap(db: Session, court_id: str, start: datetime, end: datetime) -> bool:
+    """Check [start, end) against the court's active reservations"""
+    return _overlapping(db, court_id, start, end).first() is not None
+
+
+def day_intervals(
+    db: Session,
+    court_id: str,
+    day: date_type,
+    statuses: Iterable[models.ReservationStatus]
+) -> List[Tuple[datetime, datetime]]:
+    """(start, end) of a court's reservations with one of `statuses` touching `day`"""
+    names = {_status_name(status) for status in statuses}
+    day_start = datetime.combine(day, datetime.min.time())
+    return [
+        (from_minute(start), from_minute(end))
+        for start, end, status in _overlapping(db, court_id, day_start, day_start + timedelta(days=1))
+        if status in names
+    ]
+
+
+@event.listens_for(models.Reservation, "after_insert")
+def _index_inserted(mapper, connection, target):
+    if interval_rtree_enabled(connection) and _is_active(target.status):
+        connection.execute(_INSERT, _params(
+            target.id, target.court_id, target.start_time, target.end_time, target.status
+        ))
+
+
+@event.listens_for(models.Reservation, "after_update")
+def _index_updated(mapper, connection, target):
+    if not interval_rtree_enabled(connection):
+        return
+    state = inspect(target)
+    fields = ("court_id", "start_time", "end_time", "status")
+    if not any(state.attrs[field].history.has_changes() for field in fields):
+        return
+
+    def previous(field):
+        history = state.attrs[field].history
+        return history.deleted[0] if history.deleted else getattr(target, field)
+
+    connection.execute(_DELETE, _params(
+        target.id, previous("court_id"), previous("start_time"), previous("end_time"), previous("status")
+    ))
+    if _is_active(target.status):
+        connection.execute(_INSERT, _params(
+            target.id, target.court_id, target.start_time, target.end_time, target.status
+        ))
+
+
+@event.listens_for(models.Reservation, "after_delete")
+def _index_deleted(mapper, connection, target):
+    if interval_rtree_enabled(connection):
+        connection.execute(_DELETE, _params(
+            target.id, target.court_id, target.start_time, target.end_time, target.status
+        ))
+
+
+def main(argv=None, engine: Engine = default_engine) -> None:
+    parser = argparse.ArgumentParser(description="Manage the reservation intervals R*Tree")
+    parser.add_argument("action", choices=["install", "rebuild", "drop"])
+    args = parser.parse_args(argv)
+    if engine.dialect.name != "sqlite":
+        parser.error("the R*Tree is SQLite only")
+    with engine.begin() as connection:
+        if args.action == "install":
+            created = install_interval_rtree(connection)
+            print(f"{RTREE_TABLE} {'created' if created else 'already installed'}")
+        elif args.action == "rebuild":
+            rebuild_interval_rtree(connection)
+            print(f"{RTREE_TABLE} rebuilt")
+        else:
+            drop_interval_rtree(connection)
+            print(f"{RTREE_TABLE} dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,52 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from app.concurrency import ConcurrencyLimitMiddleware, concurrency_exempt
 from app.config import settings
-from app.database import engine, Base
-from app.routes import auth, courts, reservations
+from app.availability_cache import availability_cache
+from app.database import engine, read_engine, SessionLocal, database_settings, dispose_async_engine
+from app.hashing_pool import hashing_pool
+from app.interval_rtree import check_interval_rtree
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, register_collectors, registry
+from app.pagination import NEXT_CURSOR_HEADER
+from app.password_cost import password_cost
+from app.principal_cache import principal_cache
+from app.profiling import PROFILE_ID_HEADER, ProfilingMiddleware
+from app.reservation_index import reservation_index
+from app.revocation import revocation_list
+from app.sql_instrumentation import SERVER_TIMING_HEADER, SqlInstrumentationMiddleware
+from app.routes import async_courts, async_reservations, auth, courts, profiling, reservations
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+# The schema is managed by Alembic (app/migrate.py); importing the app does no DDL
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm in-memory structures before serving requests"""
+    logger.info(
+        "Database %s: %s",
+        engine.url.render_as_string(hide_password=True),
+        ", ".join(f"{name}={value}" for name, value in database_settings(engine).items())
+    )
+    password_cost.calibrate()
+    # Installing the optional R*Tree is a deploy step (python -m app.interval_rtree)
+    check_interval_rtree(engine)
+    db = SessionLocal()
+    try:
+        revocation_list.load(db)
+        if settings.RESERVATION_INDEX_ENABLED:
+            reservation_index.warm_load(db)
+    finally:
+        db.close()
+    yield
+    hashing_pool.shutdown()
+    reservations.reservation_writes.shutdown()
+    await dispose_async_engine()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
@@ -13,7 +54,8 @@ app = FastAPI(
     description="API for managing sports courts reservations",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -23,12 +65,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER, PROFILE_ID_HEADER],
+)
+
+# Never more requests in flight than pooled database connections (probes,
+# scrapes, streams and async routes are exempt, see app/concurrency.py)
+app.add_middleware(ConcurrencyLimitMiddleware, limit=settings.MAX_CONCURRENT_REQUESTS)
+
+# Per-request SQL counts and timings (SQL_INSTRUMENTATION_ENABLED)
+app.add_middleware(SqlInstrumentationMiddleware)
+
+# Admin-requested profiles and the slowest requests (PROFILING_ENABLED)
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so latency includes waiting for a request slot
+app.add_middleware(MetricsMiddleware)
+pools = {"primary": engine}
+if read_engine is not engine:
+    pools["replica"] = read_engine
+register_collectors(
+    caches={"availability": availability_cache, "principal": principal_cache},
+    hashing_pool=hashing_pool,
+    engines=pools
 )
 
-# Include routers
+# Include routers; async variants of the hot routes shadow the sync ones
+if settings.DATABASE_ASYNC:
+    app.include_router(async_courts.router)
+    app.include_router(async_reservations.router)
 app.include_router(auth.router)
 app.include_router(courts.router)
 app.include_router(reservations.router)
+app.include_router(profiling.router)
 
 
 @app.get("/")
@@ -43,11 +111,21 @@ def root():
 
 
 @app.get("/health")
+@concurrency_exempt
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+@concurrency_exempt
+def metrics():
+    """Prometheus metrics"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
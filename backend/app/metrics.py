@@ -0,0 +1,267 @@
+"""
+Prometheus-compatible metrics
+
+Counters and histograms keep one cell per thread, so recording a value
+never takes a lock or contends with other request threads; a scrape sums
+the cells. Readings that other components already keep (cache hits, the
+bcrypt pool, database pools) are collected by callbacks at scrape time.
+`registry.render()` returns the Prometheus text exposition format.
+"""
+import time
+from bisect import bisect_left
+from threading import Lock, local
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Sequence[Tuple[str, str]], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Sharded:
+    """Per-thread cells: writers never share one, scrapes add them up"""
+
+    def __init__(self):
+        self._local = local()
+        self._shards: List[Dict[Labels, Any]] = []
+        self._lock = Lock()
+
+    def _cells(self) -> Dict[Labels, Any]:
+        try:
+            return self._local.cells
+        except AttributeError:
+            cells = self._local.cells = {}
+            # Only the first write from each thread takes the lock
+            with self._lock:
+                self._shards.append(cells)
+            return cells
+
+    def _snapshots(self) -> List[Dict[Labels, Any]]:
+        with self._lock:
+            shards = list(self._shards)
+        return [dict(cells) for cells in shards]
+
+
+class Counter(_Sharded):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        cells = self._cells()
+        cells[labels] = cells.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return sum(cells.get(labels, 0.0) for cells in self._snapshots())
+
+    def collect(self) -> Iterable[Sample]:
+        totals: Dict[Labels, float] = {}
+        for cells in self._snapshots():
+            for labels, value in cells.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        for labels, value in sorted(totals.items()):
+            yield self.name, list(zip(self.labelnames, labels)), value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Sharded):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        cells = self._cells()
+        cell = cells.get(labels)
+        if cell is None:
+            # One count per bucket, then +Inf, then the sum
+            cell = cells[labels] = [0] * (len(self.buckets) + 2)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def collect(self) -> Iterable[Sample]:
+        totals: Dict[Labels, List[float]] = {}
+        for cells in self._snapshots():
+            for labels, cell in cells.items():
+                total = totals.setdefault(labels, [0] * len(cell))
+                for i, value in enumerate(list(cell)):
+                    total[i] += value
+        for labels, total in sorted(totals.items()):
+            named = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), total):
+                cumulative += count
+                yield f"{self.name}_bucket", named + [("le", _format_value(bound))], cumulative
+            yield f"{self.name}_sum", named, total[-1]
+            yield f"{self.name}_count", named, cumulative
+
+
+class CallbackMetric:
+    """A metric read from `read()` at scrape time, as (label values, value) pairs"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        type: str,
+        labelnames: Sequence[str],
+        read: Callable[[], Iterable[Tuple[Labels, float]]]
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.read = read
+
+    def collect(self) -> Iterable[Sample]:
+        for labels, value in self.read():
+            yield self.name, list(zip(self.labelnames, labels)), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def register(self, metric):
+        """Add `metric`, replacing one with the same name"""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.collect():
+                if labels:
+                    rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels)
+                    lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being served"
+))
+db_pool_checkout_wait_seconds = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+))
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request under its route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not settings.METRICS_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            # The router leaves the matched route in the scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            http_requests_total.inc(scope["method"], route, str(status_code))
+            http_request_duration_seconds.observe(time.perf_counter() - started, scope["method"], route)
+
+
+def register_collectors(caches: Dict[str, Any], hashing_pool, engines: Dict[str, Any]) -> None:
+    """Scrape-time readings of the caches (with hits/misses), the bcrypt pool and database pools"""
+
+    def cache_lookups():
+        for name, cache in caches.items():
+            yield (name, "hit"), cache.hits
+            yield (name, "miss"), cache.misses
+
+    def cache_hit_ratio():
+        for name, cache in caches.items():
+            lookups = cache.hits + cache.misses
+            yield (name,), cache.hits / lookups if lookups else 0.0
+
+    def hashing_pool_readings(*keys):
+        def read():
+            stats = hashing_pool.stats()
+            for key in keys:
+                yield (key,), stats[key]
+        return read
+
+    def checked_out():
+        for name, engine in engines.items():
+            if hasattr(engine.pool, "checkedout"):
+                yield (name,), engine.pool.checkedout()
+
+    registry.register(CallbackMetric(
+        "cache_lookups_total", "Cache lookups by result", "counter", ("cache", "result"), cache_lookups
+    ))
+    registry.register(CallbackMetric(
+        "cache_hit_ratio", "Cache hits over lookups since the last clear", "gauge", ("cache",), cache_hit_ratio
+    ))
+    registry.register(CallbackMetric(
+        "bcrypt_pool_tasks", "bcrypt pool tasks by state", "gauge", ("state",),
+        hashing_pool_readings("active", "queue_depth")
+    ))
+    registry.register(CallbackMetric(
+        "bcrypt_pool_rejected_total", "bcrypt tasks rejected with the pool full", "counter", (),
+        lambda: [((), hashing_pool.stats()["rejected"])]
+    ))
+    registry.register(CallbackMetric(
+        "db_pool_checked_out", "Database connections checked out of the pool", "gauge", ("pool",), checked_out
+    ))
@@ -0,0 +1,34 @@
+"""
+Alembic migrations from code
+
+The schema is owned by the migrations in backend/migrations; the app never
+creates tables at import or startup. Run `alembic upgrade head` (or
+`python -m app.init_db`) before starting a worker.
+"""
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def alembic_config(url: Optional[str] = None) -> Config:
+    """Alembic config for backend/alembic.ini, usable from any working directory"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    if url:
+        config.set_main_option("sqlalchemy.url", url)
+    # Leave the application's logging configuration alone
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def upgrade_database(url: Optional[str] = None, revision: str = "head") -> None:
+    """Migrate `url` (default DATABASE_URL) up to `revision`"""
+    command.upgrade(alembic_config(url), revision)
+
+
+def downgrade_database(url: Optional[str] = None, revision: str = "base") -> None:
+    """Migrate `url` (default DATABASE_URL) down to `revision`"""
+    command.downgrade(alembic_config(url), revision)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Enum, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -59,6 +59,11 @@ class Court(Base):
     capacity = Column(Integer, nullable=False)
     is_active = Column(Boolean, default=True)
     image_url = Column(String, nullable=True)
+    slot_minutes = Column(Integer, default=60, nullable=False)
+    # {"<weekday>": {"open": "HH:MM", "close": "HH:MM"}}; NULL means the default 12:00-20:00 daily
+    opening_hours = Column(JSON, nullable=True)
+    # Bumped with every reservation or schedule change; keys the availability cache across workers
+    availability_version = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -79,9 +84,26 @@ class Reservation(Base):
     total_price = Column(Float, nullable=False)
     status = Column(Enum(ReservationStatus), default=ReservationStatus.PENDING, nullable=False)
     notes = Column(String, nullable=True)
+    series_id = Column(String, nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="reservations")
     court = relationship("Court", back_populates="reservations")
+    
+    __table_args__ = (
+        # Overlap checks and day occupancy: one court, one day, active statuses
+        Index("ix_reservations_court_date_status", "court_id", "date", "status"),
+        # "My reservations", paged newest first by (date, id)
+        Index("ix_reservations_user_date", "user_id", "date", "id"),
+    )
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    jti = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,27 @@
+"""
+Keyset (cursor) pagination helpers for listings ordered by (date DESC, id DESC)
+"""
+import base64
+from datetime import datetime
+from typing import Tuple
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(date: datetime, item_id: str) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor"""
+    raw = f"{date.isoformat()}|{item_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        date_part, item_id = raw.split("|", 1)
+        return datetime.fromisoformat(date_part), item_id
+    except (UnicodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,79 @@
+"""
+bcrypt work factor calibrated to a target hash time on the current node
+"""
+import math
+import time
+from typing import Optional
+import bcrypt as bcrypt_lib
+from app.config import settings
+
+# Rounds used for the timing probe; cheap enough to run at every startup
+PROBE_ROUNDS = 8
+PROBE_PASSWORD = b"calibration-probe"
+
+# bcrypt.gensalt() default, used until calibration runs
+DEFAULT_ROUNDS = 12
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Work factor stored in a bcrypt hash ("$2b$12$..."), or None if unreadable"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def measure_hash_seconds(rounds: int) -> float:
+    """Wall time of one bcrypt hash at `rounds`"""
+    started = time.perf_counter()
+    bcrypt_lib.hashpw(PROBE_PASSWORD, bcrypt_lib.gensalt(rounds))
+    return time.perf_counter() - started
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int, max_rounds: int) -> int:
+    """
+    Highest work factor whose hash time stays within `target_ms`.
+
+    Each extra round doubles the cost, so one probe is extrapolated
+    instead of timing every candidate.
+    """
+    probe_ms = max(measure_hash_seconds(PROBE_ROUNDS) * 1000, 1e-3)
+    rounds = PROBE_ROUNDS + math.floor(math.log2(target_ms / probe_ms))
+    return min(max(rounds, min_rounds), max_rounds)
+
+
+class PasswordCost:
+    """Current bcrypt work factor: fixed by configuration or calibrated at startup"""
+
+    def __init__(self, fixed_rounds: int, target_ms: float, min_rounds: int, max_rounds: int):
+        self.fixed_rounds = fixed_rounds
+        self.target_ms = target_ms
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.rounds = fixed_rounds or DEFAULT_ROUNDS
+        self.calibrated = bool(fixed_rounds)
+
+    def calibrate(self) -> int:
+        """Pick the work factor once per process; a fixed setting always wins"""
+        if not self.calibrated:
+            self.rounds = calibrate_rounds(self.target_ms, self.min_rounds, self.max_rounds)
+            self.calibrated = True
+        return self.rounds
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Whether a stored hash is weaker than the current work factor.
+
+        Only upgrades: nodes calibrate independently, and a slower node must
+        not keep lowering hashes a faster one strengthened.
+        """
+        rounds = hash_rounds(hashed_password)
+        return rounds is None or rounds < self.rounds
+
+
+password_cost = PasswordCost(
+    settings.BCRYPT_ROUNDS,
+    settings.BCRYPT_TARGET_HASH_MS,
+    settings.BCRYPT_MIN_ROUNDS,
+    settings.BCRYPT_MAX_ROUNDS
+)
@@ -0,0 +1,131 @@
+"""
+Bounded TTL cache of verified principals for the authentication fast path
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Optional, Tuple
+from app import models
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of the user fields routes and UserResponse need"""
+    id: str
+    email: str
+    first_name: str
+    last_name: str
+    phone: Optional[str]
+    role: models.UserRole
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            phone=user.phone,
+            role=user.role,
+            created_at=user.created_at
+        )
+
+
+class PrincipalCache:
+    """
+    Two LRU maps with a TTL:
+
+    - token -> (user id, expiry, jti): a token already verified skips
+      signature checking until the earlier of the TTL and the token's own
+      `exp`. Its `jti` is kept so callers can still screen it for revocation.
+    - user id -> principal: skips the users table lookup. Dropping a user id
+      invalidates every token of that user at once.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._tokens: "OrderedDict[str, Tuple[str, float, Optional[str]]]" = OrderedDict()
+        self._principals: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        entry = self.lookup(token)
+        return entry[0] if entry is not None else None
+
+    def lookup(self, token: str) -> Optional[Tuple[Principal, Optional[str]]]:
+        """Cached (principal, jti) of a verified token"""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is None or entry[1] <= now:
+                self._tokens.pop(token, None)
+                self.misses += 1
+                return None
+            cached = self._principals.get(entry[0])
+            if cached is None or cached[1] <= now:
+                self._principals.pop(entry[0], None)
+                self.misses += 1
+                return None
+            self._tokens.move_to_end(token)
+            self._principals.move_to_end(entry[0])
+            self.hits += 1
+            return cached[0], entry[2]
+
+    def put(
+        self,
+        token: str,
+        principal: Principal,
+        token_exp: Optional[float] = None,
+        jti: Optional[str] = None
+    ) -> None:
+        """Remember a verified token; `token_exp` and `jti` are its claims (`exp` in epoch seconds)"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        expires = now + self.ttl_seconds
+        if token_exp is not None:
+            expires = min(expires, now + (token_exp - time.time()))
+        if expires <= now:
+            return
+        with self._lock:
+            self._tokens[token] = (principal.id, expires, jti)
+            self._tokens.move_to_end(token)
+            self._principals[principal.id] = (principal, now + self.ttl_seconds)
+            self._principals.move_to_end(principal.id)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+            while len(self._principals) > self.max_entries:
+                self._principals.popitem(last=False)
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            self._principals.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._principals.clear()
+            self.hits = self.misses = 0
+
+
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_SIZE,
+    settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
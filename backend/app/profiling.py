@@ -0,0 +1,310 @@
+"""
+On-demand request profiling
+
+An admin adds `X-Profile: 1` (or `?profile=1`) to any request and it runs
+under a sampling profiler; the response carries an `X-Profile-Id` to fetch
+the report from /api/profiling. The flag is ignored on anyone else's
+requests, which are served as usual. Sync endpoints run on threadpool threads,
+which a per-thread profiler like cProfile would miss, so the sampler
+snapshots every busy thread's stack (idle workers and the idle event loop
+are skipped) every PROFILING_INTERVAL_MS. Requests served concurrently
+show up in the same profile; profile on a quiet worker for a clean one.
+
+Every request's latency also goes into a rolling list of the slowest N,
+with the profile attached when the request was profiled. A fraction
+PROFILING_SAMPLE_RATE of all requests can be profiled too, so slow ones
+come with a profile without anyone asking for it.
+"""
+import asyncio
+import heapq
+import random
+import sys
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import count
+from threading import Event, Lock, Thread, get_ident
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.auth import get_current_admin_user, get_current_user
+from app.config import settings
+from app.database import get_db
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Innermost frames of a thread waiting for work rather than doing it
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+
+def _frame_name(code) -> str:
+    module = code.co_filename.rsplit("/", 1)[-1]
+    return f"{code.co_name} ({module}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (code.co_filename.rsplit("/", 1)[-1], code.co_name) in IDLE_FRAMES
+
+
+class StackSampler:
+    """Counts the stacks of busy threads, root first, until stopped"""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the last sample; blocks, so keep it off the event loop"""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or _is_idle(frame):
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+
+@dataclass
+class Profile:
+    id: str
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    interval_ms: float
+    samples: int
+    stacks: Counter
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def top(self, limit: int = 30) -> List[Dict[str, object]]:
+        """Functions by samples spent inside them (self) and under them (total)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, hits in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += hits
+            for name in set(frames):
+                total[name] += hits
+        return [
+            {"function": name, "self": own[name], "total": hits}
+            for name, hits in total.most_common(limit)
+        ]
+
+    def folded(self) -> str:
+        """Folded stacks, one `root;...;leaf count` per line (flamegraph.pl, speedscope)"""
+        return "".join(f"{stack} {hits}\n" for stack, hits in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "created_at": self.created_at.isoformat(),
+        }
+
+    def report(self) -> Dict[str, object]:
+        return {
+            **self.summary(),
+            "interval_ms": self.interval_ms,
+            "samples": self.samples,
+            "top": self.top(),
+        }
+
+
+@dataclass(order=True)
+class SlowRequest:
+    duration_ms: float
+    at: float
+    method: str = field(compare=False)
+    path: str = field(compare=False)
+    route: str = field(compare=False)
+    status: int = field(compare=False)
+    profile_id: Optional[str] = field(compare=False, default=None)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "at": datetime.utcfromtimestamp(self.at).isoformat(),
+            "profile_id": self.profile_id,
+        }
+
+
+class RequestProfiles:
+    """Recent profiles by id, plus the slowest requests of the last window"""
+
+    def __init__(self, max_profiles: int, slowest: int, window_seconds: float):
+        self.max_profiles = max_profiles
+        self.slowest_size = slowest
+        self.window_seconds = window_seconds
+        self._lock = Lock()
+        self._ids = count(1)
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+        self._slowest: List[SlowRequest] = []  # min-heap on duration
+
+    def next_id(self) -> str:
+        return f"{int(time.time())}-{next(self._ids)}"
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def record(self, request: SlowRequest) -> None:
+        with self._lock:
+            self._expire(request.at)
+            if len(self._slowest) < self.slowest_size:
+                heapq.heappush(self._slowest, request)
+            elif self._slowest and request > self._slowest[0]:
+                heapq.heapreplace(self._slowest, request)
+
+    def slowest(self) -> List[SlowRequest]:
+        with self._lock:
+            self._expire(time.time())
+            return sorted(self._slowest, reverse=True)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        if any(request.at < cutoff for request in self._slowest):
+            self._slowest = [request for request in self._slowest if request.at >= cutoff]
+            heapq.heapify(self._slowest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+            self._slowest.clear()
+
+
+request_profiles = RequestProfiles(
+    settings.PROFILING_MAX_PROFILES,
+    settings.PROFILING_SLOWEST_SIZE,
+    settings.PROFILING_WINDOW_SECONDS
+)
+
+
+def profile_requested(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value not in (b"", b"0", b"false")
+    query = scope.get("query_string", b"").decode("latin-1")
+    return any(
+        pair.partition("=")[0] == PROFILE_QUERY_PARAM and pair.partition("=")[2] not in ("0", "false")
+        for pair in query.split("&")
+    )
+
+
+async def may_profile(scope: Scope) -> bool:
+    """Whether the caller is an admin, and so may ask for a profile"""
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    scheme, token = get_authorization_scheme_param(authorization)
+    if scheme.lower() != "bearer" or not token:
+        return False
+    sessions = scope["app"].dependency_overrides.get(get_db, get_db)
+
+    def check() -> None:
+        db_dependency = sessions()
+        db = next(db_dependency)
+        try:
+            get_current_admin_user(get_current_user(token, db))
+        finally:
+            db_dependency.close()
+
+    try:
+        await run_in_threadpool(check)
+    except HTTPException:
+        return False
+    return True
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not settings.PROFILING_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sampler = None
+        profile_id = None
+        # The route authenticates the request itself; a flag it may not use is just ignored
+        if profile_requested(scope) and await may_profile(scope):
+            sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000)
+        elif settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000)
+        if sampler is not None:
+            profile_id = request_profiles.next_id()
+
+        status_code = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile_id is not None:
+                    MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        started = time.perf_counter()
+        if sampler is not None:
+            sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if sampler is not None:
+                await asyncio.get_running_loop().run_in_executor(None, sampler.stop)
+                request_profiles.add(Profile(
+                    id=profile_id,
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status_code,
+                    duration_ms=duration_ms,
+                    interval_ms=settings.PROFILING_INTERVAL_MS,
+                    samples=sampler.samples,
+                    stacks=sampler.stacks,
+                ))
+            request_profiles.record(SlowRequest(
+                duration_ms=duration_ms,
+                at=time.time(),
+                method=scope["method"],
+                path=scope["path"],
+                route=getattr(scope.get("route"), "path", scope["path"]),
+                status=status_code,
+                profile_id=profile_id,
+            ))
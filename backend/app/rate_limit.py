@@ -0,0 +1,163 @@
+"""
+Sliding-window rate limiting for expensive or abuse-prone endpoints
+
+Each key keeps only the counters of the current and the previous fixed
+window; the previous one is weighted by how much of it still overlaps the
+sliding window. That makes every check O(1) in time and memory per key.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from app import models
+from app.auth import get_current_user
+from app.config import settings
+
+
+class RateLimitStore(ABC):
+    """Counter storage; a shared backend only has to implement `hit` atomically"""
+
+    @abstractmethod
+    def hit(self, key: str, window_id: int, cost: int = 1) -> Tuple[int, int]:
+        """Count `cost` requests for `key` in `window_id`; return (previous, current) window counts"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget every counter"""
+
+
+class InMemoryStore(RateLimitStore):
+    """Per-process counters, bounded to `max_keys` least recently used keys"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._counters: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def hit(self, key: str, window_id: int, cost: int = 1) -> Tuple[int, int]:
+        with self._lock:
+            window, previous, current = self._counters.get(key, (window_id, 0, 0))
+            if window == window_id - 1:
+                previous, current = current, 0
+            elif window != window_id:
+                previous, current = 0, 0
+            current += cost
+            self._counters[key] = (window_id, previous, current)
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+            return previous, current
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore, window_seconds: int):
+        self.store = store
+        self.window_seconds = window_seconds
+        self.allowed = 0
+        self.rejected = 0
+
+    def check(self, key: str, limit: int, now: Optional[float] = None, cost: int = 1) -> Optional[int]:
+        """Count a request weighing `cost`; return None if allowed, else seconds until it would be"""
+        if limit <= 0:
+            return None
+        now = time.time() if now is None else now
+        window_id, offset = divmod(now, self.window_seconds)
+        elapsed = offset / self.window_seconds
+        previous, current = self.store.hit(key, int(window_id), cost)
+
+        if previous * (1 - elapsed) + current <= limit:
+            self.allowed += 1
+            return None
+        self.rejected += 1
+
+        # Earliest point where the weighted count falls back under the limit
+        if current < limit:
+            free_at = 1 - (limit - current) / previous
+        else:
+            free_at = 1 + (1 - limit / current)
+        return max(1, math.ceil((free_at - elapsed) * self.window_seconds))
+
+    def enforce(self, *checks: Tuple[str, int], cost: int = 1) -> None:
+        """Raise 429 with Retry-After if any (key, limit) pair is exhausted"""
+        waits = [self.check(key, limit, cost=cost) for key, limit in checks]
+        waits = [wait for wait in waits if wait is not None]
+        if waits:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(max(waits))},
+            )
+
+    def clear(self) -> None:
+        self.store.clear()
+        self.allowed = self.rejected = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+rate_limiter = RateLimiter(InMemoryStore(settings.RATE_LIMIT_MAX_KEYS), settings.RATE_LIMIT_WINDOW_SECONDS)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+# Checks only touch in-memory counters, so the dependencies are async and
+# skip the threadpool hop
+async def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()) -> None:
+    """Limit login attempts per client IP and per account from that IP, before any bcrypt work"""
+    if settings.RATE_LIMIT_ENABLED:
+        ip = client_ip(request)
+        # Keyed on the IP too: a per-account key alone would let anyone lock a
+        # user out by sending wrong passwords for their email
+        rate_limiter.enforce(
+            (f"login:ip:{ip}", settings.LOGIN_RATE_LIMIT_PER_IP),
+            (f"login:user:{form_data.username.lower()}:ip:{ip}", settings.LOGIN_RATE_LIMIT_PER_USER),
+        )
+
+
+async def limit_register(request: Request) -> None:
+    """Limit registrations per client IP"""
+    if settings.RATE_LIMIT_ENABLED:
+        rate_limiter.enforce(
+            (f"register:ip:{client_ip(request)}", settings.REGISTER_RATE_LIMIT_PER_IP),
+        )
+
+
+def reservation_limiter(user_dependency: Callable[..., models.User]):
+    """Dependency limiting reservation creation per user and per client IP"""
+    async def limit_reservations(
+        request: Request,
+        current_user: models.User = Depends(user_dependency)
+    ) -> None:
+        if settings.RATE_LIMIT_ENABLED:
+            rate_limiter.enforce(
+                (f"reservations:user:{current_user.id}", settings.RESERVATION_RATE_LIMIT_PER_USER),
+                (f"reservations:ip:{client_ip(request)}", settings.RESERVATION_RATE_LIMIT_PER_IP),
+            )
+    return limit_reservations
+
+
+limit_reservations = reservation_limiter(get_current_user)
+
+
+def limit_reservation_items(request: Request, current_user: models.User, items: int) -> None:
+    """Charge every item of a batch or series, so one request cannot book past the limits"""
+    if settings.RATE_LIMIT_ENABLED:
+        rate_limiter.enforce(
+            (f"reservation-items:user:{current_user.id}", settings.RESERVATION_ITEM_RATE_LIMIT_PER_USER),
+            (f"reservation-items:ip:{client_ip(request)}", settings.RESERVATION_ITEM_RATE_LIMIT_PER_IP),
+            cost=items,
+        )
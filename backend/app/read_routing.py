@@ -0,0 +1,90 @@
+"""
+Read-your-writes routing between the primary and a read replica
+
+A commit made on behalf of a user pins that user to the primary for
+REPLICA_LAG_SECONDS, so their next reads see what they just wrote even if
+the replica has not caught up yet. Everyone else reads the replica.
+"""
+import time
+from threading import Lock
+from typing import Dict, Optional
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+
+
+class RecentWriters:
+    """User ids that committed a write within the last `window_seconds`"""
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._pins: Dict[str, float] = {}
+        self._lock = Lock()
+        self._next_prune = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pins)
+
+    def pin(self, user_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._pins[user_id] = now + self.window_seconds
+            if now >= self._next_prune:
+                # Expired pins are dropped at most once per window
+                self._pins = {key: until for key, until in self._pins.items() if until > now}
+                self._next_prune = now + self.window_seconds
+
+    def is_pinned(self, user_id: str) -> bool:
+        until = self._pins.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pins.clear()
+            self._next_prune = 0.0
+
+
+recent_writers = RecentWriters(settings.REPLICA_LAG_SECONDS)
+
+
+def track_writer(db: Session, user_id: str) -> None:
+    """Pin `user_id` to the primary whenever this session commits"""
+    db.info.update(user_id=user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_committed_writer(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        recent_writers.pin(user_id)
+
+
+def request_user_id(request: Request) -> Optional[str]:
+    """
+    Subject of the request's bearer token, without verifying it.
+
+    Only used to pick a database; authorization still goes through
+    get_current_user.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+def reads_primary(request: Request) -> bool:
+    """Whether this request must read the primary to see its own writes"""
+    if not len(recent_writers):
+        return False
+    user_id = request_user_id(request)
+    return user_id is not None and recent_writers.is_pinned(user_id)
+
+
+def replica_lag(db: Session) -> float:
+    """How far behind the primary the data read through `db` may be"""
+    return settings.REPLICA_LAG_SECONDS if db.info.get("replica") else 0.0
@@ -0,0 +1,245 @@
+"""
+In-memory per-court, per-day interval index for reservation overlap checks
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date as date_type, datetime, timedelta
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+
+BucketKey = Tuple[str, date_type]
+
+
+def _day(value) -> date_type:
+    """Normalize a datetime/date value to the calendar day used as bucket key"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _naive(value: datetime) -> datetime:
+    """Drop tzinfo the same way the SQLite DateTime column does on storage"""
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+class IntervalBucket:
+    """
+    [start, end) intervals of one court on one day, sorted by start.
+
+    Stored intervals may overlap each other (older rows, or double bookings
+    from concurrent writers), so `max_ends[i]` keeps the latest end among
+    the first i + 1 intervals.
+    """
+
+    __slots__ = ("starts", "ends", "ids", "max_ends")
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.ids: List[str] = []
+        self.max_ends: List[datetime] = []
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        start, end = _naive(start), _naive(end)
+        # Every interval starting before the requested end is a candidate;
+        # one of them collides iff the latest of their ends is after start.
+        idx = bisect_left(self.starts, end)
+        return idx > 0 and self.max_ends[idx - 1] > start
+
+    def _refresh_max_ends(self, idx: int) -> None:
+        del self.max_ends[idx:]
+        running = self.max_ends[-1] if self.max_ends else None
+        for end in self.ends[idx:]:
+            running = end if running is None or end > running else running
+            self.max_ends.append(running)
+
+    def add(self, reservation_id: str, start: datetime, end: datetime) -> None:
+        if reservation_id in self.ids:
+            return
+        start, end = _naive(start), _naive(end)
+        idx = bisect_left(self.starts, start)
+        self.starts.insert(idx, start)
+        self.ends.insert(idx, end)
+        self.ids.insert(idx, reservation_id)
+        self._refresh_max_ends(idx)
+
+    def remove(self, reservation_id: str) -> bool:
+        try:
+            idx = self.ids.index(reservation_id)
+        except ValueError:
+            return False
+        del self.starts[idx]
+        del self.ends[idx]
+        del self.ids[idx]
+        self._refresh_max_ends(idx)
+        return True
+
+
+class _PendingLoad:
+    """Writes that landed while a cold bucket was being read from the database"""
+
+    __slots__ = ("loaders", "writes")
+
+    def __init__(self):
+        self.loaders = 0
+        self.writes: List[Callable[[IntervalBucket], object]] = []
+
+
+class ReservationIndex:
+    """
+    Answers "does [start, end) collide?" for a court/day without a DB round trip.
+
+    Buckets are warm-loaded at startup and kept in sync by this process's
+    reservation write paths, so the index is only correct when a single
+    process writes reservations: writes made by other workers never reach
+    it. A bucket that is not loaded yet is filled from the database on first
+    use. At most `max_buckets` buckets are kept (least recently used go
+    first), and buckets of past days are answered but not kept. Writes
+    that commit while a bucket is being loaded are replayed onto it before
+    it is used, so the load cannot publish a bucket missing them.
+    """
+
+    def __init__(self, max_buckets: int = 100_000):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[BucketKey, IntervalBucket]" = OrderedDict()
+        self._loading: Dict[BucketKey, _PendingLoad] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def is_loaded(self, court_id: str, day) -> bool:
+        return (court_id, _day(day)) in self._buckets
+
+    def load(self, reservations: Iterable[models.Reservation]) -> int:
+        """Bulk load active reservations; returns how many were indexed"""
+        count = 0
+        with self._lock:
+            for reservation in reservations:
+                if reservation.status == models.ReservationStatus.CANCELLED:
+                    continue
+                key = (reservation.court_id, _day(reservation.date))
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._store(key, IntervalBucket())
+                bucket.add(reservation.id, reservation.start_time, reservation.end_time)
+                count += 1
+        return count
+
+    def _store(self, key: BucketKey, bucket: IntervalBucket) -> IntervalBucket:
+        """Keep `bucket` (lock held), evicting the least recently used ones"""
+        self._buckets[key] = bucket
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def warm_load(self, db: Session, since: Optional[date_type] = None) -> int:
+        """Load every active reservation dated on or after `since` (default: today)"""
+        since = since or datetime.utcnow().date()
+        reservations = db.query(
+            models.Reservation.id,
+            models.Reservation.court_id,
+            models.Reservation.date,
+            models.Reservation.start_time,
+            models.Reservation.end_time,
+            models.Reservation.status
+        ).filter(
+            models.Reservation.date >= datetime.combine(since, datetime.min.time()),
+            models.Reservation.status != models.ReservationStatus.CANCELLED
+        ).yield_per(10_000)
+        return self.load(reservations)
+
+    def _load_bucket(self, db: Session, court_id: str, day: date_type) -> IntervalBucket:
+        day_start = datetime.combine(day, datetime.min.time())
+        rows = db.query(
+            models.Reservation.id,
+            models.Reservation.start_time,
+            models.Reservation.end_time
+        ).filter(
+            models.Reservation.court_id == court_id,
+            models.Reservation.date >= day_start,
+            models.Reservation.date < day_start + timedelta(days=1),
+            models.Reservation.status != models.ReservationStatus.CANCELLED
+        ).all()
+        bucket = IntervalBucket()
+        for reservation_id, start, end in rows:
+            bucket.add(reservation_id, start, end)
+        return bucket
+
+    def has_overlap(
+        self,
+        db: Session,
+        court_id: str,
+        day,
+        start: datetime,
+        end: datetime
+    ) -> bool:
+        """Check [start, end) against the court's reservations for that day"""
+        key = (court_id, _day(day))
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._buckets.move_to_end(key)
+                return bucket.overlaps(start, end)
+            pending = self._loading.setdefault(key, _PendingLoad())
+            pending.loaders += 1
+        try:
+            loaded = self._load_bucket(db, court_id, key[1])
+        except BaseException:
+            with self._lock:
+                self._done_loading(key, pending)
+            raise
+        with self._lock:
+            # In the same critical section as publishing, so no write falls in between
+            self._done_loading(key, pending)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # Adds are idempotent and removes of unknown ids are no-ops, so
+                # replaying writes the snapshot already saw is harmless
+                for write in pending.writes:
+                    write(loaded)
+                bucket = loaded
+                if key[1] >= datetime.utcnow().date():
+                    self._store(key, bucket)
+            return bucket.overlaps(start, end)
+
+    def _done_loading(self, key: BucketKey, pending: _PendingLoad) -> None:
+        pending.loaders -= 1
+        if not pending.loaders:
+            del self._loading[key]
+
+    def _write(self, key: BucketKey, write: Callable[[IntervalBucket], object]) -> None:
+        """Apply `write` to the bucket if loaded, or queue it for loads in flight (lock held)"""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            write(bucket)
+        elif key in self._loading:
+            self._loading[key].writes.append(write)
+
+    def add(self, reservation: models.Reservation) -> None:
+        """Record a newly committed reservation (only if its bucket is loaded or loading)"""
+        key = (reservation.court_id, _day(reservation.date))
+        reservation_id, start, end = reservation.id, reservation.start_time, reservation.end_time
+        with self._lock:
+            self._write(key, lambda bucket: bucket.add(reservation_id, start, end))
+
+    def remove(self, reservation: models.Reservation) -> None:
+        """Forget a cancelled reservation"""
+        key = (reservation.court_id, _day(reservation.date))
+        reservation_id = reservation.id
+        with self._lock:
+            self._write(key, lambda bucket: bucket.remove(reservation_id))
+
+    def discard_court(self, court_id: str) -> None:
+        """Drop every bucket of a court (e.g. when the court is deleted)"""
+        with self._lock:
+            for key in [key for key in self._buckets if key[0] == court_id]:
+                del self._buckets[key]
+
+
+reservation_index = ReservationIndex(settings.RESERVATION_INDEX_MAX_BUCKETS)
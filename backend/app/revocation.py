@@ -0,0 +1,155 @@
+"""
+Token revocation list screened by an in-process bloom filter
+
+Revoked token ids (`jti`) live in the revoked_tokens table. The filter
+answers "definitely not revoked" for almost every token without touching
+the database; only filter hits are checked exactly against the table.
+
+Each worker has its own filter. Revocations made by other workers are
+pulled from the table at most every REVOCATION_SYNC_SECONDS, so a logout
+reaches every worker within that interval.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Iterable, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (no deletes, no false negatives)"""
+
+    def __init__(self, bits: int, hashes: int):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, value: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._array[position >> 3] >> (position & 7) & 1 for position in self._positions(value))
+
+
+# Each sync re-reads this far before the previous one, for rows committed
+# late or stamped by a worker whose clock lags behind
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class RevocationList:
+    def __init__(self, bits: int, hashes: int, sync_seconds: float = 0):
+        self.bits = bits
+        self.hashes = hashes
+        self.sync_seconds = sync_seconds
+        self._filter = BloomFilter(bits, hashes)
+        self._lock = Lock()
+        self._synced_at = float("-inf")
+        self._synced_until: Optional[datetime] = None
+        self.screened = 0
+        self.exact_checks = 0
+        self.false_positives = 0
+
+    def load(self, db: Session) -> int:
+        """Drop expired revocations and rebuild the filter from the rest"""
+        now = datetime.utcnow()
+        db.query(models.RevokedToken).filter(models.RevokedToken.expires_at <= now).delete()
+        db.commit()
+        fresh = BloomFilter(self.bits, self.hashes)
+        count = 0
+        for (jti,) in db.query(models.RevokedToken.jti).yield_per(10000):
+            fresh.add(jti)
+            count += 1
+        with self._lock:
+            self._filter = fresh
+            self._synced_at = time.monotonic()
+            self._synced_until = now
+        return count
+
+    def sync(self, db: Session) -> int:
+        """Add revocations committed since the last load or sync (e.g. by other workers)"""
+        now = datetime.utcnow()
+        with self._lock:
+            since = self._synced_until
+        query = db.query(models.RevokedToken.jti)
+        if since is not None:
+            query = query.filter(models.RevokedToken.revoked_at >= since - SYNC_OVERLAP)
+        jtis = [jti for (jti,) in query]
+        with self._lock:
+            for jti in jtis:
+                self._filter.add(jti)
+            self._synced_until = now
+        return len(jtis)
+
+    def _sync_due(self) -> bool:
+        """Claim the next sync if REVOCATION_SYNC_SECONDS have passed since the last one"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._synced_at < self.sync_seconds:
+                return False
+            self._synced_at = now
+            return True
+
+    def revoke(self, db: Session, jti: str, user_id: str, expires_at: datetime) -> bool:
+        """
+        Persist a revocation and commit it.
+
+        Returns False if the token was already revoked; the primary key makes
+        this the atomic claim used by refresh token rotation.
+        """
+        db.add(models.RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+        with self._lock:
+            self._filter.add(jti)
+        return True
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        if self._sync_due():
+            self.sync(db)
+        with self._lock:
+            self.screened += 1
+            if jti not in self._filter:
+                return False
+            self.exact_checks += 1
+        revoked = db.query(models.RevokedToken.jti).filter(models.RevokedToken.jti == jti).first() is not None
+        if not revoked:
+            with self._lock:
+                self.false_positives += 1
+        return revoked
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filter = BloomFilter(self.bits, self.hashes)
+            self._synced_at = float("-inf")
+            self._synced_until = None
+            self.screened = self.exact_checks = self.false_positives = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "screened": self.screened,
+                "exact_checks": self.exact_checks,
+                "false_positives": self.false_positives,
+            }
+
+
+revocation_list = RevocationList(
+    settings.REVOCATION_FILTER_BITS,
+    settings.REVOCATION_FILTER_HASHES,
+    settings.REVOCATION_SYNC_SECONDS
+)
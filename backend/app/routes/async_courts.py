@@ -0,0 +1,41 @@
+"""
+Async variants of the hot court routes, served when DATABASE_ASYNC is on
+
+They share their logic with app/routes/courts.py; AsyncSession.run_sync
+runs it on the async connection without occupying a threadpool thread.
+"""
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.concurrency import concurrency_exempt
+from app.database import get_async_db
+from app import models, schemas
+from app.routes.courts import get_available_slots
+
+router = APIRouter(prefix="/api/courts", tags=["Courts"])
+
+
+@router.get("", response_model=List[schemas.CourtResponse])
+@router.get("/", response_model=List[schemas.CourtResponse])
+@concurrency_exempt
+async def get_all_courts_async(db: AsyncSession = Depends(get_async_db)):
+    """Get all active courts"""
+    result = await db.execute(
+        select(models.Court)
+        .options(joinedload(models.Court.sport))
+        .where(models.Court.is_active == True)
+    )
+    return result.scalars().all()
+
+
+@router.get("/{court_id}/available-slots")
+@concurrency_exempt
+async def get_available_slots_async(
+    court_id: str,
+    date: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get available time slots for a court on a specific date"""
+    return await db.run_sync(lambda session: get_available_slots(court_id, date, session))
@@ -0,0 +1,76 @@
+"""
+Async variants of the hot reservation routes, served when DATABASE_ASYNC is on
+
+They share their logic with app/routes/reservations.py; AsyncSession.run_sync
+runs it on the async connection without occupying a threadpool thread.
+"""
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.concurrency import concurrency_exempt
+from app.config import settings
+from app.database import get_async_db
+from app import models, schemas
+from app.auth import get_current_user_async
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.rate_limit import reservation_limiter
+from app.routes.reservations import (
+    BookingWrite,
+    book_reservation,
+    get_my_reservations,
+    queue_unavailable,
+    reservation_writes
+)
+from app.write_queue import WriteQueueTimeout
+
+router = APIRouter(prefix="/api/reservations", tags=["Reservations"])
+
+limit_reservations = reservation_limiter(get_current_user_async)
+
+
+@router.post(
+    "",
+    response_model=schemas.ReservationResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_reservations)]
+)
+@router.post(
+    "/",
+    response_model=schemas.ReservationResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_reservations)]
+)
+@concurrency_exempt
+async def create_reservation_async(
+    reservation_data: schemas.ReservationCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    """Create a new reservation"""
+    if settings.RESERVATION_WRITE_QUEUE_ENABLED:
+        try:
+            return await reservation_writes.run_async(BookingWrite(reservation_data, current_user.id))
+        except WriteQueueTimeout:
+            raise queue_unavailable()
+    return await db.run_sync(book_reservation, reservation_data, current_user.id)
+
+
+@router.get("/my-reservations", response_model=List[schemas.ReservationWithDetails])
+@concurrency_exempt
+async def get_my_reservations_async(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    status_filter: Optional[schemas.ReservationStatus] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    """Get current user's reservations, newest first, one page at a time"""
+    return await db.run_sync(
+        lambda session: get_my_reservations(
+            response, cursor, limit, date_from, date_to, status_filter, session, current_user
+        )
+    )
@@ -1,24 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from uuid import uuid4
+from app.config import settings
 from app.database import get_db
 from app import models, schemas
 from app.auth import (
     get_password_hash,
-    verify_password,
-    create_access_token,
-    get_current_user
+    get_password_hash_pooled,
+    verify_password_pooled,
+    create_token_pair,
+    decode_token,
+    decode_refresh_token,
+    get_current_user,
+    oauth2_scheme,
+    token_expiry,
+    get_current_admin_user
 )
+from app.hashing_pool import HashingPoolFull, hashing_pool
+from app.password_cost import password_cost
+from app.principal_cache import principal_cache
+from app.rate_limit import limit_login, limit_register
+from app.revocation import revocation_list
+from app.token_keys import token_keys
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
-@router.post("/register", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
+@router.post(
+    "/register",
+    response_model=schemas.UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_register)]
+)
+async def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
+    # Database work runs in the request threadpool, bcrypt on the hashing pool
+    def find_user():
+        return db.query(models.User).filter(models.User.email == user_data.email).first()
+    
     # Check if user already exists
-    existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
+    existing_user = await run_in_threadpool(find_user)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -29,43 +52,143 @@ def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     new_user = models.User(
         id=str(uuid4()),
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_pooled(user_data.password),
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         phone=user_data.phone,
         role=models.UserRole.USER
     )
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    def save_user():
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+    
+    await run_in_threadpool(save_user)
     
     return new_user
 
 
-@router.post("/login", response_model=schemas.Token)
-def login(
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(limit_login)])
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """Login user and return JWT token"""
     # Find user by email (username field in form)
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
+    def find_user():
+        return db.query(models.User).filter(models.User.email == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(find_user)
+    
+    if not user or not await verify_password_pooled(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token = create_access_token(data={"sub": user.id})
+    # Upgrade hashes made at another work factor while we know the password
+    if password_cost.needs_rehash(user.hashed_password):
+        try:
+            new_hash = await hashing_pool.run(get_password_hash, form_data.password)
+        except HashingPoolFull:
+            new_hash = None
+        if new_hash is not None:
+            def save_hash():
+                user.hashed_password = new_hash
+                db.commit()
+            
+            await run_in_threadpool(save_hash)
+    
+    return create_token_pair(user.id)
+
+
+@router.post("/refresh", response_model=schemas.Token)
+def refresh(request: schemas.RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access/refresh token pair"""
+    payload = decode_refresh_token(request.refresh_token)
+    user = db.query(models.User).filter(models.User.id == payload["sub"]).first()
+    
+    # Rotation: each refresh token is spent exactly once
+    if user is None or not revocation_list.revoke(db, payload["jti"], user.id, token_expiry(payload)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return create_token_pair(user.id)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    request: schemas.LogoutRequest = Body(default=schemas.LogoutRequest()),
+    token: str = Depends(oauth2_scheme),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke the current access token and, if given, its refresh token"""
+    payload = decode_token(token)
+    if payload.get("jti"):
+        revocation_list.revoke(db, payload["jti"], current_user.id, token_expiry(payload))
+    principal_cache.invalidate_token(token)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    if request.refresh_token:
+        refresh_payload = decode_refresh_token(request.refresh_token)
+        if refresh_payload["sub"] == current_user.id:
+            revocation_list.revoke(db, refresh_payload["jti"], current_user.id, token_expiry(refresh_payload))
 
 
 @router.get("/me", response_model=schemas.UserResponse)
 def get_current_user_profile(current_user: models.User = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
+
+
+@router.get("/hashing-pool/stats")
+def get_hashing_pool_stats(current_user: models.User = Depends(get_current_admin_user)):
+    """Get password hashing pool queue depth and wait times (Admin only)"""
+    return hashing_pool.stats()
+
+
+@router.get("/jwks.json")
+def get_jwks(response: Response):
+    """Public token verification keys as a JWK Set"""
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return token_keys.jwks()
+
+
+@router.post("/keys/rotate")
+def rotate_signing_key(current_user: models.User = Depends(get_current_admin_user)):
+    """Start signing with a new key; older keys keep verifying (Admin only)"""
+    if not token_keys.asymmetric:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Key rotation needs an asymmetric ALGORITHM"
+        )
+    if token_keys.pinned:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The signing key is pinned by JWT_ACTIVE_KID"
+        )
+    kid = token_keys.rotate(settings.JWT_KEYS_DIR or None)
+    return {"kid": kid}
+
+
+@router.post("/keys/{kid}/retire", status_code=status.HTTP_204_NO_CONTENT)
+def retire_signing_key(kid: str, current_user: models.User = Depends(get_current_admin_user)):
+    """Stop accepting tokens signed with an old key (Admin only)"""
+    if not token_keys.asymmetric:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Key rotation needs an asymmetric ALGORITHM"
+        )
+    if kid not in token_keys:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown signing key")
+    try:
+        token_keys.retire(kid, settings.JWT_KEYS_DIR or None)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    # Cached principals may come from tokens signed with the retired key
+    principal_cache.clear()
@@ -1,32 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import uuid4
-from app.database import get_db
+from datetime import date as date_type, datetime, timedelta
+from app.database import get_db, get_read_db
 from app import models, schemas
 from app.auth import get_current_admin_user
+from app.availability import court_template, find_free_slots, local_now
+from app.availability_cache import (
+    availability_cache,
+    cached_day_occupancy,
+    cached_occupancy_matrix
+)
+from app.reservation_index import reservation_index
 
 router = APIRouter(prefix="/api/courts", tags=["Courts"])
 
+# Longest date range served by the availability matrix and slot search
+MAX_RANGE_DAYS = 31
+
+
+def parse_date_range(date_from: str, date_to: str) -> Tuple[date_type, date_type]:
+    """Parse and bound a YYYY-MM-DD date range"""
+    try:
+        first_day = datetime.strptime(date_from, "%Y-%m-%d").date()
+        last_day = datetime.strptime(date_to, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD"
+        )
+    
+    days = (last_day - first_day).days + 1
+    if days < 1 or days > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must cover between 1 and {MAX_RANGE_DAYS} days"
+        )
+    return first_day, last_day
+
 
 @router.get("", response_model=List[schemas.CourtResponse])
 @router.get("/", response_model=List[schemas.CourtResponse])
-def get_all_courts(db: Session = Depends(get_db)):
+def get_all_courts(db: Session = Depends(get_read_db)):
     """Get all active courts"""
     courts = db.query(models.Court).filter(models.Court.is_active == True).all()
     return courts
 
 
+@router.get("/availability", response_model=schemas.AvailabilityMatrixResponse)
+def get_availability_matrix(
+    date_from: str,
+    date_to: str,
+    sport_id: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get slot occupancy for every active court across a date range"""
+    first_day, last_day = parse_date_range(date_from, date_to)
+    days = (last_day - first_day).days + 1
+    
+    query = db.query(models.Court).filter(models.Court.is_active == True)
+    if sport_id is not None:
+        query = query.filter(models.Court.sport_id == sport_id)
+    courts = query.order_by(models.Court.name).all()
+    
+    dates = [first_day + timedelta(days=d) for d in range(days)]
+    matrix = cached_occupancy_matrix(db, courts, first_day, last_day)
+    
+    # Courts sharing a schedule share a template entry
+    template_ids = {}
+    slot_templates = []
+    court_rows = []
+    for court in courts:
+        day_templates = []
+        for day in dates:
+            template = court_template(court, day)
+            if template is None:
+                day_templates.append(None)
+                continue
+            if id(template) not in template_ids:
+                template_ids[id(template)] = len(slot_templates)
+                slot_templates.append([slot["label"] for slot in template.slots])
+            day_templates.append(template_ids[id(template)])
+        court_rows.append(schemas.CourtOccupancy(
+            court_id=court.id,
+            name=court.name,
+            sport_id=court.sport_id,
+            templates=day_templates,
+            occupied=matrix[court.id]
+        ))
+    
+    return schemas.AvailabilityMatrixResponse(
+        dates=[day.isoformat() for day in dates],
+        slot_templates=slot_templates,
+        courts=court_rows
+    )
+
+
+@router.get("/search", response_model=List[schemas.SlotSearchResult])
+def search_free_slots(
+    sport_id: str,
+    date_from: str,
+    date_to: str,
+    duration_minutes: int = Query(60, ge=15, le=480),
+    max_price: Optional[float] = Query(None, gt=0),
+    location: Optional[str] = None,
+    not_before: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Find the earliest free slots of a sport across all matching courts"""
+    first_day, last_day = parse_date_range(date_from, date_to)
+    if not_before is None:
+        # Openings that already started cannot be booked
+        not_before = local_now()
+    
+    query = db.query(models.Court).filter(
+        models.Court.is_active == True,
+        models.Court.sport_id == sport_id
+    )
+    if max_price is not None:
+        query = query.filter(models.Court.price_per_hour <= max_price)
+    if location:
+        query = query.filter(models.Court.location.ilike(f"%{location}%"))
+    courts = query.all()
+    
+    matrix = cached_occupancy_matrix(db, courts, first_day, last_day)
+    openings = find_free_slots(courts, matrix, first_day, duration_minutes, limit, not_before)
+    
+    return [
+        schemas.SlotSearchResult(
+            court_id=court.id,
+            court_name=court.name,
+            location=court.location,
+            date=start.date().isoformat(),
+            start_time=start,
+            end_time=end,
+            total_price=(end - start).total_seconds() / 3600 * court.price_per_hour
+        )
+        for start, end, court in openings
+    ]
+
+
+@router.get("/availability/cache-stats")
+def get_availability_cache_stats(
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """Get availability cache counters (Admin only)"""
+    return availability_cache.stats()
+
+
 @router.get("/{court_id}/available-slots")
 def get_available_slots(
     court_id: str,
     date: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get available time slots for a court on a specific date"""
-    from datetime import datetime
-    from sqlalchemy import cast, Date
-    
     # Verify court exists
     court = db.query(models.Court).filter(models.Court.id == court_id).first()
     if not court:
@@ -44,65 +174,29 @@ def get_available_slots(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Define all possible time slots (12:00 to 20:00)
-    all_slots = [
-        {"start": "12:00", "end": "13:00", "label": "12:00 - 13:00"},
-        {"start": "13:00", "end": "14:00", "label": "13:00 - 14:00"},
-        {"start": "14:00", "end": "15:00", "label": "14:00 - 15:00"},
-        {"start": "15:00", "end": "16:00", "label": "15:00 - 16:00"},
-        {"start": "16:00", "end": "17:00", "label": "16:00 - 17:00"},
-        {"start": "17:00", "end": "18:00", "label": "17:00 - 18:00"},
-        {"start": "18:00", "end": "19:00", "label": "18:00 - 19:00"},
-        {"start": "19:00", "end": "20:00", "label": "19:00 - 20:00"},
-    ]
+    template = court_template(court, reservation_date)
+    if template is None:
+        return {
+            "court_id": court_id,
+            "date": date,
+            "available_slots": [],
+            "reserved_count": 0
+        }
     
-    # Get all reservations for this court with CONFIRMED or PENDING status
-    all_reservations = db.query(models.Reservation).filter(
-        models.Reservation.court_id == court_id,
-        models.Reservation.status.in_(["CONFIRMED", "PENDING"])
-    ).all()
-    
-    # Filter reservations for the specific date manually (more reliable)
-    reservations = []
-    for res in all_reservations:
-        # Handle both datetime and date objects
-        res_date = res.date.date() if hasattr(res.date, 'date') else res.date
-        if res_date == reservation_date:
-            reservations.append(res)
-    
-    # Create a set of reserved slots
-    reserved_slots = set()
-    for reservation in reservations:
-        # Ensure we're working with datetime objects
-        start_dt = reservation.start_time
-        end_dt = reservation.end_time
-        
-        # Handle both datetime and string formats
-        if isinstance(start_dt, str):
-            start_dt = datetime.fromisoformat(start_dt.replace('Z', '+00:00'))
-        if isinstance(end_dt, str):
-            end_dt = datetime.fromisoformat(end_dt.replace('Z', '+00:00'))
-        
-        start_time = start_dt.strftime("%H:%M")
-        end_time = end_dt.strftime("%H:%M")
-        reserved_slots.add(f"{start_time}-{end_time}")
-    
-    # Filter out reserved slots
-    available_slots = [
-        slot for slot in all_slots
-        if f"{slot['start']}-{slot['end']}" not in reserved_slots
-    ]
+    # Only the requested day is read; partially overlapping reservations
+    # block every slot they touch
+    occupancy = cached_day_occupancy(db, court, reservation_date, template)
     
     return {
         "court_id": court_id,
         "date": date,
-        "available_slots": available_slots,
-        "reserved_count": len(reserved_slots)
+        "available_slots": template.available(occupancy),
+        "reserved_count": bin(occupancy).count("1")
     }
 
 
 @router.get("/{court_id}", response_model=schemas.CourtResponse)
-def get_court(court_id: str, db: Session = Depends(get_db)):
+def get_court(court_id: str, db: Session = Depends(get_read_db)):
     """Get court by ID"""
     court = db.query(models.Court).filter(models.Court.id == court_id).first()
     if not court:
@@ -163,6 +257,7 @@ def update_court(
     
     db.commit()
     db.refresh(court)
+    availability_cache.invalidate_court(court_id)
     
     return court
 
@@ -183,5 +278,7 @@ def delete_court(
     
     db.delete(court)
     db.commit()
+    reservation_index.discard_court(court_id)
+    availability_cache.invalidate_court(court_id)
     
     return None
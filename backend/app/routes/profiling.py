@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import List
+from app import models
+from app.auth import get_current_admin_user
+from app.profiling import request_profiles
+
+router = APIRouter(prefix="/api/profiling", tags=["Profiling"])
+
+
+@router.get("/slowest")
+def get_slowest_requests(current_user: models.User = Depends(get_current_admin_user)) -> List[dict]:
+    """Get the slowest recent requests, slowest first (Admin only)"""
+    return [request.as_dict() for request in request_profiles.slowest()]
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str,
+    format: str = "json",
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """Get a request profile as JSON or as folded stacks (Admin only)"""
+    profile = request_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    if format == "folded":
+        return Response(profile.folded(), media_type="text/plain")
+    return profile.report()
@@ -1,24 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, select
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
-from datetime import datetime
-from app.database import get_db
+from datetime import date as date_type, datetime, timedelta
+from app.concurrency import concurrency_exempt
+from app.config import settings
+from app.database import SessionLocal, get_db, get_read_db
+from app.availability import schedule_error
+from app.availability_cache import availability_cache
+from app.export import iter_csv, iter_ndjson
+from app import interval_rtree
+from app.interval_rtree import interval_rtree_enabled
+from app.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor
+)
+from app.rate_limit import limit_reservation_items, limit_reservations
+from app.read_routing import recent_writers
+from app.reservation_index import IntervalBucket, reservation_index
+from app.write_queue import WriteQueue, WriteQueueTimeout
 from app import models, schemas
 from app.auth import get_current_user, get_current_admin_user
 
 router = APIRouter(prefix="/api/reservations", tags=["Reservations"])
 
+# Rows fetched per round trip when streaming the export
+EXPORT_YIELD_PER = 1000
 
-@router.post("", response_model=schemas.ReservationResponse, status_code=status.HTTP_201_CREATED)
-@router.post("/", response_model=schemas.ReservationResponse, status_code=status.HTTP_201_CREATED)
+
+def has_overlapping_reservation(
+    db: Session,
+    court_id: str,
+    date: datetime,
+    start_time: datetime,
+    end_time: datetime
+) -> bool:
+    """Check whether [start_time, end_time) collides with an active reservation"""
+    if interval_rtree_enabled(db.get_bind()):
+        # Authoritative across processes, unlike the per-process index
+        return interval_rtree.has_overlap(db, court_id, start_time, end_time)
+    if settings.RESERVATION_INDEX_ENABLED:
+        return reservation_index.has_overlap(db, court_id, date, start_time, end_time)
+    
+    overlapping = db.query(models.Reservation.id).filter(
+        and_(
+            models.Reservation.court_id == court_id,
+            models.Reservation.date == date,
+            models.Reservation.status != models.ReservationStatus.CANCELLED,
+            models.Reservation.start_time < end_time,
+            models.Reservation.end_time > start_time
+        )
+    ).first()
+    return overlapping is not None
+
+
+def calculate_total_price(court: models.Court, start_time: datetime, end_time: datetime) -> float:
+    """Price of booking a court between two times"""
+    duration_hours = (end_time - start_time).total_seconds() / 3600
+    return duration_hours * court.price_per_hour
+
+
+def load_court_day_buckets(
+    db: Session,
+    keys: Set[Tuple[str, date_type]]
+) -> Dict[Tuple[str, date_type], IntervalBucket]:
+    """Fetch active reservations for many (court_id, day) pairs in one query"""
+    buckets = {key: IntervalBucket() for key in keys}
+    if not keys:
+        return buckets
+    
+    day_filters = []
+    for court_id, day in keys:
+        day_start = datetime.combine(day, datetime.min.time())
+        day_filters.append(and_(
+            models.Reservation.court_id == court_id,
+            models.Reservation.date >= day_start,
+            models.Reservation.date < day_start + timedelta(days=1)
+        ))
+    rows = db.query(
+        models.Reservation.id,
+        models.Reservation.court_id,
+        models.Reservation.date,
+        models.Reservation.start_time,
+        models.Reservation.end_time
+    ).filter(
+        models.Reservation.status != models.ReservationStatus.CANCELLED,
+        or_(*day_filters)
+    ).all()
+    
+    for reservation_id, court_id, day, start_time, end_time in rows:
+        buckets[(court_id, day.date())].add(reservation_id, start_time, end_time)
+    return buckets
+
+
+@router.post(
+    "",
+    response_model=schemas.ReservationResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_reservations)]
+)
+@router.post(
+    "/",
+    response_model=schemas.ReservationResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_reservations)]
+)
 def create_reservation(
     reservation_data: schemas.ReservationCreate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Create a new reservation"""
+    if settings.RESERVATION_WRITE_QUEUE_ENABLED:
+        try:
+            return reservation_writes.run(BookingWrite(reservation_data, current_user.id))
+        except WriteQueueTimeout:
+            raise queue_unavailable()
+    return book_reservation(db, reservation_data, current_user.id)
+
+
+def book_reservation(
+    db: Session,
+    reservation_data: schemas.ReservationCreate,
+    user_id: str
+) -> models.Reservation:
+    """Validate, price and store one reservation; raises HTTPException on failure"""
     # Verify court exists
     court = db.query(models.Court).filter(
         and_(
@@ -33,39 +145,38 @@ def create_reservation(
             detail="Court not found or not active"
         )
     
-    # Check for overlapping reservations
-    overlapping = db.query(models.Reservation).filter(
-        and_(
-            models.Reservation.court_id == reservation_data.court_id,
-            models.Reservation.date == reservation_data.date,
-            models.Reservation.status != models.ReservationStatus.CANCELLED,
-            or_(
-                and_(
-                    models.Reservation.start_time <= reservation_data.start_time,
-                    models.Reservation.end_time > reservation_data.start_time
-                ),
-                and_(
-                    models.Reservation.start_time < reservation_data.end_time,
-                    models.Reservation.end_time >= reservation_data.end_time
-                )
-            )
+    # Validate against the court's slot grid
+    error = schedule_error(
+        court, reservation_data.date, reservation_data.start_time, reservation_data.end_time
+    )
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
         )
-    ).first()
     
-    if overlapping:
+    # Check for overlapping reservations
+    if has_overlapping_reservation(
+        db,
+        reservation_data.court_id,
+        reservation_data.date,
+        reservation_data.start_time,
+        reservation_data.end_time
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="This time slot is already reserved"
         )
     
     # Calculate total price
-    duration_hours = (reservation_data.end_time - reservation_data.start_time).total_seconds() / 3600
-    total_price = duration_hours * court.price_per_hour
+    total_price = calculate_total_price(
+        court, reservation_data.start_time, reservation_data.end_time
+    )
     
     # Create reservation
     new_reservation = models.Reservation(
         id=str(uuid4()),
-        user_id=current_user.id,
+        user_id=user_id,
         court_id=reservation_data.court_id,
         date=reservation_data.date,
         start_time=reservation_data.start_time,
@@ -78,44 +189,480 @@ def create_reservation(
     db.add(new_reservation)
     db.commit()
     db.refresh(new_reservation)
+    reservation_index.add(new_reservation)
+    availability_cache.invalidate(new_reservation.court_id, new_reservation.date.date())
     
     return new_reservation
 
 
+def plan_reservations(
+    db: Session,
+    user_id: Optional[str],
+    items: List[schemas.ReservationCreate],
+    series_id: Optional[str] = None,
+    user_ids: Optional[List[str]] = None
+) -> Tuple[List[schemas.ReservationBatchItemResult], List[models.Reservation]]:
+    """
+    Resolve many reservation requests against the database in two queries.
+    
+    Items belong to `user_id`, or to `user_ids[index]` when given. Returns
+    one result per item and the reservations to insert; nothing is added
+    to the session.
+    """
+    # Fetch every requested court and every existing reservation up front
+    court_ids = {item.court_id for item in items}
+    courts = {
+        court.id: court
+        for court in db.query(models.Court).filter(
+            models.Court.id.in_(court_ids),
+            models.Court.is_active == True
+        )
+    }
+    buckets = load_court_day_buckets(
+        db,
+        {(item.court_id, item.date.date()) for item in items if item.court_id in courts}
+    )
+    
+    results: List[schemas.ReservationBatchItemResult] = []
+    new_reservations: List[models.Reservation] = []
+    for index, item in enumerate(items):
+        court = courts.get(item.court_id)
+        if court is None:
+            results.append(schemas.ReservationBatchItemResult(
+                index=index,
+                status=schemas.BatchItemStatus.COURT_NOT_FOUND,
+                detail="Court not found or not active"
+            ))
+            continue
+        error = schedule_error(court, item.date, item.start_time, item.end_time)
+        if error:
+            results.append(schemas.ReservationBatchItemResult(
+                index=index,
+                status=schemas.BatchItemStatus.INVALID,
+                detail=error
+            ))
+            continue
+        
+        # Earlier items of the same batch count as existing reservations
+        bucket = buckets[(item.court_id, item.date.date())]
+        if bucket.overlaps(item.start_time, item.end_time):
+            results.append(schemas.ReservationBatchItemResult(
+                index=index,
+                status=schemas.BatchItemStatus.CONFLICT,
+                detail="This time slot is already reserved"
+            ))
+            continue
+        
+        new_reservation = models.Reservation(
+            id=str(uuid4()),
+            user_id=user_ids[index] if user_ids else user_id,
+            court_id=item.court_id,
+            date=item.date,
+            start_time=item.start_time,
+            end_time=item.end_time,
+            total_price=calculate_total_price(court, item.start_time, item.end_time),
+            status=models.ReservationStatus.CONFIRMED,
+            notes=item.notes,
+            series_id=series_id
+        )
+        bucket.add(new_reservation.id, item.start_time, item.end_time)
+        new_reservations.append(new_reservation)
+        results.append(schemas.ReservationBatchItemResult(
+            index=index,
+            status=schemas.BatchItemStatus.CREATED
+        ))
+    
+    return results, new_reservations
+
+
+def stage_reservations(
+    db: Session,
+    results: List[schemas.ReservationBatchItemResult],
+    new_reservations: List[models.Reservation]
+) -> None:
+    """Insert planned reservations without committing and attach them to their results"""
+    if not new_reservations:
+        return
+    
+    db.add_all(new_reservations)
+    db.flush()
+    # Serialize before commit so expired attributes are not reloaded row by row
+    created = iter(new_reservations)
+    for result in results:
+        if result.status == schemas.BatchItemStatus.CREATED:
+            result.reservation = schemas.ReservationResponse.model_validate(next(created))
+
+
+def commit_reservations(
+    db: Session,
+    results: List[schemas.ReservationBatchItemResult],
+    new_reservations: List[models.Reservation]
+) -> None:
+    """Insert planned reservations in one transaction and attach them to their results"""
+    if not new_reservations:
+        return
+    
+    stage_reservations(db, results, new_reservations)
+    db.commit()
+    # Sync from the serialized copies; the ORM objects are expired by the commit
+    for result in results:
+        if result.reservation is not None:
+            reservation_index.add(result.reservation)
+            availability_cache.invalidate(result.reservation.court_id, result.reservation.date.date())
+
+
+@dataclass
+class BookingWrite:
+    item: schemas.ReservationCreate
+    user_id: str
+
+
+@dataclass
+class CancellationWrite:
+    reservation_id: str
+    user_id: str
+    is_admin: bool
+
+
+CANCELLED_MESSAGE = {"message": "Reservation cancelled successfully"}
+
+
+def apply_reservation_writes(db: Session, writes: List[Any]) -> List[Any]:
+    """
+    Apply queued bookings and cancellations in one transaction (the queue commits it).
+    
+    Cancellations go first so bookings in the same batch can take the slots
+    they free; bookings are checked against each other like a batch request.
+    Both succeed with the serialized reservation.
+    """
+    outcomes: List[Any] = [None] * len(writes)
+    cancellations = [(i, w) for i, w in enumerate(writes) if isinstance(w, CancellationWrite)]
+    bookings = [(i, w) for i, w in enumerate(writes) if isinstance(w, BookingWrite)]
+    
+    if cancellations:
+        reservations = {
+            reservation.id: reservation
+            for reservation in db.query(models.Reservation).filter(
+                models.Reservation.id.in_({w.reservation_id for _, w in cancellations})
+            )
+        }
+        for index, write in cancellations:
+            reservation = reservations.get(write.reservation_id)
+            if reservation is None:
+                outcomes[index] = HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Reservation not found"
+                )
+            elif reservation.user_id != write.user_id and not write.is_admin:
+                outcomes[index] = HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to cancel this reservation"
+                )
+            else:
+                reservation.status = models.ReservationStatus.CANCELLED
+                outcomes[index] = schemas.ReservationResponse.model_validate(reservation)
+        db.flush()
+    
+    results: List[schemas.ReservationBatchItemResult] = []
+    if bookings:
+        results, new_reservations = plan_reservations(
+            db, None, [w.item for _, w in bookings], user_ids=[w.user_id for _, w in bookings]
+        )
+        stage_reservations(db, results, new_reservations)
+    
+    for (index, write), result in zip(bookings, results):
+        if result.reservation is not None:
+            outcomes[index] = result.reservation
+        else:
+            outcomes[index] = HTTPException(
+                status_code=(
+                    status.HTTP_404_NOT_FOUND
+                    if result.status == schemas.BatchItemStatus.COURT_NOT_FOUND
+                    else status.HTTP_400_BAD_REQUEST
+                ),
+                detail=result.detail
+            )
+    return outcomes
+
+
+def sync_reservation_writes(writes: List[Any], outcomes: List[Any]) -> None:
+    """Update the in-memory index and caches once a batch of queued writes has committed"""
+    for write, outcome in zip(writes, outcomes):
+        if isinstance(outcome, HTTPException):
+            continue
+        if isinstance(write, CancellationWrite):
+            reservation_index.remove(outcome)
+        else:
+            reservation_index.add(outcome)
+        availability_cache.invalidate(outcome.court_id, outcome.date.date())
+        recent_writers.pin(write.user_id)
+
+
+reservation_writes = WriteQueue(
+    apply_reservation_writes,
+    SessionLocal,
+    settings.RESERVATION_WRITE_QUEUE_MAX_BATCH,
+    settings.RESERVATION_WRITE_QUEUE_MAX_WAIT_MS,
+    name="reservation-writer",
+    after_commit=sync_reservation_writes,
+    timeout_seconds=settings.RESERVATION_WRITE_QUEUE_TIMEOUT_SECONDS
+)
+
+
+def queue_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Reservation service is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+@router.post("/batch", response_model=schemas.ReservationBatchResponse, dependencies=[Depends(limit_reservations)])
+def create_reservations_batch(
+    batch_data: schemas.ReservationBatchCreate,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Create many reservations in a single transaction, reporting each item's outcome"""
+    limit_reservation_items(request, current_user, len(batch_data.items))
+    results, new_reservations = plan_reservations(db, current_user.id, batch_data.items)
+    commit_reservations(db, results, new_reservations)
+    
+    return schemas.ReservationBatchResponse(
+        created=len(new_reservations),
+        failed=len(results) - len(new_reservations),
+        results=results
+    )
+
+
+@router.post("/series", response_model=schemas.ReservationSeriesResponse, dependencies=[Depends(limit_reservations)])
+def create_reservation_series(
+    series_data: schemas.ReservationSeriesCreate,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Create a weekly recurring reservation as one set-based operation"""
+    limit_reservation_items(request, current_user, series_data.occurrences)
+    series_id = str(uuid4())
+    items = [
+        schemas.ReservationCreate(
+            court_id=series_data.court_id,
+            date=series_data.date + offset,
+            start_time=series_data.start_time + offset,
+            end_time=series_data.end_time + offset,
+            notes=series_data.notes
+        )
+        for offset in (
+            timedelta(weeks=week * series_data.interval_weeks)
+            for week in range(series_data.occurrences)
+        )
+    ]
+    
+    results, new_reservations = plan_reservations(db, current_user.id, items, series_id)
+    if series_data.allow_partial or len(new_reservations) == len(items):
+        commit_reservations(db, results, new_reservations)
+    else:
+        # All-or-nothing series: report what blocked it and book nothing
+        for result in results:
+            if result.status == schemas.BatchItemStatus.CREATED:
+                result.status = schemas.BatchItemStatus.SKIPPED
+        new_reservations = []
+    
+    return schemas.ReservationSeriesResponse(
+        series_id=series_id if new_reservations else None,
+        created=len(new_reservations),
+        failed=len(results) - len(new_reservations),
+        results=results
+    )
+
+
+def paginate_reservations(
+    query,
+    response: Response,
+    cursor: Optional[str],
+    limit: int,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    status_filter: Optional[schemas.ReservationStatus]
+) -> List[models.Reservation]:
+    """
+    Apply filters and keyset pagination on (date DESC, id DESC).
+    
+    Court, sport and user are joined in the same query so serializing
+    ReservationWithDetails does not lazy-load per row. The cursor for the
+    next page, if any, is returned in the X-Next-Cursor header.
+    """
+    if date_from is not None:
+        query = query.filter(models.Reservation.date >= date_from)
+    if date_to is not None:
+        query = query.filter(models.Reservation.date <= date_to)
+    if status_filter is not None:
+        query = query.filter(models.Reservation.status == status_filter.value)
+    if cursor is not None:
+        try:
+            cursor_date, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(
+            or_(
+                models.Reservation.date < cursor_date,
+                and_(
+                    models.Reservation.date == cursor_date,
+                    models.Reservation.id < cursor_id
+                )
+            )
+        )
+    
+    reservations = query.options(
+        joinedload(models.Reservation.court).joinedload(models.Court.sport),
+        joinedload(models.Reservation.user)
+    ).order_by(
+        models.Reservation.date.desc(),
+        models.Reservation.id.desc()
+    ).limit(limit + 1).all()
+    
+    if len(reservations) > limit:
+        reservations = reservations[:limit]
+        last = reservations[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.date, last.id)
+    
+    return reservations
+
+
 @router.get("/my-reservations", response_model=List[schemas.ReservationWithDetails])
 def get_my_reservations(
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    status_filter: Optional[schemas.ReservationStatus] = Query(None, alias="status"),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Get current user's reservations"""
-    reservations = db.query(models.Reservation).filter(
+    """Get current user's reservations, newest first, one page at a time"""
+    query = db.query(models.Reservation).filter(
         models.Reservation.user_id == current_user.id
-    ).order_by(models.Reservation.date.desc()).all()
+    )
     
-    return reservations
+    return paginate_reservations(
+        query, response, cursor, limit, date_from, date_to, status_filter
+    )
 
 
 @router.get("/all", response_model=List[schemas.ReservationWithDetails])
 def get_all_reservations(
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    status_filter: Optional[schemas.ReservationStatus] = Query(None, alias="status"),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_admin_user)
 ):
-    """Get all reservations (Admin only)"""
-    reservations = db.query(models.Reservation).order_by(
-        models.Reservation.date.desc()
-    ).all()
+    """Get all reservations, newest first, one page at a time (Admin only)"""
+    query = db.query(models.Reservation)
     
-    return reservations
+    return paginate_reservations(
+        query, response, cursor, limit, date_from, date_to, status_filter
+    )
+
+
+@router.get("/export")
+@concurrency_exempt
+def export_reservations(
+    export_format: schemas.ExportFormat = Query(schemas.ExportFormat.NDJSON, alias="format"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    status_filter: Optional[schemas.ReservationStatus] = Query(None, alias="status"),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """Stream all reservations with court, sport and user fields flattened (Admin only)"""
+    query = select(
+        models.Reservation.id,
+        models.Reservation.date,
+        models.Reservation.start_time,
+        models.Reservation.end_time,
+        models.Reservation.status,
+        models.Reservation.total_price,
+        models.Reservation.notes,
+        models.Reservation.series_id,
+        models.Reservation.created_at,
+        models.Reservation.court_id,
+        models.Court.name.label("court_name"),
+        models.Court.location.label("court_location"),
+        models.Sport.name.label("sport_name"),
+        models.Reservation.user_id,
+        models.User.email.label("user_email"),
+        models.User.first_name.label("user_first_name"),
+        models.User.last_name.label("user_last_name")
+    ).join(
+        models.Court, models.Reservation.court_id == models.Court.id
+    ).join(
+        models.Sport, models.Court.sport_id == models.Sport.id
+    ).join(
+        models.User, models.Reservation.user_id == models.User.id
+    ).order_by(
+        models.Reservation.date, models.Reservation.id
+    )
+    if date_from is not None:
+        query = query.where(models.Reservation.date >= date_from)
+    if date_to is not None:
+        query = query.where(models.Reservation.date <= date_to)
+    if status_filter is not None:
+        query = query.where(models.Reservation.status == status_filter.value)
+    
+    # The request session is closed once the endpoint returns, so the
+    # stream uses its own session on the same engine.
+    bind = db.get_bind()
+    
+    def rows():
+        with Session(bind=bind) as stream_db:
+            result = stream_db.execute(
+                query.execution_options(stream_results=True, yield_per=EXPORT_YIELD_PER)
+            )
+            for partition in result.mappings().partitions():
+                yield from partition
+    
+    if export_format == schemas.ExportFormat.CSV:
+        body, media_type = iter_csv(rows()), "text/csv"
+    else:
+        body, media_type = iter_ndjson(rows()), "application/x-ndjson"
+    
+    filename = f"reservations.{export_format.value}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/write-queue/stats")
+def get_write_queue_stats(
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """Get reservation write queue counters (Admin only)"""
+    return reservation_writes.stats()
 
 
 @router.get("/{reservation_id}", response_model=schemas.ReservationWithDetails)
 def get_reservation(
     reservation_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Get reservation by ID"""
-    reservation = db.query(models.Reservation).filter(
+    reservation = db.query(models.Reservation).options(
+        joinedload(models.Reservation.court).joinedload(models.Court.sport),
+        joinedload(models.Reservation.user)
+    ).filter(
         models.Reservation.id == reservation_id
     ).first()
     
@@ -142,6 +689,15 @@ def cancel_reservation(
     current_user: models.User = Depends(get_current_user)
 ):
     """Cancel a reservation"""
+    if settings.RESERVATION_WRITE_QUEUE_ENABLED:
+        try:
+            reservation_writes.run(CancellationWrite(
+                reservation_id, current_user.id, current_user.role == models.UserRole.ADMIN
+            ))
+        except WriteQueueTimeout:
+            raise queue_unavailable()
+        return CANCELLED_MESSAGE
+    
     reservation = db.query(models.Reservation).filter(
         models.Reservation.id == reservation_id
     ).first()
@@ -161,5 +717,7 @@ def cancel_reservation(
     
     reservation.status = models.ReservationStatus.CANCELLED
     db.commit()
+    reservation_index.remove(reservation)
+    availability_cache.invalidate(reservation.court_id, reservation.date.date())
     
-    return {"message": "Reservation cancelled successfully"}
+    return CANCELLED_MESSAGE
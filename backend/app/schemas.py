@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Annotated, Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -53,6 +53,15 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 
 class TokenData(BaseModel):
@@ -78,6 +87,21 @@ class SportResponse(SportBase):
 
 
 # Court Schemas
+TIME_OF_DAY_PATTERN = r"^(([01]\d|2[0-3]):[0-5]\d|24:00)$"
+Weekday = Annotated[int, Field(ge=0, le=6)]
+
+
+class OpeningHours(BaseModel):
+    open: str = Field(..., pattern=TIME_OF_DAY_PATTERN)
+    close: str = Field(..., pattern=TIME_OF_DAY_PATTERN)
+    
+    @model_validator(mode="after")
+    def check_order(self):
+        if self.close <= self.open:
+            raise ValueError("close must be after open")
+        return self
+
+
 class CourtBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -86,6 +110,9 @@ class CourtBase(BaseModel):
     price_per_hour: float = Field(..., gt=0)
     capacity: int = Field(..., gt=0)
     image_url: Optional[str] = None
+    slot_minutes: int = Field(60, ge=15, le=240, multiple_of=15)
+    # Weekday (0 = Monday) -> hours; missing weekdays are closed, None means 12:00-20:00 daily
+    opening_hours: Optional[Dict[Weekday, OpeningHours]] = None
 
 
 class CourtCreate(CourtBase):
@@ -101,6 +128,8 @@ class CourtUpdate(BaseModel):
     capacity: Optional[int] = Field(None, gt=0)
     is_active: Optional[bool] = None
     image_url: Optional[str] = None
+    slot_minutes: Optional[int] = Field(None, ge=15, le=240, multiple_of=15)
+    opening_hours: Optional[Dict[Weekday, OpeningHours]] = None
 
 
 class CourtResponse(CourtBase):
@@ -113,6 +142,33 @@ class CourtResponse(CourtBase):
         from_attributes = True
 
 
+# Availability Schemas
+class CourtOccupancy(BaseModel):
+    court_id: str
+    name: str
+    sport_id: str
+    # Per date: index into slot_templates, or None when the court is closed
+    templates: List[Optional[int]]
+    occupied: List[int]
+
+
+class AvailabilityMatrixResponse(BaseModel):
+    """Bit i of occupied[d] is set when slot i of templates[d] is taken on dates[d]"""
+    dates: List[str]
+    slot_templates: List[List[str]]
+    courts: List[CourtOccupancy]
+
+
+class SlotSearchResult(BaseModel):
+    court_id: str
+    court_name: str
+    location: str
+    date: str
+    start_time: datetime
+    end_time: datetime
+    total_price: float
+
+
 # Reservation Schemas
 class ReservationBase(BaseModel):
     court_id: str
@@ -131,6 +187,7 @@ class ReservationResponse(ReservationBase):
     user_id: str
     total_price: float
     status: ReservationStatus
+    series_id: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -143,3 +200,47 @@ class ReservationWithDetails(ReservationResponse):
     
     class Config:
         from_attributes = True
+
+
+# Batch Reservation Schemas
+class BatchItemStatus(str, Enum):
+    CREATED = "CREATED"
+    CONFLICT = "CONFLICT"
+    COURT_NOT_FOUND = "COURT_NOT_FOUND"
+    INVALID = "INVALID"
+    SKIPPED = "SKIPPED"
+
+
+class ReservationBatchCreate(BaseModel):
+    items: List[ReservationCreate] = Field(..., min_length=1, max_length=500)
+
+
+class ReservationBatchItemResult(BaseModel):
+    index: int
+    status: BatchItemStatus
+    detail: Optional[str] = None
+    reservation: Optional[ReservationResponse] = None
+
+
+class ReservationBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[ReservationBatchItemResult]
+
+
+# Recurring Reservation Schemas
+class ReservationSeriesCreate(ReservationBase):
+    """First occurrence plus how often and how many times it repeats"""
+    occurrences: int = Field(..., ge=1, le=52)
+    interval_weeks: int = Field(1, ge=1, le=4)
+    allow_partial: bool = True
+
+
+class ReservationSeriesResponse(ReservationBatchResponse):
+    series_id: Optional[str] = None
+
+
+# Export Schemas
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
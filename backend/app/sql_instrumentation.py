@@ -0,0 +1,118 @@
+"""
+Per-request SQL instrumentation
+
+Engine hooks count the statements each request runs and the time spent in
+them. The totals go out as a `Server-Timing: db;dur=...` header, statements
+slower than SLOW_QUERY_MS are logged, and a statement shape run
+N_PLUS_ONE_THRESHOLD times or more in one request is flagged as a likely
+N+1 (e.g. a relationship lazy-loaded per row). With
+SQL_INSTRUMENTATION_ENABLED off the hooks are not attached at all, and a
+request costs one settings lookup.
+
+Statements run by other threads on the request's behalf (the reservation
+write queue) are not attributed to it.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class QueryStats:
+    """Statements run while tracking, keyed by their SQL text"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.duration_ms += duration_ms
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes run at least `threshold` times, most repeated first"""
+        if threshold <= 0:
+            return []
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration_ms:.1f};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements run in this context (and threads started from it)"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = getattr(context, "query_started", None)
+    if started is None:
+        # Tracking began while the statement was running
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    stats.record(statement, duration_ms)
+    if 0 < settings.SLOW_QUERY_MS <= duration_ms:
+        logger.warning("Slow query (%.1f ms): %s", duration_ms, statement)
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """Attach the per-request hooks to an engine (the sync side of async ones)"""
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report_repeated_statements(method: str, path: str, stats: QueryStats) -> None:
+    for shape, count in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning("Possible N+1 in %s %s: %d x %s", method, path, count, shape)
+
+
+class SqlInstrumentationMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not settings.SQL_INSTRUMENTATION_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append(SERVER_TIMING_HEADER, stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                report_repeated_statements(scope["method"], scope["path"], stats)
@@ -0,0 +1,277 @@
+"""
+JWT signing and verification keys
+
+HS256 signs with the shared SECRET_KEY. RS256 and ES256 sign with a private
+key whose id travels in the token's `kid` header; any node holding the
+public key set (GET /api/auth/jwks.json) verifies tokens without the
+signing secret and without calling the auth node. Parsed keys are cached
+per kid, so verification never re-parses PEM or JWK data.
+
+Workers sharing JWT_KEYS_DIR pick up each other's rotations and
+retirements by rescanning the directory while in use, at most every
+KEYS_DIR_RESCAN_SECONDS, so a token naming a kid another worker just
+created verifies after at most that long.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from secrets import token_hex
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Set
+from urllib.request import urlopen
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import JWTError, jwk, jwt
+from jose.exceptions import JWKError
+from jose.backends.base import Key
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+# Minimum seconds between JWKS refetches triggered by an unknown kid
+JWKS_REFETCH_SECONDS = 60
+# Minimum seconds between rescans of the keys directory
+KEYS_DIR_RESCAN_SECONDS = 1
+
+
+def generate_private_key_pem(algorithm: str) -> str:
+    """New PKCS#8 PEM private key for RS256 (RSA 2048) or ES256 (P-256)"""
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise ValueError(f"Cannot generate keys for {algorithm}")
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode("ascii")
+
+
+def new_kid() -> str:
+    """Key id that sorts by creation time, down to the microsecond"""
+    return f"{datetime.utcnow():%Y%m%d%H%M%S%f}-{token_hex(4)}"
+
+
+class TokenKeySet:
+    """
+    Keys for one signing algorithm.
+
+    A node with private keys signs with the active one and verifies with
+    all of them; retired keys stay until tokens they signed have expired.
+    Keys loaded from a directory follow it: new files are added, removed
+    files are retired and the newest kid signs unless one is pinned.
+    A verify-only node holds public keys, loaded from a JWKS document and
+    refetched when a token names a kid it has not seen yet; each fetch
+    replaces the fetched keys, so keys the auth node retired stop verifying.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: Optional[str] = None,
+        jwks_fetcher: Optional[Callable[[], dict]] = None
+    ):
+        self.algorithm = algorithm
+        self.asymmetric = algorithm in ASYMMETRIC_ALGORITHMS
+        self._secret = secret
+        self._signing: Dict[str, Key] = {}
+        self._verifying: Dict[str, Key] = {}
+        self.active_kid: Optional[str] = None
+        self._jwks_fetcher = jwks_fetcher
+        self._fetched_at: Optional[float] = None
+        self.keys_dir: Optional[str] = None
+        self._pinned_kid: Optional[str] = None
+        self._dir_kids: Set[str] = set()
+        self._scanned_at = float("-inf")
+        self._lock = Lock()
+        self._scan_lock = Lock()
+
+    def __contains__(self, kid: str) -> bool:
+        return kid in self._verifying
+
+    def add_private_key(self, kid: str, pem: str, activate: bool = True) -> None:
+        key = jwk.construct(pem, self.algorithm)
+        with self._lock:
+            self._signing[kid] = key
+            self._verifying[kid] = key.public_key()
+            if activate or self.active_kid is None:
+                self.active_kid = kid
+
+    def add_public_jwk(self, data: dict) -> None:
+        key = jwk.construct(data, data.get("alg", self.algorithm))
+        with self._lock:
+            self._verifying[data["kid"]] = key
+
+    def rotate(self, keys_dir: Optional[str] = None) -> str:
+        """Generate a key and sign with it from now on; returns its kid"""
+        kid = new_kid()
+        pem = generate_private_key_pem(self.algorithm)
+        if keys_dir:
+            # Written aside and renamed, so a rescanning worker never reads half a key
+            partial = os.path.join(keys_dir, f".{kid}.pem.partial")
+            with open(os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as key_file:
+                key_file.write(pem)
+            os.rename(partial, os.path.join(keys_dir, f"{kid}.pem"))
+        self.add_private_key(kid, pem)
+        return kid
+
+    def retire(self, kid: str, keys_dir: Optional[str] = None) -> None:
+        """Stop accepting tokens signed with `kid`, and remove its key file from `keys_dir`"""
+        if kid == self.active_kid:
+            raise ValueError("Cannot retire the active signing key")
+        if keys_dir:
+            try:
+                os.remove(os.path.join(keys_dir, f"{kid}.pem"))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._signing.pop(kid, None)
+            self._verifying.pop(kid, None)
+            self._dir_kids.discard(kid)
+
+    def load_directory(self, keys_dir: str, active_kid: Optional[str] = None) -> None:
+        """Load `<kid>.pem` private keys; the newest kid signs unless one is named"""
+        self.keys_dir = keys_dir
+        self._pinned_kid = active_kid or None
+        self._scan_directory()
+        if self._pinned_kid and self._pinned_kid not in self._signing:
+            raise ValueError(f"Unknown signing key id {active_kid}")
+
+    @property
+    def pinned(self) -> bool:
+        """Whether the signing key is fixed (JWT_ACTIVE_KID) rather than the newest one"""
+        return self._pinned_kid is not None
+
+    def _scan_directory(self) -> None:
+        self._scanned_at = time.monotonic()
+        kids = sorted(name[:-4] for name in os.listdir(self.keys_dir) if name.endswith(".pem"))
+        for kid in kids:
+            if kid in self._signing:
+                continue
+            try:
+                with open(os.path.join(self.keys_dir, f"{kid}.pem")) as key_file:
+                    self.add_private_key(kid, key_file.read(), activate=False)
+            except (OSError, ValueError, JWKError):
+                logger.warning("Skipping unreadable signing key %s", kid, exc_info=True)
+        with self._lock:
+            for kid in self._dir_kids - set(kids):
+                if kid != self._pinned_kid:
+                    self._signing.pop(kid, None)
+                    self._verifying.pop(kid, None)
+            self._dir_kids = set(kids) & set(self._signing)
+            if self._pinned_kid:
+                self.active_kid = self._pinned_kid
+            elif self._dir_kids:
+                self.active_kid = max(self._dir_kids)
+
+    def _rescan(self) -> None:
+        """Pick up keys other workers added or retired, at most every KEYS_DIR_RESCAN_SECONDS"""
+        if self.keys_dir is None or time.monotonic() - self._scanned_at < KEYS_DIR_RESCAN_SECONDS:
+            return
+        # One thread rescans; the others carry on with the keys they have
+        if self._scan_lock.acquire(blocking=False):
+            try:
+                self._scan_directory()
+            finally:
+                self._scan_lock.release()
+
+    def load_jwks(self, document: dict) -> None:
+        """Verify with the public keys of `document` instead of the previously loaded ones"""
+        fetched = {}
+        for data in document.get("keys", []):
+            if data.get("kid") and data.get("alg", self.algorithm) == self.algorithm:
+                try:
+                    fetched[data["kid"]] = jwk.construct(data, data.get("alg", self.algorithm))
+                except JWKError:
+                    logger.warning("Skipping unreadable public key %s", data["kid"], exc_info=True)
+        with self._lock:
+            # Keys this node signs with stay; fetched keys the document dropped go
+            self._verifying = {
+                kid: key for kid, key in self._verifying.items() if kid in self._signing
+            }
+            self._verifying.update(fetched)
+
+    def jwks(self) -> Dict[str, List[dict]]:
+        """Public keys as a JWK Set"""
+        self._rescan()
+        with self._lock:
+            verifying = list(self._verifying.items())
+        keys = []
+        for kid, key in verifying:
+            data = key.to_dict()
+            data.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+            keys.append(data)
+        return {"keys": keys}
+
+    def encode(self, claims: dict) -> str:
+        if not self.asymmetric:
+            return jwt.encode(claims, self._secret, algorithm=self.algorithm)
+        self._rescan()
+        with self._lock:
+            kid = self.active_kid
+            key = self._signing.get(kid) if kid else None
+        if key is None:
+            raise RuntimeError("No signing key configured")
+        return jwt.encode(claims, key, algorithm=self.algorithm, headers={"kid": kid})
+
+    def decode(self, token: str) -> dict:
+        """Verify a token and return its claims; raises JWTError"""
+        if not self.asymmetric:
+            return jwt.decode(token, self._secret, algorithms=[self.algorithm])
+        kid = jwt.get_unverified_header(token).get("kid")
+        if not kid:
+            raise JWTError("Token has no key id")
+        return jwt.decode(token, self.verification_key(kid), algorithms=[self.algorithm])
+
+    def verification_key(self, kid: str) -> Key:
+        self._rescan()
+        key = self._verifying.get(kid)
+        if key is None and self._jwks_fetcher is not None:
+            now = time.monotonic()
+            if self._fetched_at is None or now - self._fetched_at >= JWKS_REFETCH_SECONDS:
+                self._fetched_at = now
+                try:
+                    document = self._jwks_fetcher()
+                    if not isinstance(document, dict):
+                        raise ValueError("JWKS document is not an object")
+                except (OSError, ValueError) as exc:
+                    # Unreachable or broken key server: reject the token, keep the keys we have
+                    logger.warning("Could not fetch the JWKS document", exc_info=True)
+                    raise JWTError("Could not fetch signing keys") from exc
+                self.load_jwks(document)
+                key = self._verifying.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+        return key
+
+
+def fetch_jwks(url: str) -> Callable[[], dict]:
+    def fetch() -> dict:
+        with urlopen(url, timeout=5) as response:
+            return json.load(response)
+    return fetch
+
+
+def build_token_keys() -> TokenKeySet:
+    """Key set described by the settings"""
+    if settings.ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return TokenKeySet(settings.ALGORITHM, secret=settings.SECRET_KEY)
+
+    fetcher = fetch_jwks(settings.JWT_JWKS_URL) if settings.JWT_JWKS_URL else None
+    keys = TokenKeySet(settings.ALGORITHM, jwks_fetcher=fetcher)
+    if settings.JWT_KEYS_DIR:
+        keys.load_directory(settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID or None)
+    if keys.active_kid is None and fetcher is None:
+        # Development fallback: tokens die with the process and other nodes can't verify them
+        logger.warning("No JWT_KEYS_DIR configured, signing with an ephemeral %s key", settings.ALGORITHM)
+        keys.rotate()
+    return keys
+
+
+token_keys = build_token_keys()
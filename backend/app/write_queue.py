@@ -0,0 +1,204 @@
+"""
+Single-writer queue with group commit
+
+Callers submit write operations and wait on a future. One writer thread
+drains whatever is pending (up to `max_batch`) and applies it in a single
+session, so concurrent writes share one transaction and one commit instead
+of contending for the database lock one by one. Serializing the writes
+also makes their conflict checks race-free within the process.
+
+Every future is settled whatever fails, a writer thread that died is
+replaced on the next submit, and callers stop waiting after
+`timeout_seconds`.
+"""
+import asyncio
+import logging
+import queue
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingWrite:
+    op: Any
+    future: Future
+
+
+# Applies a batch of operations in one session without committing it (the
+# queue commits). Returns one outcome per operation: its result, or an
+# exception to raise to its caller.
+ApplyBatch = Callable[[Session, List[Any]], List[Any]]
+
+# Runs once a batch has committed, with its operations and outcomes (e.g. to
+# update in-memory caches). Its failures are logged: the writes stand.
+AfterCommit = Callable[[List[Any], List[Any]], None]
+
+
+class WriteQueueTimeout(Exception):
+    """Raised when a write is not done after `timeout_seconds`; one already being applied may still commit"""
+
+
+class WriteQueue:
+    def __init__(
+        self,
+        apply_batch: ApplyBatch,
+        session_factory: Callable[[], Session],
+        max_batch: int,
+        max_wait_ms: float = 0.0,
+        name: str = "writer",
+        after_commit: Optional[AfterCommit] = None,
+        timeout_seconds: Optional[float] = None
+    ):
+        self.apply_batch = apply_batch
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self.after_commit = after_commit
+        self.timeout_seconds = timeout_seconds
+        self._queue: "queue.Queue[Optional[PendingWrite]]" = queue.Queue()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+        self.batches = 0
+        self.writes = 0
+        self.largest_batch = 0
+        self.isolated_batches = 0
+
+    def submit(self, op: Any) -> Future:
+        """Queue `op` for the writer thread, starting it on first use"""
+        pending = PendingWrite(op, Future())
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    self._queue = queue.Queue()
+                # A writer that died leaves its queue behind for the new one
+                self._thread = Thread(target=self._run, args=(self._queue,), name=self.name, daemon=True)
+                self._thread.start()
+            self._queue.put(pending)
+        return pending.future
+
+    def run(self, op: Any) -> Any:
+        """Submit `op` and block until its batch has committed"""
+        future = self.submit(op)
+        try:
+            return future.result(self.timeout_seconds)
+        except FutureTimeout:
+            # Still queued: the writer skips it. Already being applied: it may commit
+            future.cancel()
+            raise WriteQueueTimeout(self.name)
+
+    async def run_async(self, op: Any) -> Any:
+        """Await `op` without holding a request thread"""
+        future = self.submit(op)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise WriteQueueTimeout(self.name)
+
+    def _run(self, pending_writes: "queue.Queue[Optional[PendingWrite]]") -> None:
+        while True:
+            first = pending_writes.get()
+            if first is None:
+                return
+            if not first.future.set_running_or_notify_cancel():
+                continue
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            stopping = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    pending = pending_writes.get(timeout=remaining) if remaining > 0 else pending_writes.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stopping = True
+                    break
+                if pending.future.set_running_or_notify_cancel():
+                    batch.append(pending)
+            try:
+                self._apply(batch)
+            except BaseException as exc:
+                # Do not leave callers waiting on a writer that is going away
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(exc)
+                raise
+            if stopping:
+                return
+
+    def _commit(self, ops: List[Any]) -> Tuple[List[Any], bool]:
+        """Apply and commit `ops` in a fresh session: (outcomes, committed)"""
+        try:
+            db = self.session_factory()
+        except Exception as exc:
+            return [exc], False
+        try:
+            outcomes = self.apply_batch(db, ops)
+            db.commit()
+            return outcomes, True
+        except Exception as exc:
+            try:
+                db.rollback()
+            except Exception:
+                logger.exception("%s: rollback failed", self.name)
+            return [exc], False
+        finally:
+            try:
+                db.close()
+            except Exception:
+                logger.exception("%s: closing the session failed", self.name)
+
+    def _apply(self, batch: List[PendingWrite]) -> None:
+        ops = [pending.op for pending in batch]
+        outcomes, committed = self._commit(ops)
+
+        if len(outcomes) != len(batch):
+            # The batch failed as a whole and nothing committed; retry one by
+            # one so a single bad operation cannot fail the writes next to it
+            self.isolated_batches += 1
+            for pending in batch:
+                self._apply([pending])
+            return
+
+        if committed and self.after_commit is not None:
+            try:
+                self.after_commit(ops, outcomes)
+            except Exception:
+                logger.exception("%s: post-commit hook failed", self.name)
+        with self._lock:
+            self.batches += 1
+            self.writes += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+        for pending, outcome in zip(batch, outcomes):
+            if isinstance(outcome, BaseException):
+                pending.future.set_exception(outcome)
+            else:
+                pending.future.set_result(outcome)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": self.batches,
+                "writes": self.writes,
+                "largest_batch": self.largest_batch,
+                "avg_batch": self.writes / self.batches if self.batches else 0.0,
+                "isolated_batches": self.isolated_batches,
+            }
+
+    def shutdown(self) -> None:
+        """Apply what is queued and stop the writer; it restarts on next use"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
@@ -0,0 +1,165 @@
+"""
+Load test: throughput of the hot routes with the sync vs the async engine
+
+Starts uvicorn once per mode against the same SQLite file and drives it with
+`--clients` concurrent HTTP clients issuing a mix of court listings,
+available-slots lookups (distinct days, so mostly cache misses) and
+my-reservations pages.
+
+Usage:
+    python -m benchmarks.bench_async_concurrency --clients 500 --requests 20000 --mode both
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app import models
+from app.auth import create_access_token
+
+COURTS = 20
+DAYS = 365
+
+
+def seed(url):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(models.Sport(id="sport", name="Padel"))
+    db.add(models.User(id="user", email="bench@example.com", hashed_password="x",
+                       first_name="Bench", last_name="User"))
+    for c in range(COURTS):
+        db.add(models.Court(id=f"court-{c}", name=f"Court {c}", sport_id="sport", location="Club",
+                            price_per_hour=100.0, capacity=4, is_active=True))
+    first = datetime(2030, 1, 1)
+    for d in range(DAYS):
+        day = first + timedelta(days=d)
+        for c in range(0, COURTS, 2):
+            start = day + timedelta(hours=12 + d % 8)
+            db.add(models.Reservation(id=f"r-{d}-{c}", user_id="user", court_id=f"court-{c}", date=day,
+                                      start_time=start, end_time=start + timedelta(hours=1),
+                                      total_price=100.0, status=models.ReservationStatus.CONFIRMED))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def port_in_use(port):
+    with socket.socket() as probe:
+        return probe.connect_ex(("127.0.0.1", port)) == 0
+
+
+def wait_until_up(base_url, process):
+    for _ in range(200):
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("uvicorn did not start")
+
+
+async def drive(base_url, clients, requests, headers):
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async def worker(client):
+        nonlocal errors
+        for i in counter:
+            kind = i % 4
+            if kind == 0:
+                url = "/api/courts"
+            elif kind == 3:
+                url = "/api/reservations/my-reservations?limit=20"
+            else:
+                day = date(2030, 1, 1) + timedelta(days=(i // 4) % DAYS)
+                url = f"/api/courts/court-{i % COURTS}/available-slots?date={day}"
+            t0 = time.perf_counter()
+            try:
+                response = await client.get(url, headers=headers)
+                ok = response.status_code == 200
+            except httpx.TransportError:
+                ok = False
+            latencies.append(time.perf_counter() - t0)
+            errors += not ok
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def run_mode(db_url, async_mode, port, clients, requests, headers):
+    env = dict(
+        os.environ,
+        DATABASE_URL=db_url,
+        DATABASE_ASYNC=str(async_mode).lower(),
+        RATE_LIMIT_ENABLED="false",
+        PRINCIPAL_CACHE_TTL_SECONDS="60",
+    )
+    if port_in_use(port):
+        raise RuntimeError(f"Port {port} is already in use")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning", "--backlog", str(clients * 2)],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url, process)
+        return asyncio.run(drive(base_url, clients, requests, headers))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user'})}"}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{tmp}/bench.db"
+        seed(db_url)
+        print(f"{args.clients} concurrent clients, {args.requests} requests")
+        print(f"{'mode':<8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        modes = {"sync": (False,), "async": (True,), "both": (False, True)}[args.mode]
+        for async_mode in modes:
+            result = run_mode(db_url, async_mode, args.port, args.clients, args.requests, headers)
+            name = "async" if async_mode else "sync"
+            print(f"{name:<8} {result['rps']:>8.0f} {result['p50']:>8.1f} {result['p99']:>8.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Load test: authenticated read requests with and without the principal cache
+
+Reports mean latency and SQL statements per request for
+GET /api/reservations/my-reservations.
+
+Usage:
+    python -m benchmarks.bench_auth_fast_path --requests 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+# Startup warm loads read the app's own database: a migrated throwaway file
+APP_DATABASE_DIR = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{APP_DATABASE_DIR.name}/app.db"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, get_db, get_read_db
+from app import models
+from app.auth import create_access_token
+from app.migrate import upgrade_database
+from app.principal_cache import principal_cache
+
+
+def run(client, headers, requests, statements):
+    statements.clear()
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        assert client.get("/api/reservations/my-reservations", headers=headers).status_code == 200
+    elapsed = time.perf_counter() - t0
+    return elapsed / requests * 1000, len(statements) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    upgrade_database()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = Session()
+        db.add(models.User(id="user", email="bench@example.com", hashed_password="x",
+                           first_name="Bench", last_name="User"))
+        db.commit()
+        db.close()
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+        def override_get_db():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user'})}"}
+        ttl = principal_cache.ttl_seconds
+
+        with TestClient(app) as client:
+            principal_cache.ttl_seconds = 0
+            off = run(client, headers, args.requests, statements)
+            principal_cache.ttl_seconds = ttl or 60
+            principal_cache.clear()
+            on = run(client, headers, args.requests, statements)
+
+        principal_cache.ttl_seconds = ttl
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    print(f"{'mode':<14} {'ms/request':>10} {'queries/request':>16}")
+    print(f"{'cache off':<14} {off[0]:>10.3f} {off[1]:>16.2f}")
+    print(f"{'cache on':<14} {on[0]:>10.3f} {on[1]:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: available-slots latency vs the court's total reservation history
+
+Compares the previous implementation (load every reservation of the court,
+filter the day in Python, match "HH:MM-HH:MM" strings) with the date-pushed
+bitmap computation.
+
+Usage:
+    python -m benchmarks.bench_available_slots --history 100 10000 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app import models
+from app.availability import DEFAULT_TEMPLATE, day_occupancy
+
+FIRST_DAY = datetime(2020, 1, 1)
+
+
+def seed(session, history: int) -> None:
+    session.add(models.Sport(id="sport", name="Bench"))
+    session.add(models.Court(id="court", name="Court", sport_id="sport",
+                             location="Bench", price_per_hour=10.0, capacity=4))
+    session.add(models.User(id="user", email="bench@example.com", hashed_password="x",
+                            first_name="Bench", last_name="User"))
+    session.commit()
+    rows = []
+    for n in range(history):
+        day = FIRST_DAY + timedelta(days=n // 8)
+        start = day + timedelta(hours=12 + n % 8)
+        rows.append({
+            "id": f"r{n}", "user_id": "user", "court_id": "court", "date": day,
+            "start_time": start, "end_time": start + timedelta(hours=1),
+            "total_price": 10.0, "status": "CONFIRMED",
+        })
+    if rows:
+        session.execute(models.Reservation.__table__.insert(), rows)
+    session.commit()
+
+
+def previous_implementation(session, day):
+    all_reservations = session.query(models.Reservation).filter(
+        models.Reservation.court_id == "court",
+        models.Reservation.status.in_(["CONFIRMED", "PENDING"])
+    ).all()
+    reserved = set()
+    for res in all_reservations:
+        if res.date.date() == day:
+            reserved.add(f"{res.start_time:%H:%M}-{res.end_time:%H:%M}")
+    return [s for s in DEFAULT_TEMPLATE.slots if f"{s['start']}-{s['end']}" not in reserved]
+
+
+def bitmap_implementation(session, day):
+    return DEFAULT_TEMPLATE.available(day_occupancy(session, "court", day))
+
+
+def timed(fn, session, day, repeat):
+    session.expire_all()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(session, day)
+    return (time.perf_counter() - t0) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, nargs="+", default=[100, 10_000, 200_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'history':>10} {'previous (ms)':>15} {'bitmap (ms)':>13}")
+    for history in args.history:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{tmp}/bench.db")
+            Base.metadata.create_all(bind=engine)
+            session = sessionmaker(bind=engine)()
+            seed(session, history)
+            day = (FIRST_DAY + timedelta(days=max(history - 1, 0) // 16)).date()
+
+            previous, expected = timed(previous_implementation, session, day, max(1, args.repeat // 10))
+            bitmap, actual = timed(bitmap_implementation, session, day, args.repeat)
+            assert expected == actual
+            print(f"{history:>10,} {previous * 1000:>15.2f} {bitmap * 1000:>13.3f}")
+            session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: N single POST /api/reservations calls vs one POST /api/reservations/batch
+
+Usage:
+    python -m benchmarks.bench_batch_reservations --items 200
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+# Startup warm loads read the app's own database: a migrated throwaway file
+APP_DATABASE_DIR = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{APP_DATABASE_DIR.name}/app.db"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, get_db
+from app import models
+from app.auth import create_access_token
+from app.migrate import upgrade_database
+from app.reservation_index import reservation_index
+
+
+def build_items(court_id: str, first_day: datetime, count: int):
+    items = []
+    for n in range(count):
+        day = first_day + timedelta(days=n // 8)
+        start = day + timedelta(hours=12 + n % 8)
+        items.append({
+            "court_id": court_id,
+            "date": day.isoformat(),
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+        })
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=200)
+    args = parser.parse_args()
+
+    upgrade_database()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = Session()
+        db.add(models.Sport(id="sport", name="Bench"))
+        for court_id in ("court-single", "court-batch"):
+            db.add(models.Court(id=court_id, name=court_id, sport_id="sport",
+                                location="Bench", price_per_hour=10.0, capacity=4))
+        db.add(models.User(id="user", email="bench@example.com", hashed_password="x",
+                           first_name="Bench", last_name="User"))
+        db.commit()
+        db.close()
+
+        def override_get_db():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user'})}"}
+        first_day = datetime(2030, 1, 1)
+
+        with TestClient(app) as client:
+            reservation_index.clear()
+
+            t0 = time.perf_counter()
+            for item in build_items("court-single", first_day, args.items):
+                assert client.post("/api/reservations", json=item, headers=headers).status_code == 201
+            single_elapsed = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            response = client.post(
+                "/api/reservations/batch",
+                json={"items": build_items("court-batch", first_day, args.items)},
+                headers=headers
+            )
+            batch_elapsed = time.perf_counter() - t0
+            assert response.json()["created"] == args.items
+
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    print(f"{args.items} single calls: {single_elapsed * 1000:8.1f} ms")
+    print(f"1 batch call:      {batch_elapsed * 1000:8.1f} ms")
+    print(f"speedup:           {single_elapsed / batch_elapsed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
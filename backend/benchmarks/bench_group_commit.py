@@ -0,0 +1,145 @@
+"""
+Benchmark: concurrent bookings committed one by one vs through the
+single-writer group commit queue
+
+Threads stand in for request threads booking random slots on one SQLite
+file; some of them collide. Reports bookings per second, the average
+batch size and how many double bookings ended up in the table.
+
+Usage:
+    python -m benchmarks.bench_group_commit --threads 32 --bookings 3000
+    python -m benchmarks.bench_group_commit --synchronous FULL
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import aliased, sessionmaker
+from app import models, schemas
+from app.availability_cache import availability_cache
+from app.config import settings
+from app.database import Base, configure_engine, engine_options
+from app.reservation_index import reservation_index
+from app.routes.reservations import BookingWrite, apply_reservation_writes, book_reservation
+from app.write_queue import WriteQueue
+
+COURTS = 20
+HOURS = range(12, 20)  # default opening hours
+
+
+def build_items(count, days, seed):
+    rng = random.Random(seed)
+    first_day = datetime(2030, 1, 1)
+    items = []
+    for _ in range(count):
+        day = first_day + timedelta(days=rng.randrange(days))
+        start = day + timedelta(hours=rng.choice(HOURS))
+        items.append(schemas.ReservationCreate(
+            court_id=f"court-{rng.randrange(COURTS)}",
+            date=day,
+            start_time=start,
+            end_time=start + timedelta(hours=1)
+        ))
+    return items
+
+
+def double_bookings(Session):
+    db = Session()
+    other = aliased(models.Reservation)
+    try:
+        return db.query(func.count()).select_from(models.Reservation).join(
+            other,
+            (other.court_id == models.Reservation.court_id)
+            & (other.id > models.Reservation.id)
+            & (other.start_time < models.Reservation.end_time)
+            & (other.end_time > models.Reservation.start_time)
+        ).scalar()
+    finally:
+        db.close()
+
+
+def run(mode, args, items):
+    reservation_index.clear()
+    availability_cache.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = create_engine(url, **engine_options(url))
+        configure_engine(engine, url)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = Session()
+        db.add(models.Sport(id="sport", name="Bench"))
+        for i in range(COURTS):
+            db.add(models.Court(id=f"court-{i}", name=f"Court {i}", sport_id="sport",
+                                location="Bench", price_per_hour=10.0, capacity=4))
+        db.add(models.User(id="user", email="bench@example.com", hashed_password="x",
+                           first_name="Bench", last_name="User"))
+        db.commit()
+        db.close()
+
+        writes = WriteQueue(apply_reservation_writes, Session, args.max_batch, args.max_wait_ms)
+        created = conflicts = errors = 0
+
+        def book(item):
+            if mode == "queue":
+                return writes.run(BookingWrite(item, "user"))
+            session = Session()
+            try:
+                return book_reservation(session, item, "user")
+            finally:
+                session.close()
+
+        def task(item):
+            try:
+                book(item)
+                return "created"
+            except HTTPException:
+                return "conflict"
+            except OperationalError:
+                return "error"
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            for outcome in pool.map(task, items):
+                created += outcome == "created"
+                conflicts += outcome == "conflict"
+                errors += outcome == "error"
+        elapsed = time.perf_counter() - t0
+        writes.shutdown()
+
+        stats = writes.stats()
+        duplicated = double_bookings(Session)
+        engine.dispose()
+    return len(items) / elapsed, created, conflicts, errors, duplicated, stats["avg_batch"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--bookings", type=int, default=3000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--max-batch", type=int, default=settings.RESERVATION_WRITE_QUEUE_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=settings.RESERVATION_WRITE_QUEUE_MAX_WAIT_MS)
+    parser.add_argument("--synchronous", default=settings.SQLITE_SYNCHRONOUS)
+    args = parser.parse_args()
+    settings.SQLITE_SYNCHRONOUS = args.synchronous
+
+    items = build_items(args.bookings, args.days, seed=42)
+    print(f"{args.threads} threads, {args.bookings} bookings, synchronous={args.synchronous}")
+    print(f"{'mode':<8} {'req/s':>8} {'created':>8} {'conflict':>9} {'errors':>7} {'double':>7} {'avg batch':>10}")
+    for mode in ("direct", "queue"):
+        rate, created, conflicts, errors, duplicated, avg_batch = run(mode, args, items)
+        print(f"{mode:<8} {rate:>8.0f} {created:>8} {conflicts:>9} {errors:>7} {duplicated:>7} {avg_batch:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: reservation overlap check and day occupancy lookup through the
+B-tree on `date` vs the SQLite R*Tree over reservation intervals
+
+Usage:
+    python -m benchmarks.bench_interval_rtree --rows 1000000
+    python -m benchmarks.bench_interval_rtree --rows 10000000 --lookups 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import and_, create_engine
+from sqlalchemy.orm import sessionmaker
+from app import interval_rtree, models
+from app.availability import BLOCKING_STATUSES, load_day_intervals
+from app.config import settings
+from app.database import Base
+from app.interval_rtree import rebuild_interval_rtree
+from benchmarks.bench_reservation_index import SLOTS_PER_DAY, seed
+
+
+def btree_overlap(session, court_id, day, start, end) -> bool:
+    """has_overlapping_reservation without the in-memory index"""
+    return session.query(models.Reservation.id).filter(
+        and_(
+            models.Reservation.court_id == court_id,
+            models.Reservation.date == day,
+            models.Reservation.status != models.ReservationStatus.CANCELLED,
+            models.Reservation.start_time < end,
+            models.Reservation.end_time > start
+        )
+    ).first() is not None
+
+
+def timed(fn, probes):
+    t0 = time.perf_counter()
+    answers = [fn(*probe) for probe in probes]
+    return (time.perf_counter() - t0) / len(probes) * 1e6, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--courts", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+
+        t0 = time.perf_counter()
+        first_day = seed(session, args.rows, args.courts)
+        print(f"seeded {args.rows:,} reservations in {time.perf_counter() - t0:.1f}s")
+        session.close()
+
+        settings.RESERVATION_RTREE_ENABLED = True
+        t0 = time.perf_counter()
+        with engine.begin() as connection:
+            rebuild_interval_rtree(connection)
+        print(f"built the R*Tree in {time.perf_counter() - t0:.1f}s")
+        session = sessionmaker(bind=engine)()
+
+        days = max(1, args.rows // (args.courts * SLOTS_PER_DAY))
+        rng = random.Random(42)
+        overlap_probes, day_probes = [], []
+        for _ in range(args.lookups):
+            court_id = f"court-{rng.randrange(args.courts)}"
+            day = first_day + timedelta(days=rng.randrange(days))
+            start = day + timedelta(hours=rng.randrange(10, 22), minutes=rng.choice([0, 30]))
+            overlap_probes.append((session, court_id, day, start, start + timedelta(hours=1)))
+            day_probes.append((session, court_id, day.date()))
+
+        def rtree_overlap(session, court_id, day, start, end):
+            return interval_rtree.has_overlap(session, court_id, start, end)
+
+        def rtree_day(session, court_id, day):
+            return sorted(interval_rtree.day_intervals(session, court_id, day, BLOCKING_STATUSES))
+
+        def btree_day(session, court_id, day):
+            return sorted(tuple(row) for row in load_day_intervals(session, court_id, day))
+
+        settings.RESERVATION_RTREE_ENABLED = False
+        btree_check, btree_answers = timed(btree_overlap, overlap_probes)
+        btree_lookup, btree_days = timed(btree_day, day_probes)
+        settings.RESERVATION_RTREE_ENABLED = True
+        rtree_check, rtree_answers = timed(rtree_overlap, overlap_probes)
+        rtree_lookup, rtree_days = timed(rtree_day, day_probes)
+
+        mismatches = sum(a != b for a, b in zip(btree_answers, rtree_answers))
+        mismatches += sum(a != b for a, b in zip(btree_days, rtree_days))
+        print(f"{'':<20} {'B-tree us':>10} {'R*Tree us':>10} {'speedup':>8}")
+        print(f"{'overlap check':<20} {btree_check:>10.1f} {rtree_check:>10.1f} {btree_check / rtree_check:>7.1f}x")
+        print(f"{'day occupancy':<20} {btree_lookup:>10.1f} {rtree_lookup:>10.1f} {btree_lookup / rtree_lookup:>7.1f}x")
+        print(f"answer mismatches: {mismatches}")
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark: token verification cost per signing algorithm
+
+For each algorithm, times decode() through the cached key set and, for the
+asymmetric ones, verification that re-parses the public key every time.
+
+Usage:
+    python -m benchmarks.bench_jwt_decode --iterations 5000
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from jose import jwt
+from app.token_keys import TokenKeySet
+
+
+def per_call_us(fn, iterations):
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    claims = {"sub": "user", "exp": datetime.utcnow() + timedelta(hours=1)}
+    print(f"{'algorithm':<10} {'encode us':>10} {'decode us':>10} {'uncached us':>12}")
+    for algorithm in ("HS256", "RS256", "ES256"):
+        keys = TokenKeySet(algorithm, secret="benchmark")
+        if keys.asymmetric:
+            keys.rotate()
+        token = keys.encode(claims)
+        encode = per_call_us(lambda: keys.encode(claims), args.iterations)
+        decode = per_call_us(lambda: keys.decode(token), args.iterations)
+
+        uncached = ""
+        if keys.asymmetric:
+            jwks = keys.jwks()
+            uncached = f"{per_call_us(lambda: jwt.decode(token, jwks, algorithms=[algorithm]), args.iterations):>12.1f}"
+        print(f"{algorithm:<10} {encode:>10.1f} {decode:>10.1f} {uncached:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: reservation overlap check via SQL vs the in-memory interval index
+
+Usage:
+    python -m benchmarks.bench_reservation_index --rows 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine, and_, or_
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app import models
+from app.reservation_index import ReservationIndex
+
+SLOTS_PER_DAY = 8
+FIRST_HOUR = 12
+
+
+def seed(session, rows: int, courts: int) -> datetime:
+    """Insert `rows` confirmed one-hour reservations spread over courts and days"""
+    session.add(models.Sport(id="sport", name="Bench"))
+    for c in range(courts):
+        session.add(models.Court(
+            id=f"court-{c}", name=f"Court {c}", sport_id="sport",
+            location="Bench", price_per_hour=10.0, capacity=4
+        ))
+    session.add(models.User(
+        id="user", email="bench@example.com", hashed_password="x",
+        first_name="Bench", last_name="User"
+    ))
+    session.commit()
+
+    first_day = datetime(2024, 1, 1)
+    table = models.Reservation.__table__
+    batch = []
+    for n in range(rows):
+        court = n % courts
+        slot = (n // courts) % SLOTS_PER_DAY
+        day = first_day + timedelta(days=n // (courts * SLOTS_PER_DAY))
+        start = day + timedelta(hours=FIRST_HOUR + slot)
+        batch.append({
+            "id": f"r{n}", "user_id": "user", "court_id": f"court-{court}",
+            "date": day, "start_time": start, "end_time": start + timedelta(hours=1),
+            "total_price": 10.0, "status": "CONFIRMED",
+        })
+        if len(batch) == 50_000:
+            session.execute(table.insert(), batch)
+            batch.clear()
+    if batch:
+        session.execute(table.insert(), batch)
+    session.commit()
+    return first_day
+
+
+def db_overlap(session, court_id, day, start, end) -> bool:
+    """The overlap query create_reservation used before the index"""
+    return session.query(models.Reservation).filter(
+        and_(
+            models.Reservation.court_id == court_id,
+            models.Reservation.date == day,
+            models.Reservation.status != models.ReservationStatus.CANCELLED,
+            or_(
+                and_(models.Reservation.start_time <= start, models.Reservation.end_time > start),
+                and_(models.Reservation.start_time < end, models.Reservation.end_time >= end)
+            )
+        )
+    ).first() is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--courts", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+
+        t0 = time.perf_counter()
+        first_day = seed(session, args.rows, args.courts)
+        print(f"seeded {args.rows:,} reservations in {time.perf_counter() - t0:.1f}s")
+
+        days = max(1, args.rows // (args.courts * SLOTS_PER_DAY))
+        rng = random.Random(42)
+        probes = []
+        for _ in range(args.lookups):
+            day = first_day + timedelta(days=rng.randrange(days))
+            start = day + timedelta(hours=rng.randrange(10, 22), minutes=rng.choice([0, 30]))
+            probes.append((f"court-{rng.randrange(args.courts)}", day, start, start + timedelta(hours=1)))
+
+        index = ReservationIndex()
+        t0 = time.perf_counter()
+        index.warm_load(session, since=first_day.date())
+        print(f"warm-loaded {len(index):,} court/day buckets in {time.perf_counter() - t0:.1f}s")
+
+        t0 = time.perf_counter()
+        db_answers = [db_overlap(session, *probe) for probe in probes]
+        db_elapsed = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index_answers = [index.has_overlap(session, *probe) for probe in probes]
+        index_elapsed = time.perf_counter() - t0
+
+        mismatches = sum(a != b for a, b in zip(db_answers, index_answers))
+        print(f"database: {db_elapsed / args.lookups * 1e6:10.1f} us/check")
+        print(f"index:    {index_elapsed / args.lookups * 1e6:10.1f} us/check")
+        print(f"speedup:  {db_elapsed / index_elapsed:10.1f}x  (answer mismatches: {mismatches})")
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
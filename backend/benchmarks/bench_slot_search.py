@@ -0,0 +1,97 @@
+"""
+Benchmark: "find me a slot" search across many courts
+
+Usage:
+    python -m benchmarks.bench_slot_search --courts 300 --days 14
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app import models
+from app.availability import find_free_slots, occupancy_matrix
+from app.availability_cache import availability_cache, cached_occupancy_matrix
+
+FIRST_DAY = datetime(2030, 1, 7)
+
+
+def seed(session, courts: int, days: int, fill: float) -> None:
+    """Book `fill` of every court's one-hour slots over the window"""
+    rng = random.Random(7)
+    session.add(models.Sport(id="sport", name="Bench"))
+    session.add(models.User(id="user", email="bench@example.com", hashed_password="x",
+                            first_name="Bench", last_name="User"))
+    for c in range(courts):
+        session.add(models.Court(id=f"court-{c}", name=f"Court {c}", sport_id="sport",
+                                 location="Bench", price_per_hour=10.0 + c % 5, capacity=4))
+    session.commit()
+    rows = []
+    for c in range(courts):
+        for d in range(days):
+            day = FIRST_DAY + timedelta(days=d)
+            for hour in range(12, 20):
+                if rng.random() < fill:
+                    start = day + timedelta(hours=hour)
+                    rows.append({
+                        "id": f"r{c}-{d}-{hour}", "user_id": "user", "court_id": f"court-{c}",
+                        "date": day, "start_time": start, "end_time": start + timedelta(hours=1),
+                        "total_price": 10.0, "status": "CONFIRMED",
+                    })
+    session.execute(models.Reservation.__table__.insert(), rows)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courts", type=int, default=300)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--fill", type=float, default=0.85)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        seed(session, args.courts, args.days, args.fill)
+
+        first_day = FIRST_DAY.date()
+        last_day = first_day + timedelta(days=args.days - 1)
+        courts = session.query(models.Court).all()
+
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            occupancy_matrix(session, courts, first_day, last_day)
+        query_ms = (time.perf_counter() - t0) / args.repeat * 1000
+
+        availability_cache.clear()
+        cached_occupancy_matrix(session, courts, first_day, last_day)
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            openings = find_free_slots(
+                courts,
+                cached_occupancy_matrix(session, courts, first_day, last_day),
+                first_day,
+                120,
+                10
+            )
+        search_ms = (time.perf_counter() - t0) / args.repeat * 1000
+
+        print(f"{args.courts} courts x {args.days} days, {args.fill:.0%} booked")
+        print(f"cold occupancy query:       {query_ms:8.2f} ms")
+        print(f"search on cached occupancy: {search_ms:8.2f} ms")
+        print(f"first opening: {openings[0][0]} on {openings[0][2].id}")
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Load test: multi-process reads and writes on one SQLite file, with and
+without the SQLite connection profile (WAL, synchronous, busy_timeout, ...)
+
+Each process stands in for an API worker: it books reservations and reads
+court days in a loop. Reports operations per second, p99 latency and
+"database is locked" errors.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profile --workers 4 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+COURTS = 20
+
+
+def worker(args):
+    url, tuned, seconds, write_ratio, seed = args
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["DATABASE_URL"] = url
+    os.environ["SQLITE_TUNING_ENABLED"] = str(tuned).lower()
+    from sqlalchemy.exc import OperationalError
+    from app.database import SessionLocal
+    from app import models
+
+    latencies, locked, ops = [], 0, 0
+    first_day = datetime(2030, 1, 1)
+    deadline = time.perf_counter() + seconds
+    i = seed
+    while time.perf_counter() < deadline:
+        i += 1
+        db = SessionLocal()
+        t0 = time.perf_counter()
+        try:
+            day = first_day + timedelta(days=i % 365)
+            court_id = f"court-{i % COURTS}"
+            if i % 100 < write_ratio * 100:
+                start = day + timedelta(hours=12 + i % 8)
+                db.add(models.Reservation(
+                    id=str(uuid4()), user_id="user", court_id=court_id, date=day,
+                    start_time=start, end_time=start + timedelta(hours=1),
+                    total_price=100.0, status=models.ReservationStatus.CONFIRMED
+                ))
+                db.commit()
+            else:
+                db.query(models.Reservation).filter(
+                    models.Reservation.court_id == court_id,
+                    models.Reservation.date >= day,
+                    models.Reservation.date < day + timedelta(days=1)
+                ).all()
+                db.commit()
+            ops += 1
+        except OperationalError as exc:
+            db.rollback()
+            if "locked" not in str(exc):
+                raise
+            locked += 1
+        finally:
+            latencies.append(time.perf_counter() - t0)
+            db.close()
+    return ops, locked, latencies
+
+
+def seed(url):
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.database import Base
+    from app import models
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(models.Sport(id="sport", name="Padel"))
+    db.add(models.User(id="user", email="bench@example.com", hashed_password="x",
+                       first_name="Bench", last_name="User"))
+    for c in range(COURTS):
+        db.add(models.Court(id=f"court-{c}", name=f"Court {c}", sport_id="sport", location="Club",
+                            price_per_hour=100.0, capacity=4, is_active=True))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def run(tuned, workers, seconds, write_ratio):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        seed(url)
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(workers) as pool:
+            results = pool.map(worker, [(url, tuned, seconds, write_ratio, w * 1000003) for w in range(workers)])
+    ops = sum(r[0] for r in results)
+    locked = sum(r[1] for r in results)
+    latencies = sorted(l for r in results for l in r[2])
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+    return ops / seconds, p99, locked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{args.workers} processes, {args.seconds:.0f}s, {args.write_ratio:.0%} writes")
+    print(f"{'profile':<10} {'ops/s':>8} {'p99 ms':>8} {'locked':>7}")
+    for tuned in (False, True):
+        ops, p99, locked = run(tuned, args.workers, args.seconds, args.write_ratio)
+        print(f"{'tuned' if tuned else 'default':<10} {ops:>8.0f} {p99:>8.1f} {locked:>7}")
+
+
+if __name__ == "__main__":
+    main()
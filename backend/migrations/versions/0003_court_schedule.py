@@ -0,0 +1,29 @@
+"""Per-court slot length and opening hours
+
+Existing courts keep the old fixed grid: 60-minute slots, default hours.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('courts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('slot_minutes', sa.Integer(), nullable=False, server_default=sa.text('60')))
+        batch_op.add_column(sa.Column('opening_hours', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('courts', schema=None) as batch_op:
+        batch_op.drop_column('opening_hours')
+        batch_op.drop_column('slot_minutes')
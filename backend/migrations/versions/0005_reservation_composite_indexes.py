@@ -0,0 +1,29 @@
+"""Composite indexes for the hot reservation queries
+
+ix_reservations_court_date_status serves the overlap check and day
+occupancy (court + day + active statuses); ix_reservations_user_date serves
+"my reservations" paged by (date, id), so neither needs a table scan or a
+temporary B-tree for ORDER BY.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_reservations_court_date_status', 'reservations', ['court_id', 'date', 'status'])
+    op.create_index('ix_reservations_user_date', 'reservations', ['user_id', 'date', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_user_date', table_name='reservations')
+    op.drop_index('ix_reservations_court_date_status', table_name='reservations')
@@ -0,0 +1,25 @@
+"""Per-court availability version shared by every worker's cache
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('courts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('availability_version', sa.Integer(), nullable=False, server_default=sa.text('0')))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('courts', schema=None) as batch_op:
+        batch_op.drop_column('availability_version')
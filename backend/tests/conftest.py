@@ -1,16 +1,29 @@
 """
 Pytest configuration and fixtures for testing
 """
+import os
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+# The app's own database (startup warm loads) is a migrated throwaway file
+APP_DATABASE_DIR = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{APP_DATABASE_DIR.name}/app.db"
+
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db
 from app import models
 from app.auth import get_password_hash, create_access_token
+from app.availability_cache import availability_cache
+from app.migrate import upgrade_database
+from app.principal_cache import principal_cache
+from app.rate_limit import rate_limiter
+from app.read_routing import recent_writers
+from app.reservation_index import reservation_index
+from app.revocation import revocation_list
 
 
 # Create in-memory SQLite database for testing
@@ -24,6 +37,24 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def app_database():
+    """Migrate the app's database once; importing the app creates no tables"""
+    upgrade_database()
+    yield
+    APP_DATABASE_DIR.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def reset_principal_cache():
+    """Never share cached principals or primary pins across tests"""
+    principal_cache.clear()
+    recent_writers.clear()
+    yield
+    principal_cache.clear()
+    recent_writers.clear()
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test"""
@@ -46,9 +77,19 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
+        # Startup warm-loads from the app database, not the test one
+        reservation_index.clear()
+        availability_cache.clear()
+        revocation_list.clear()
+        rate_limiter.clear()
         yield test_client
     app.dependency_overrides.clear()
+    reservation_index.clear()
+    availability_cache.clear()
+    revocation_list.clear()
+    rate_limiter.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,121 @@
+"""
+Tests for the async database engine and async route variants
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app.database import Base, async_database_url, get_async_db
+from app.availability_cache import availability_cache
+from app.rate_limit import rate_limiter
+from app.reservation_index import reservation_index
+from app.routes import async_courts, async_reservations
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return tmp_path / "async.db"
+
+
+@pytest.fixture
+def db_session(db_file):
+    """File database shared by the sync fixtures and the async engine (overrides conftest)"""
+    engine = create_engine(f"sqlite:///{db_file}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def async_client(db_file, db_session):
+    """App serving only the async route variants"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}", poolclass=NullPool)
+    AsyncSessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(async_courts.router)
+    app.include_router(async_reservations.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    reservation_index.clear()
+    availability_cache.clear()
+    rate_limiter.clear()
+    with TestClient(app) as client:
+        yield client
+    reservation_index.clear()
+    availability_cache.clear()
+    rate_limiter.clear()
+
+
+def booking(court_id, hour=14):
+    return {
+        "court_id": court_id,
+        "date": "2030-03-04T00:00:00",
+        "start_time": f"2030-03-04T{hour}:00:00",
+        "end_time": f"2030-03-04T{hour + 1}:00:00",
+    }
+
+
+class TestAsyncDatabaseUrl:
+    """Test deriving the async driver URL"""
+
+    def test_known_drivers(self):
+        assert async_database_url("sqlite:///./courts.db") == "sqlite+aiosqlite:///./courts.db"
+        assert async_database_url("postgresql://u:p@db/courts") == "postgresql+asyncpg://u:p@db/courts"
+        assert async_database_url("postgresql+psycopg2://db/x") == "postgresql+asyncpg://db/x"
+
+    def test_unknown_driver_is_kept(self):
+        assert async_database_url("oracle://db/x") == "oracle://db/x"
+
+
+class TestAsyncRoutes:
+    """Test the async variants against a real aiosqlite engine"""
+
+    def test_list_courts(self, async_client, test_court):
+        response = async_client.get("/api/courts")
+        assert response.status_code == 200
+        courts = response.json()
+        assert [court["id"] for court in courts] == [test_court.id]
+        assert courts[0]["sport"]["name"]
+
+    def test_available_slots(self, async_client, test_court, test_reservation):
+        response = async_client.get(f"/api/courts/{test_court.id}/available-slots", params={"date": "2025-12-01"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["reserved_count"] == 1
+        assert "14:00 - 15:00" not in [slot["label"] for slot in data["available_slots"]]
+
+        missing = async_client.get("/api/courts/missing/available-slots", params={"date": "2025-12-01"})
+        assert missing.status_code == 404
+
+    def test_create_and_list_reservations(self, async_client, test_court, auth_headers):
+        response = async_client.post("/api/reservations", json=booking(test_court.id), headers=auth_headers)
+        assert response.status_code == 201
+        created = response.json()
+        assert created["total_price"] == test_court.price_per_hour
+
+        conflict = async_client.post("/api/reservations", json=booking(test_court.id), headers=auth_headers)
+        assert conflict.status_code == 400
+
+        listed = async_client.get("/api/reservations/my-reservations", headers=auth_headers)
+        assert listed.status_code == 200
+        assert [r["id"] for r in listed.json()] == [created["id"]]
+        assert listed.json()[0]["court"]["sport"]["id"] == test_court.sport_id
+
+    def test_requires_authentication(self, async_client, test_court):
+        assert async_client.post("/api/reservations", json=booking(test_court.id)).status_code == 401
+        response = async_client.get(
+            "/api/reservations/my-reservations",
+            headers={"Authorization": "Bearer invalid"}
+        )
+        assert response.status_code == 401
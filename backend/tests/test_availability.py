@@ -0,0 +1,317 @@
+"""
+Tests for bitmap-based slot availability
+"""
+import pytest
+from datetime import date, datetime, timezone
+from app import models
+from app.availability import (
+    DEFAULT_TEMPLATE,
+    SlotTemplate,
+    court_template,
+    find_free_slots,
+    get_template,
+    minute_of_day,
+    schedule_error
+)
+
+DAY = date(2025, 12, 1)
+
+
+def at(hour, minute=0, day=1):
+    return datetime(2025, 12, day, hour, minute)
+
+
+class TestSlotTemplate:
+    """Test slot templates and occupancy bitmaps"""
+
+    def test_default_template(self):
+        assert len(DEFAULT_TEMPLATE) == 8
+        assert DEFAULT_TEMPLATE.slots[0]["label"] == "12:00 - 13:00"
+        assert DEFAULT_TEMPLATE.slots[-1]["label"] == "19:00 - 20:00"
+
+    def test_exact_slot(self):
+        bitmap = DEFAULT_TEMPLATE.occupancy(DAY, [(at(14), at(15))])
+        assert bitmap == 0b00000100
+
+    def test_reservation_spanning_slots(self):
+        bitmap = DEFAULT_TEMPLATE.occupancy(DAY, [(at(14), at(17))])
+        assert bitmap == 0b00011100
+
+    def test_partial_overlap_blocks_touched_slots(self):
+        bitmap = DEFAULT_TEMPLATE.occupancy(DAY, [(at(14, 30), at(15, 30))])
+        assert bitmap == 0b00001100
+
+    def test_outside_opening_hours_is_ignored(self):
+        bitmap = DEFAULT_TEMPLATE.occupancy(DAY, [(at(9), at(11)), (at(20), at(22))])
+        assert bitmap == 0
+
+    def test_clipped_to_opening_hours(self):
+        bitmap = DEFAULT_TEMPLATE.occupancy(DAY, [(at(11), at(12, 30)), (at(19, 45), at(21))])
+        assert bitmap == 0b10000001
+
+    def test_available_slots(self):
+        available = DEFAULT_TEMPLATE.available(0b11111011)
+        assert [slot["label"] for slot in available] == ["14:00 - 15:00"]
+
+    def test_half_hour_template(self):
+        template = SlotTemplate(9 * 60, 11 * 60, 30)
+        assert len(template) == 4
+        assert template.occupancy(DAY, [(at(9, 15), at(9, 45))]) == 0b0011
+
+    def test_invalid_template(self):
+        with pytest.raises(ValueError):
+            SlotTemplate(12 * 60, 12 * 60, 60)
+
+    def test_minute_of_day_clamps_to_day(self):
+        assert minute_of_day(at(1, day=30).replace(month=11), DAY) == 0
+        assert minute_of_day(at(1, day=2), DAY) == 24 * 60
+
+
+class TestCourtSchedules:
+    """Test per-court opening hours and slot length"""
+
+    def make_court(self, slot_minutes=60, opening_hours=None):
+        return models.Court(id="court-1", slot_minutes=slot_minutes, opening_hours=opening_hours)
+
+    def test_default_schedule(self):
+        assert court_template(self.make_court(), DAY) is DEFAULT_TEMPLATE
+
+    def test_templates_are_shared(self):
+        assert get_template("09:00", "21:00", 30) is get_template("09:00", "21:00", 30)
+
+    def test_weekday_hours(self):
+        # 2025-12-01 is a Monday
+        court = self.make_court(90, {"0": {"open": "09:00", "close": "15:00"}})
+        template = court_template(court, DAY)
+
+        assert [slot["label"] for slot in template.slots] == [
+            "09:00 - 10:30", "10:30 - 12:00", "12:00 - 13:30", "13:30 - 15:00"
+        ]
+        assert court_template(court, date(2025, 12, 2)) is None
+
+    def test_schedule_error(self):
+        court = self.make_court(30, {"0": {"open": "09:00", "close": "12:00"}})
+
+        assert schedule_error(court, at(0), at(9, 30), at(10, 30)) is None
+        assert "whole 30-minute slots" in schedule_error(court, at(0), at(9, 15), at(10))
+        assert "whole 30-minute slots" in schedule_error(court, at(0), at(11), at(13))
+        assert schedule_error(court, at(0, day=2), at(10, day=2), at(11, day=2)) == "Court is closed on this day"
+        assert schedule_error(court, at(0), at(11), at(10)) == "End time must be after start time"
+        assert schedule_error(court, at(0), at(10, day=2), at(11, day=2)) == "Start time must be on the reservation date"
+
+
+class TestAvailableSlotsEndpoint:
+    """Test GET /api/courts/{id}/available-slots"""
+
+    def test_reserved_slot_is_excluded(self, client, test_reservation):
+        response = client.get(f"/api/courts/{test_reservation.court_id}/available-slots",
+                              params={"date": "2025-12-01"})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["reserved_count"] == 1
+        labels = [slot["label"] for slot in body["available_slots"]]
+        assert "14:00 - 15:00" not in labels
+        assert len(labels) == 7
+
+    def test_other_days_and_cancelled_do_not_block(self, client, db_session, test_reservation):
+        db_session.add(models.Reservation(
+            id="cancelled",
+            user_id=test_reservation.user_id,
+            court_id=test_reservation.court_id,
+            date=datetime(2025, 12, 1),
+            start_time=at(16),
+            end_time=at(18),
+            total_price=200.0,
+            status=models.ReservationStatus.CANCELLED
+        ))
+        db_session.commit()
+
+        response = client.get(f"/api/courts/{test_reservation.court_id}/available-slots",
+                              params={"date": "2025-12-02"})
+        assert len(response.json()["available_slots"]) == 8
+
+        response = client.get(f"/api/courts/{test_reservation.court_id}/available-slots",
+                              params={"date": "2025-12-01"})
+        assert len(response.json()["available_slots"]) == 7
+
+    def test_invalid_date(self, client, test_court):
+        response = client.get(f"/api/courts/{test_court.id}/available-slots", params={"date": "01/12/2025"})
+        assert response.status_code == 400
+
+
+class TestAvailabilityMatrix:
+    """Test GET /api/courts/availability"""
+
+    def test_matrix_for_week(self, client, db_session, test_reservation, test_sport):
+        db_session.add(models.Court(
+            id="court-456",
+            name="Court 2",
+            sport_id=test_sport.id,
+            location="Test Location",
+            price_per_hour=50.0,
+            capacity=4
+        ))
+        db_session.commit()
+
+        response = client.get("/api/courts/availability",
+                              params={"date_from": "2025-11-30", "date_to": "2025-12-06"})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["dates"][0] == "2025-11-30"
+        assert len(body["dates"]) == 7
+        assert len(body["slot_templates"]) == 1
+        assert len(body["slot_templates"][0]) == 8
+        by_court = {court["court_id"]: court for court in body["courts"]}
+        assert by_court["court-123"]["occupied"] == [0, 0b100, 0, 0, 0, 0, 0]
+        assert by_court["court-123"]["templates"] == [0] * 7
+        assert by_court["court-456"]["occupied"] == [0] * 7
+
+    def test_sport_filter(self, client, test_court):
+        response = client.get("/api/courts/availability",
+                              params={"date_from": "2025-12-01", "date_to": "2025-12-01", "sport_id": "other"})
+        assert response.json()["courts"] == []
+
+    def test_range_is_bounded(self, client):
+        response = client.get("/api/courts/availability",
+                              params={"date_from": "2025-12-01", "date_to": "2026-03-01"})
+        assert response.status_code == 400
+
+        response = client.get("/api/courts/availability",
+                              params={"date_from": "2025-12-02", "date_to": "2025-12-01"})
+        assert response.status_code == 400
+
+
+class TestCourtScheduleEndpoints:
+    """Test schedules configured through the courts API"""
+
+    def test_schedule_drives_slots_and_booking(self, client, admin_headers, auth_headers, test_court):
+        response = client.put(f"/api/courts/{test_court.id}", headers=admin_headers, json={
+            "slot_minutes": 30,
+            "opening_hours": {"0": {"open": "08:00", "close": "10:00"}},
+        })
+        assert response.status_code == 200
+        assert response.json()["opening_hours"] == {"0": {"open": "08:00", "close": "10:00"}}
+
+        slots = client.get(f"/api/courts/{test_court.id}/available-slots", params={"date": "2025-12-01"})
+        assert [slot["label"] for slot in slots.json()["available_slots"]] == [
+            "08:00 - 08:30", "08:30 - 09:00", "09:00 - 09:30", "09:30 - 10:00"
+        ]
+        closed = client.get(f"/api/courts/{test_court.id}/available-slots", params={"date": "2025-12-02"})
+        assert closed.json()["available_slots"] == []
+
+        payload = {
+            "court_id": test_court.id,
+            "date": "2025-12-01T00:00:00",
+            "start_time": "2025-12-01T08:30:00",
+            "end_time": "2025-12-01T09:30:00",
+        }
+        assert client.post("/api/reservations", json=payload, headers=auth_headers).status_code == 201
+        payload["start_time"], payload["end_time"] = "2025-12-01T14:00:00", "2025-12-01T15:00:00"
+        assert client.post("/api/reservations", json=payload, headers=auth_headers).status_code == 400
+
+    def test_invalid_opening_hours_rejected(self, client, admin_headers, test_court):
+        response = client.put(f"/api/courts/{test_court.id}", headers=admin_headers, json={
+            "opening_hours": {"7": {"open": "08:00", "close": "10:00"}},
+        })
+        assert response.status_code == 422
+
+
+class TestFindFreeSlots:
+    """Test the free-slot search over occupancy bitmaps"""
+
+    def test_run_starts(self):
+        # Slots 2 and 5 taken: two-slot runs can start at 0, 3 and 6
+        assert DEFAULT_TEMPLATE.run_starts(0b00100100, 2) == 0b01001001
+
+    def test_earliest_across_courts(self):
+        cheap = models.Court(id="cheap", price_per_hour=10.0)
+        busy = models.Court(id="busy", price_per_hour=20.0)
+        matrix = {"cheap": [0b00000011, 0], "busy": [0b00000001, 0]}
+
+        openings = find_free_slots([cheap, busy], matrix, DAY, 60, 3)
+
+        # Same start time: the cheaper court comes first
+        assert [(start.hour, court.id) for start, _, court in openings] == [
+            (13, "busy"), (14, "cheap"), (14, "busy")
+        ]
+
+    def test_duration_rounds_up_to_whole_slots(self):
+        court = models.Court(id="court", price_per_hour=10.0)
+        openings = find_free_slots([court], {"court": [0b11100000]}, DAY, 90, 10)
+
+        assert [(start.hour, end.hour) for start, end, _ in openings] == [
+            (12, 14), (13, 15), (14, 16), (15, 17)
+        ]
+
+    def test_not_before(self):
+        court = models.Court(id="court", price_per_hour=10.0)
+        openings = find_free_slots([court], {"court": [0]}, DAY, 60, 1, not_before=at(15, 30))
+        assert openings[0][0] == at(16)
+
+
+    def test_aware_not_before_uses_local_wall_clock(self):
+        court = models.Court(id="court", price_per_hour=10.0)
+        cutoff = at(15, 30).astimezone(timezone.utc)
+        openings = find_free_slots([court], {"court": [0]}, DAY, 60, 1, not_before=cutoff)
+        assert openings[0][0] == at(16)
+
+
+class TestSlotSearchEndpoint:
+    """Test GET /api/courts/search"""
+
+    def test_search_skips_reserved_slots(self, client, test_reservation, test_sport):
+        response = client.get("/api/courts/search", params={
+            "sport_id": test_sport.id,
+            "date_from": "2025-12-01",
+            "date_to": "2025-12-14",
+            "duration_minutes": 180,
+            "limit": 2,
+            "not_before": "2025-12-01T00:00:00",
+        })
+
+        body = response.json()
+        assert response.status_code == 200
+        assert [(r["start_time"], r["end_time"]) for r in body] == [
+            ("2025-12-01T15:00:00", "2025-12-01T18:00:00"),
+            ("2025-12-01T16:00:00", "2025-12-01T19:00:00"),
+        ]
+        assert body[0]["total_price"] == 300.0
+
+    def test_search_price_and_location_filters(self, client, test_court, test_sport):
+        params = {
+            "sport_id": test_sport.id,
+            "date_from": "2025-12-01",
+            "date_to": "2025-12-01",
+            "not_before": "2025-12-01T00:00:00",
+        }
+
+        assert client.get("/api/courts/search", params={**params, "max_price": 50}).json() == []
+        assert client.get("/api/courts/search", params={**params, "location": "nowhere"}).json() == []
+        assert len(client.get("/api/courts/search", params={**params, "location": "test"}).json()) == 8
+
+    def test_search_defaults_to_upcoming_openings(self, client, test_court, test_sport, monkeypatch):
+        monkeypatch.setattr("app.routes.courts.local_now", lambda: at(15, 30))
+        params = {
+            "sport_id": test_sport.id,
+            "date_from": "2025-11-30",
+            "date_to": "2025-12-01",
+            "limit": 1,
+        }
+
+        body = client.get("/api/courts/search", params=params).json()
+        assert [r["start_time"] for r in body] == ["2025-12-01T16:00:00"]
+
+    def test_search_accepts_aware_not_before(self, client, test_court, test_sport):
+        cutoff = at(15, 30).astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+        response = client.get("/api/courts/search", params={
+            "sport_id": test_sport.id,
+            "date_from": "2025-12-01",
+            "date_to": "2025-12-01",
+            "limit": 1,
+            "not_before": cutoff,
+        })
+
+        assert response.status_code == 200
+        assert [r["start_time"] for r in response.json()] == ["2025-12-01T16:00:00"]
@@ -0,0 +1,161 @@
+"""
+Tests for the availability cache
+"""
+from datetime import date, datetime
+from app import models
+from app.availability_cache import AvailabilityCache, availability_cache
+from tests.conftest import TestingSessionLocal
+
+DAY = date(2025, 12, 1)
+
+
+class TestAvailabilityCache:
+    """Test LRU behaviour, counters and versioned invalidation"""
+
+    def test_hit_and_miss_counters(self):
+        cache = AvailabilityCache(max_entries=10)
+        assert cache.get("court-1", DAY, 0) is None
+
+        cache.put("court-1", DAY, 0, 0b101, cache.version)
+        assert cache.get("court-1", DAY, 0) == 0b101
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_ratio"] == 0.5
+
+    def test_lru_eviction(self):
+        cache = AvailabilityCache(max_entries=2)
+        cache.put("court-1", DAY, 0, 1, cache.version)
+        cache.put("court-2", DAY, 0, 2, cache.version)
+        cache.get("court-1", DAY, 0)
+        cache.put("court-3", DAY, 0, 3, cache.version)
+
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.get("court-2", DAY, 0) is None
+        assert cache.get("court-1", DAY, 0) == 1
+
+    def test_stale_result_is_not_stored(self):
+        """Test a bitmap computed before an invalidation is discarded"""
+        cache = AvailabilityCache(max_entries=10)
+        version = cache.version
+        cache.invalidate("court-1", DAY)
+
+        assert cache.put("court-1", DAY, 0, 0, version) is False
+        assert cache.get("court-1", DAY, 0) is None
+
+    def test_other_court_version_is_a_miss(self):
+        """Test an entry tagged with an older court version is not served"""
+        cache = AvailabilityCache(max_entries=10)
+        cache.put("court-1", DAY, 3, 0b101, cache.version)
+
+        assert cache.get("court-1", DAY, 4) is None
+        assert cache.get("court-1", DAY, 3) == 0b101
+
+    def test_invalidate_court(self):
+        cache = AvailabilityCache(max_entries=10)
+        cache.put("court-1", DAY, 0, 1, cache.version)
+        cache.put("court-1", date(2025, 12, 2), 0, 1, cache.version)
+        cache.put("court-2", DAY, 0, 1, cache.version)
+
+        cache.invalidate_court("court-1")
+
+        assert len(cache) == 1
+        assert cache.get("court-2", DAY, 0) == 1
+
+    def test_disabled_cache(self):
+        cache = AvailabilityCache(max_entries=0)
+        assert cache.put("court-1", DAY, 0, 1, cache.version) is False
+        assert len(cache) == 0
+
+
+class TestAvailabilityCacheConsistency:
+    """Test reads after writes never see stale slots"""
+
+    def slots(self, client, court_id):
+        response = client.get(f"/api/courts/{court_id}/available-slots", params={"date": "2025-12-01"})
+        return [slot["label"] for slot in response.json()["available_slots"]]
+
+    def test_read_after_booking_and_cancel(self, client, auth_headers, test_court):
+        assert "14:00 - 15:00" in self.slots(client, test_court.id)
+        assert "14:00 - 15:00" in self.slots(client, test_court.id)
+
+        created = client.post("/api/reservations", headers=auth_headers, json={
+            "court_id": test_court.id,
+            "date": "2025-12-01T00:00:00",
+            "start_time": "2025-12-01T14:00:00",
+            "end_time": "2025-12-01T15:00:00",
+        })
+        assert created.status_code == 201
+        assert "14:00 - 15:00" not in self.slots(client, test_court.id)
+
+        client.delete(f"/api/reservations/{created.json()['id']}", headers=auth_headers)
+        assert "14:00 - 15:00" in self.slots(client, test_court.id)
+
+    def test_read_after_batch_booking(self, client, auth_headers, test_court):
+        assert len(self.slots(client, test_court.id)) == 8
+
+        client.post("/api/reservations/batch", headers=auth_headers, json={"items": [{
+            "court_id": test_court.id,
+            "date": "2025-12-01T00:00:00",
+            "start_time": "2025-12-01T12:00:00",
+            "end_time": "2025-12-01T14:00:00",
+        }]})
+        assert len(self.slots(client, test_court.id)) == 6
+
+    def test_stats_endpoint_is_admin_only(self, client, auth_headers, admin_headers, test_court):
+        self.slots(client, test_court.id)
+        self.slots(client, test_court.id)
+
+        assert client.get("/api/courts/availability/cache-stats", headers=auth_headers).status_code == 403
+        stats = client.get("/api/courts/availability/cache-stats", headers=admin_headers).json()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+class TestOtherWorkers:
+    """Test writes committed by other workers, which never touch this process's cache"""
+
+    def slots(self, client, db_session, court_id):
+        # Each request of a real worker loads the court in a fresh session
+        db_session.expire_all()
+        response = client.get(f"/api/courts/{court_id}/available-slots", params={"date": "2025-12-01"})
+        return [slot["label"] for slot in response.json()["available_slots"]]
+
+    def test_booking_and_cancel_elsewhere(self, client, db_session, test_user, test_court):
+        assert "14:00 - 15:00" in self.slots(client, db_session, test_court.id)
+
+        other = TestingSessionLocal()
+        other.add(models.Reservation(
+            id="elsewhere", user_id=test_user.id, court_id=test_court.id, date=datetime(2025, 12, 1),
+            start_time=datetime(2025, 12, 1, 14), end_time=datetime(2025, 12, 1, 15), total_price=10.0,
+            status=models.ReservationStatus.CONFIRMED
+        ))
+        other.commit()
+        assert "14:00 - 15:00" not in self.slots(client, db_session, test_court.id)
+
+        reservation = other.get(models.Reservation, "elsewhere")
+        reservation.status = models.ReservationStatus.CANCELLED
+        other.commit()
+        other.close()
+        assert "14:00 - 15:00" in self.slots(client, db_session, test_court.id)
+
+    def test_schedule_change_elsewhere(self, client, db_session, test_court):
+        assert len(self.slots(client, db_session, test_court.id)) == 8
+
+        other = TestingSessionLocal()
+        court = other.get(models.Court, test_court.id)
+        court.slot_minutes = 30
+        other.commit()
+        other.close()
+        assert len(self.slots(client, db_session, test_court.id)) == 16
+
+    def test_unrelated_court_edit_keeps_entries(self, client, db_session, test_court):
+        self.slots(client, db_session, test_court.id)
+
+        other = TestingSessionLocal()
+        other.get(models.Court, test_court.id).name = "Renamed"
+        other.commit()
+        other.close()
+        self.slots(client, db_session, test_court.id)
+
+        assert availability_cache.hits == 1
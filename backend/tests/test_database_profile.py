@@ -0,0 +1,188 @@
+"""
+Tests for the SQLite connection profile and pool settings
+"""
+import asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from app.concurrency import ConcurrencyLimitMiddleware, concurrency_exempt, is_exempt
+from app.config import settings
+from app.main import app
+from app.routes import async_courts, async_reservations
+from app.database import (
+    configure_engine,
+    database_settings,
+    engine_options,
+    is_memory_sqlite
+)
+
+
+class TestEngineOptions:
+    """Test engine arguments derived from the settings"""
+
+    def test_memory_databases(self):
+        assert is_memory_sqlite("sqlite://")
+        assert is_memory_sqlite("sqlite:///:memory:")
+        assert is_memory_sqlite("sqlite+aiosqlite://")
+        assert not is_memory_sqlite("sqlite:///./courts.db")
+        assert not is_memory_sqlite("postgresql://db/courts")
+
+    def test_file_sqlite_gets_pool_settings(self):
+        options = engine_options("sqlite:///./courts.db")
+        assert options["connect_args"] == {"check_same_thread": False}
+        assert options["pool_size"] == settings.DB_POOL_SIZE
+        assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+
+    def test_memory_sqlite_keeps_its_pool(self):
+        assert "pool_size" not in engine_options("sqlite://")
+
+    def test_other_databases_skip_sqlite_arguments(self):
+        assert "connect_args" not in engine_options("postgresql://db/courts")
+
+
+class TestSqliteProfile:
+    """Test PRAGMAs are applied on connect"""
+
+    def test_pragmas_applied(self, tmp_path):
+        url = f"sqlite:///{tmp_path}/profile.db"
+        engine = create_engine(url, **engine_options(url))
+        configure_engine(engine, url)
+
+        values = database_settings(engine)
+        assert values["journal_mode"] == "wal"
+        assert values["busy_timeout"] == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert values["cache_size"] == -settings.SQLITE_CACHE_SIZE_KB
+        assert values["synchronous"] == 1  # NORMAL
+        assert values["temp_store"] == 2  # MEMORY
+        assert values["pool_size"] == settings.DB_POOL_SIZE
+        engine.dispose()
+
+    def test_can_be_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "SQLITE_TUNING_ENABLED", False)
+        url = f"sqlite:///{tmp_path}/plain.db"
+        engine = create_engine(url, **engine_options(url))
+        configure_engine(engine, url)
+
+        assert database_settings(engine)["journal_mode"] == "delete"
+        engine.dispose()
+
+    def test_async_engine(self, tmp_path):
+        url = f"sqlite+aiosqlite:///{tmp_path}/async.db"
+
+        async def journal_mode():
+            engine = create_async_engine(url, **engine_options(url))
+            configure_engine(engine.sync_engine, url)
+            async with engine.connect() as connection:
+                mode = (await connection.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            await engine.dispose()
+            return mode
+
+        assert asyncio.run(journal_mode()) == "wal"
+
+
+class TestConcurrencyLimit:
+    """Test the in-flight request cap"""
+
+    def test_extra_requests_wait_for_a_slot(self):
+        active = []
+        peak = []
+
+        async def endpoint(scope, receive, send):
+            active.append(scope["path"])
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(scope["path"])
+
+        middleware = ConcurrencyLimitMiddleware(endpoint, limit=2)
+
+        async def burst():
+            await asyncio.gather(*(
+                middleware({"type": "http", "path": f"/{i}"}, None, None) for i in range(6)
+            ))
+
+        asyncio.run(burst())
+        assert max(peak) == 2
+        assert middleware.in_flight == 0
+        assert middleware.waiting == 0
+
+    def test_zero_disables_the_cap(self):
+        calls = []
+
+        async def endpoint(scope, receive, send):
+            calls.append(scope["type"])
+
+        middleware = ConcurrencyLimitMiddleware(endpoint, limit=0)
+        asyncio.run(middleware({"type": "http"}, None, None))
+        assert calls == ["http"]
+        assert middleware.in_flight == 0
+
+    def test_exempt_routes_skip_the_cap(self):
+        release = None
+
+        async def busy(request):
+            await release.wait()
+            return PlainTextResponse("busy")
+
+        @concurrency_exempt
+        async def health(request):
+            return PlainTextResponse("ok")
+
+        limited = Starlette(
+            routes=[Route("/busy", busy), Route("/health", health)],
+            middleware=[Middleware(ConcurrencyLimitMiddleware, limit=1)]
+        )
+
+        async def get(path):
+            sent = []
+
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                sent.append(message)
+
+            await limited(http_scope(path), receive, send)
+            return sent[0]["status"]
+
+        async def saturated():
+            nonlocal release
+            release = asyncio.Event()
+            holding = asyncio.create_task(get("/busy"))
+            await asyncio.sleep(0.01)
+            waiting = asyncio.create_task(get("/busy"))
+            # The only slot is taken: another /busy waits, /health does not
+            assert await asyncio.wait_for(get("/health"), 1) == 200
+            assert not waiting.done()
+            release.set()
+            assert await holding == 200 and await waiting == 200
+
+        asyncio.run(saturated())
+
+    def test_exempt_app_routes(self):
+        exempt = {
+            path: is_exempt({**http_scope(path), "app": app})
+            for path in ("/health", "/metrics", "/api/reservations/export", "/api/courts", "/api/reservations")
+        }
+        assert exempt == {
+            "/health": True,
+            "/metrics": True,
+            "/api/reservations/export": True,
+            "/api/courts": False,
+            "/api/reservations": False,
+        }
+        # Async routes wait on the async engine's pool, not on threadpool threads
+        assert all(
+            route.endpoint.concurrency_exempt
+            for router in (async_courts.router, async_reservations.router)
+            for route in router.routes
+        )
+
+
+def http_scope(path, method="GET"):
+    return {
+        "type": "http", "method": method, "path": path, "root_path": "", "scheme": "http",
+        "query_string": b"", "headers": [], "server": ("testserver", 80), "http_version": "1.1",
+    }
@@ -0,0 +1,84 @@
+"""
+Tests for the dedicated password hashing pool
+"""
+import threading
+import pytest
+from app.hashing_pool import HashingPool, HashingPoolFull
+
+
+class TestHashingPool:
+    """Test bounded queueing, backpressure and metrics"""
+
+    @pytest.fixture
+    def pool(self):
+        pool = HashingPool(workers=1, max_queue=1)
+        yield pool
+        pool.shutdown()
+
+    def test_runs_work(self, pool):
+        assert pool.submit(pow, 2, 10).result(timeout=5) == 1024
+        stats = pool.stats()
+        assert stats["completed"] == 1
+        assert stats["queue_depth"] == 0
+
+    def test_rejects_when_full(self, pool):
+        release = threading.Event()
+        running = pool.submit(release.wait)
+        queued = pool.submit(release.wait)
+
+        with pytest.raises(HashingPoolFull):
+            pool.submit(release.wait)
+
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["active"] + stats["queue_depth"] == 2
+
+        release.set()
+        running.result(timeout=5)
+        queued.result(timeout=5)
+        assert pool.stats()["completed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_run_awaits_result(self, pool):
+        assert await pool.run(sum, [1, 2, 3]) == 6
+
+    def test_restarts_after_shutdown(self, pool):
+        pool.shutdown()
+        assert pool.submit(abs, -1).result(timeout=5) == 1
+
+
+class TestPooledAuthRoutes:
+    """Test login and registration go through the pool"""
+
+    def test_register_and_login(self, client):
+        response = client.post("/api/auth/register", json={
+            "email": "new@example.com",
+            "password": "secret123",
+            "first_name": "New",
+            "last_name": "User",
+        })
+        assert response.status_code == 201
+
+        response = client.post("/api/auth/login", data={"username": "new@example.com", "password": "secret123"})
+        assert response.status_code == 200
+        assert "access_token" in response.json()
+
+        response = client.post("/api/auth/login", data={"username": "new@example.com", "password": "wrong"})
+        assert response.status_code == 401
+
+    def test_login_returns_503_when_pool_is_full(self, client, test_user, monkeypatch):
+        from app.hashing_pool import hashing_pool
+
+        def reject(*args):
+            raise HashingPoolFull()
+
+        monkeypatch.setattr(hashing_pool, "submit", reject)
+        response = client.post("/api/auth/login", data={"username": test_user.email, "password": "testpassword"})
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    def test_stats_endpoint_is_admin_only(self, client, auth_headers, admin_headers):
+        assert client.get("/api/auth/hashing-pool/stats", headers=auth_headers).status_code == 403
+        stats = client.get("/api/auth/hashing-pool/stats", headers=admin_headers).json()
+        assert stats["workers"] >= 1
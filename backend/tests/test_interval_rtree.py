@@ -0,0 +1,163 @@
+"""
+Tests for the SQLite R*Tree over reservation intervals
+"""
+from datetime import date, datetime
+import pytest
+from sqlalchemy import text
+from app import interval_rtree
+from app.availability import load_day_intervals
+from app.config import settings
+from app.interval_rtree import (
+    RTREE_TABLE,
+    check_interval_rtree,
+    court_key,
+    drop_interval_rtree,
+    from_minute,
+    install_interval_rtree,
+    main,
+    rebuild_interval_rtree,
+    to_minute
+)
+from tests.conftest import engine
+
+
+@pytest.fixture
+def rtree(monkeypatch, db_session):
+    """R*Tree enabled and installed on the test database"""
+    monkeypatch.setattr(settings, "RESERVATION_RTREE_ENABLED", True)
+    with engine.begin() as connection:
+        install_interval_rtree(connection)
+    yield
+    with engine.begin() as connection:
+        drop_interval_rtree(connection)
+
+
+def rtree_rows(db_session):
+    return db_session.execute(text(f"SELECT reservation_id, status FROM {RTREE_TABLE}")).all()
+
+
+def booking(court_id, hour=14, day="2030-03-04"):
+    return {
+        "court_id": court_id,
+        "date": f"{day}T00:00:00",
+        "start_time": f"{day}T{hour}:00:00",
+        "end_time": f"{day}T{hour + 1}:00:00",
+    }
+
+
+class TestCoordinates:
+    """Test the integer coordinates stored in the R*Tree"""
+
+    def test_minutes_round_trip(self):
+        value = datetime(2030, 3, 4, 14, 30)
+        assert from_minute(to_minute(value)) == value
+
+    def test_end_rounds_up(self):
+        value = datetime(2030, 3, 4, 14, 30, 5)
+        assert to_minute(value, round_up=True) == to_minute(value) + 1
+
+    def test_court_key_fits_int32(self):
+        assert 0 <= court_key("court-123") < 2 ** 31
+        assert court_key("court-123") == court_key("court-123")
+
+
+class TestMaintenance:
+    """Test the R*Tree follows every write"""
+
+    def test_install_fills_existing_reservations(self, db_session, test_reservation, rtree):
+        assert rtree_rows(db_session) == [(test_reservation.id, "CONFIRMED")]
+
+    def test_install_is_idempotent(self, rtree):
+        with engine.begin() as connection:
+            assert install_interval_rtree(connection) is False
+
+    def test_booking_and_cancel(self, client, rtree, db_session, test_court, auth_headers):
+        created = client.post("/api/reservations", json=booking(test_court.id), headers=auth_headers).json()
+        assert rtree_rows(db_session) == [(created["id"], "CONFIRMED")]
+
+        client.delete(f"/api/reservations/{created['id']}", headers=auth_headers)
+        assert rtree_rows(db_session) == []
+
+    def test_batch_bookings(self, client, rtree, db_session, test_court, auth_headers):
+        items = [booking(test_court.id, hour) for hour in (12, 13, 14)]
+        client.post("/api/reservations/batch", json={"items": items}, headers=auth_headers)
+        assert len(rtree_rows(db_session)) == 3
+
+    def test_court_delete_removes_its_intervals(self, client, rtree, db_session, test_reservation, admin_headers):
+        assert client.delete(f"/api/courts/{test_reservation.court_id}", headers=admin_headers).status_code == 204
+        assert rtree_rows(db_session) == []
+
+    def test_rebuild(self, db_session, test_reservation, rtree):
+        db_session.execute(text(f"DELETE FROM {RTREE_TABLE}"))
+        db_session.commit()
+        with engine.begin() as connection:
+            rebuild_interval_rtree(connection)
+        assert len(rtree_rows(db_session)) == 1
+
+
+class TestDeployment:
+    """Test the R*Tree is installed by a command, never at startup"""
+
+    def test_startup_requires_the_table(self, monkeypatch):
+        monkeypatch.setattr(settings, "RESERVATION_RTREE_ENABLED", True)
+        with pytest.raises(RuntimeError, match="python -m app.interval_rtree install"):
+            check_interval_rtree(engine)
+        with engine.connect() as connection:
+            assert not interval_rtree.interval_rtree_installed(connection)
+
+    def test_startup_check_is_off_when_disabled(self):
+        check_interval_rtree(engine)
+
+    def test_command(self, monkeypatch, db_session, test_reservation, capsys):
+        monkeypatch.setattr(settings, "RESERVATION_RTREE_ENABLED", True)
+        main(["install"], engine=engine)
+        check_interval_rtree(engine)
+        assert rtree_rows(db_session) == [(test_reservation.id, "CONFIRMED")]
+
+        main(["drop"], engine=engine)
+        with engine.connect() as connection:
+            assert not interval_rtree.interval_rtree_installed(connection)
+        assert capsys.readouterr().out.splitlines() == [
+            f"{RTREE_TABLE} created", f"{RTREE_TABLE} dropped"
+        ]
+
+
+class TestQueries:
+    """Test the overlap check and day occupancy served from the R*Tree"""
+
+    def test_overlap_rejected(self, client, rtree, test_court, auth_headers):
+        assert client.post("/api/reservations", json=booking(test_court.id), headers=auth_headers).status_code == 201
+        response = client.post("/api/reservations", json=booking(test_court.id), headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "This time slot is already reserved"
+
+    def test_adjacent_slots_do_not_overlap(self, db_session, test_reservation, rtree):
+        court_id = test_reservation.court_id
+        assert interval_rtree.has_overlap(
+            db_session, court_id, datetime(2025, 12, 1, 14, 30), datetime(2025, 12, 1, 15, 30)
+        )
+        assert not interval_rtree.has_overlap(
+            db_session, court_id, datetime(2025, 12, 1, 15), datetime(2025, 12, 1, 16)
+        )
+        assert not interval_rtree.has_overlap(
+            db_session, "other-court", datetime(2025, 12, 1, 14), datetime(2025, 12, 1, 15)
+        )
+
+    def test_day_intervals_match_the_sql_path(self, monkeypatch, db_session, test_reservation, rtree):
+        day = date(2025, 12, 1)
+        from_rtree = load_day_intervals(db_session, test_reservation.court_id, day)
+        monkeypatch.setattr(settings, "RESERVATION_RTREE_ENABLED", False)
+        assert from_rtree == [tuple(row) for row in load_day_intervals(db_session, test_reservation.court_id, day)]
+
+    def test_available_slots(self, client, rtree, test_reservation):
+        response = client.get(f"/api/courts/{test_reservation.court_id}/available-slots?date=2025-12-01")
+        slots = response.json()["available_slots"]
+        assert response.json()["reserved_count"] == 1
+        assert "14:00" not in [slot["start"] for slot in slots]
+
+    def test_query_uses_the_rtree(self, db_session, rtree):
+        plan = db_session.execute(
+            text("EXPLAIN QUERY PLAN " + interval_rtree._OVERLAPPING.text),
+            {"key": 1, "start": 0, "end": 60, "court_id": "court"}
+        ).all()
+        assert "VIRTUAL TABLE INDEX" in " ".join(row[-1] for row in plan)
@@ -0,0 +1,122 @@
+"""
+Tests for the Prometheus metrics
+"""
+from threading import Thread
+from sqlalchemy import create_engine
+from app.config import settings
+from app.database import TimedQueuePool, engine_options
+from app.metrics import (
+    Counter,
+    Histogram,
+    Registry,
+    db_pool_checkout_wait_seconds,
+    http_requests_total
+)
+
+
+def metric_lines(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return response.text.splitlines()
+
+
+class TestPrimitives:
+    """Test the per-thread counters and histograms"""
+
+    def test_counter_sums_threads(self):
+        counter = Counter("test_total", "Test", ("kind",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc("a")
+
+        threads = [Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc("b", amount=2)
+        assert counter.value("a") == 4000
+        assert list(counter.collect()) == [
+            ("test_total", [("kind", "a")], 4000), ("test_total", [("kind", "b")], 2)
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("test_seconds", "Test", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        samples = {(name, dict(labels).get("le")): value for name, labels, value in histogram.collect()}
+        assert samples[("test_seconds_bucket", "0.1")] == 2
+        assert samples[("test_seconds_bucket", "1.0")] == 3
+        assert samples[("test_seconds_bucket", "+Inf")] == 4
+        assert samples[("test_seconds_count", None)] == 4
+        assert samples[("test_seconds_sum", None)] == 3.65
+
+    def test_text_format(self):
+        registry = Registry()
+        registry.register(Counter("test_total", "Requests \\ by route", ("route",))).inc('/a"b')
+        assert registry.render().splitlines() == [
+            "# HELP test_total Requests \\\\ by route",
+            "# TYPE test_total counter",
+            'test_total{route="/a\\"b"} 1.0',
+        ]
+
+
+class TestMetricsEndpoint:
+    """Test /metrics after some traffic"""
+
+    def test_routes_are_labelled_by_template(self, client, test_court):
+        before = http_requests_total.value("GET", "/api/courts/{court_id}/available-slots", "200")
+        client.get(f"/api/courts/{test_court.id}/available-slots?date=2030-03-04")
+        after = http_requests_total.value("GET", "/api/courts/{court_id}/available-slots", "200")
+        assert after == before + 1
+
+        lines = metric_lines(client)
+        assert any(
+            line.startswith('http_request_duration_seconds_bucket{method="GET",'
+                            'route="/api/courts/{court_id}/available-slots",le="+Inf"}')
+            for line in lines
+        )
+
+    def test_unmatched_and_failed_requests(self, client):
+        client.get("/no-such-page")
+        lines = metric_lines(client)
+        assert any(line.startswith('http_requests_total{method="GET",route="unmatched",status="404"}')
+                   for line in lines)
+
+    def test_in_flight_includes_the_scrape(self, client):
+        assert "http_requests_in_flight 1.0" in metric_lines(client)
+
+    def test_component_readings(self, client, test_court):
+        client.get(f"/api/courts/{test_court.id}/available-slots?date=2030-03-04")
+        client.get(f"/api/courts/{test_court.id}/available-slots?date=2030-03-04")
+        lines = metric_lines(client)
+        assert 'cache_lookups_total{cache="availability",result="hit"} 1.0' in lines
+        assert 'cache_hit_ratio{cache="availability"} 0.5' in lines
+        assert 'bcrypt_pool_tasks{state="queue_depth"} 0.0' in lines
+        assert any(line.startswith('db_pool_checked_out{pool="primary"}') for line in lines)
+
+    def test_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+        before = http_requests_total.value("GET", "/health", "200")
+        client.get("/health")
+        assert http_requests_total.value("GET", "/health", "200") == before
+        assert client.get("/metrics").status_code == 404
+
+
+class TestPoolCheckoutWait:
+    """Test pooled engines time their checkouts"""
+
+    def test_checkout_is_observed(self, tmp_path):
+        url = f"sqlite:///{tmp_path}/pool.db"
+        engine = create_engine(url, **engine_options(url))
+        assert isinstance(engine.pool, TimedQueuePool)
+        before = sum(count for name, _, count in db_pool_checkout_wait_seconds.collect()
+                     if name.endswith("_count"))
+        with engine.connect():
+            pass
+        after = sum(count for name, _, count in db_pool_checkout_wait_seconds.collect()
+                    if name.endswith("_count"))
+        engine.dispose()
+        assert after == before + 1
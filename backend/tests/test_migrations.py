@@ -0,0 +1,152 @@
+"""
+Tests for the Alembic migrations and the query plans of the hot queries
+"""
+import os
+import subprocess
+import sys
+from datetime import date, datetime
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from fastapi import Response
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.availability import load_day_intervals
+from app.config import settings
+from app.database import Base
+from app.migrate import BACKEND_DIR, alembic_config, downgrade_database, upgrade_database
+from app.reservation_index import reservation_index
+from app.routes.reservations import has_overlapping_reservation, paginate_reservations
+
+COMPOSITE_INDEXES = {"ix_reservations_court_date_status", "ix_reservations_user_date"}
+
+
+@pytest.fixture
+def migrated_url(tmp_path):
+    """A file database migrated to head"""
+    url = f"sqlite:///{tmp_path}/migrated.db"
+    upgrade_database(url)
+    return url
+
+
+@pytest.fixture
+def migrated_session(migrated_url):
+    engine = create_engine(migrated_url)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def query_plans(session, call):
+    """Run `call` and return the EXPLAIN QUERY PLAN details of each SELECT it issued"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    connection = session.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+    assert statements
+    return [
+        " | ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        for statement, parameters in statements
+    ]
+
+
+class TestMigrations:
+    """Test the migrations build the schema the models describe"""
+
+    def test_upgrade_matches_models(self, migrated_url):
+        engine = create_engine(migrated_url)
+        with engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        engine.dispose()
+        assert diff == []
+
+    def test_composite_indexes(self, migrated_url):
+        engine = create_engine(migrated_url)
+        names = {index["name"] for index in inspect(engine).get_indexes("reservations")}
+        engine.dispose()
+        assert COMPOSITE_INDEXES <= names
+
+    def test_downgrade_to_base(self, migrated_url):
+        downgrade_database(migrated_url)
+        engine = create_engine(migrated_url)
+        assert inspect(engine).get_table_names() == ["alembic_version"]
+        engine.dispose()
+
+    def test_downgrade_drops_only_the_new_indexes(self, migrated_url):
+        downgrade_database(migrated_url, "0004")
+        engine = create_engine(migrated_url)
+        names = {index["name"] for index in inspect(engine).get_indexes("reservations")}
+        engine.dispose()
+        assert "ix_reservations_date" in names
+        assert not COMPOSITE_INDEXES & names
+
+    def test_stamped_pre_migration_database_upgrades(self, tmp_path):
+        # The schema create_all built before migrations, with a booking in it
+        url = f"sqlite:///{tmp_path}/legacy.db"
+        upgrade_database(url, "0001")
+        engine = create_engine(url)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
+            connection.execute(text("INSERT INTO sports (id, name) VALUES ('sport', 'Tennis')"))
+            connection.execute(text(
+                "INSERT INTO courts (id, name, sport_id, location, price_per_hour, capacity) "
+                "VALUES ('court', 'Court', 'sport', 'Here', 10.0, 4)"
+            ))
+
+        command.stamp(alembic_config(url), "0001")
+        upgrade_database(url)
+        inspector = inspect(engine)
+        assert "revoked_tokens" in inspector.get_table_names()
+        assert "series_id" in {column["name"] for column in inspector.get_columns("reservations")}
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT slot_minutes FROM courts")).scalar() == 60
+        engine.dispose()
+
+    def test_importing_the_app_creates_no_tables(self, tmp_path):
+        url = f"sqlite:///{tmp_path}/untouched.db"
+        subprocess.run(
+            [sys.executable, "-c", "import app.main"],
+            cwd=BACKEND_DIR, env={**os.environ, "DATABASE_URL": url}, check=True
+        )
+        engine = create_engine(url)
+        assert inspect(engine).get_table_names() == []
+        engine.dispose()
+
+
+class TestQueryPlans:
+    """Test the hot queries search the composite indexes"""
+
+    @pytest.mark.parametrize("index_enabled", [True, False])
+    def test_overlap_check(self, monkeypatch, migrated_session, index_enabled):
+        monkeypatch.setattr(settings, "RESERVATION_INDEX_ENABLED", index_enabled)
+        reservation_index.clear()
+        day = datetime(2030, 3, 4)
+        plans = query_plans(migrated_session, lambda: has_overlapping_reservation(
+            migrated_session, "court", day, day.replace(hour=14), day.replace(hour=15)
+        ))
+        assert all("USING INDEX ix_reservations_court_date_status" in plan for plan in plans)
+        reservation_index.clear()
+
+    def test_day_intervals(self, migrated_session):
+        plans = query_plans(migrated_session, lambda: load_day_intervals(migrated_session, "court", date(2030, 3, 4)))
+        assert all("USING INDEX ix_reservations_court_date_status" in plan for plan in plans)
+
+    def test_my_reservations_page(self, migrated_session):
+        query = migrated_session.query(models.Reservation).filter(models.Reservation.user_id == "user")
+        plans = query_plans(migrated_session, lambda: paginate_reservations(
+            query, Response(), None, 20, None, None, None
+        ))
+        assert "USING INDEX ix_reservations_user_date" in plans[0]
+        # Rows come out of the index already in (date, id) order
+        assert "TEMP B-TREE" not in plans[0]
@@ -0,0 +1,87 @@
+"""
+Tests for bcrypt work factor calibration and rehash-on-login
+"""
+import pytest
+from app import models
+from app.auth import get_password_hash, verify_password
+from app.password_cost import PasswordCost, calibrate_rounds, hash_rounds, password_cost
+
+
+class TestPasswordCost:
+    """Test calibration and cost parsing"""
+
+    def test_hash_rounds(self):
+        assert hash_rounds("$2b$12$" + "a" * 53) == 12
+        assert hash_rounds("$2b$04$" + "a" * 53) == 4
+        assert hash_rounds("not-a-hash") is None
+
+    def test_calibration_is_clamped(self):
+        assert calibrate_rounds(1e-6, 5, 9) == 5
+        assert calibrate_rounds(1e9, 5, 9) == 9
+
+    def test_calibration_tracks_target(self):
+        low = calibrate_rounds(10, 4, 20)
+        high = calibrate_rounds(1000, 4, 20)
+        # 100x the time budget is roughly 2**6.6 more work
+        assert 5 <= high - low <= 8
+
+    def test_fixed_rounds_skip_calibration(self):
+        cost = PasswordCost(fixed_rounds=5, target_ms=1e9, min_rounds=4, max_rounds=16)
+        assert cost.calibrate() == 5
+
+    def test_calibrates_once(self):
+        cost = PasswordCost(fixed_rounds=0, target_ms=1e-6, min_rounds=6, max_rounds=16)
+        assert cost.calibrate() == 6
+        cost.target_ms = 1e9
+        assert cost.calibrate() == 6
+
+    def test_hash_uses_current_rounds(self, monkeypatch):
+        monkeypatch.setattr(password_cost, "rounds", 5)
+        hashed = get_password_hash("secret")
+        assert hash_rounds(hashed) == 5
+        assert not password_cost.needs_rehash(hashed)
+
+    def test_only_weaker_hashes_need_rehash(self):
+        cost = PasswordCost(fixed_rounds=12, target_ms=250, min_rounds=4, max_rounds=16)
+        assert cost.needs_rehash("$2b$11$" + "a" * 53)
+        assert not cost.needs_rehash("$2b$12$" + "a" * 53)
+        assert not cost.needs_rehash("$2b$14$" + "a" * 53)
+        assert cost.needs_rehash("not-a-hash")
+
+
+class TestRehashOnLogin:
+    """Test transparent hash upgrades"""
+
+    @pytest.fixture
+    def low_cost_user(self, db_session, monkeypatch):
+        monkeypatch.setattr(password_cost, "rounds", 4)
+        user = models.User(
+            id="low-cost-user",
+            email="lowcost@example.com",
+            hashed_password=get_password_hash("secret123"),
+            first_name="Low",
+            last_name="Cost",
+            role=models.UserRole.USER
+        )
+        db_session.add(user)
+        db_session.commit()
+        monkeypatch.setattr(password_cost, "rounds", 5)
+        return user
+
+    def login(self, client, password="secret123"):
+        return client.post("/api/auth/login", data={"username": "lowcost@example.com", "password": password})
+
+    def test_rehashes_on_successful_login(self, client, db_session, low_cost_user):
+        assert self.login(client).status_code == 200
+
+        db_session.refresh(low_cost_user)
+        assert hash_rounds(low_cost_user.hashed_password) == 5
+        assert verify_password("secret123", low_cost_user.hashed_password)
+        assert self.login(client).status_code == 200
+
+    def test_failed_login_keeps_hash(self, client, db_session, low_cost_user):
+        original = low_cost_user.hashed_password
+        assert self.login(client, "wrong").status_code == 401
+
+        db_session.refresh(low_cost_user)
+        assert low_cost_user.hashed_password == original
@@ -0,0 +1,100 @@
+"""
+Unit tests for the verified principal cache
+"""
+import time
+from unittest.mock import MagicMock, Mock
+from datetime import datetime
+from app import models
+from app.auth import create_access_token, get_current_user
+from app.principal_cache import Principal, PrincipalCache
+
+
+def make_principal(user_id="user-1"):
+    return Principal(
+        id=user_id,
+        email=f"{user_id}@example.com",
+        first_name="Test",
+        last_name="User",
+        phone=None,
+        role=models.UserRole.USER,
+        created_at=datetime(2025, 1, 1)
+    )
+
+
+class TestPrincipalCache:
+    """Test TTL, expiry, bounds and invalidation"""
+
+    def test_put_and_get(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+        cache.put("token", make_principal())
+
+        assert cache.get("token").id == "user-1"
+        assert cache.get("other") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_ttl_expiry(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+        cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+        cache.put("token", make_principal())
+
+        clock[0] += 61
+        assert cache.get("token") is None
+
+    def test_token_exp_caps_ttl(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+        cache.put("expired", make_principal(), token_exp=time.time() - 1)
+
+        assert cache.get("expired") is None
+
+    def test_bounded_size(self):
+        cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+        for n in range(3):
+            cache.put(f"token-{n}", make_principal(f"user-{n}"))
+
+        assert cache.get("token-0") is None
+        assert cache.get("token-2").id == "user-2"
+
+    def test_invalidate_user_drops_all_tokens(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+        cache.put("token-a", make_principal())
+        cache.put("token-b", make_principal())
+
+        cache.invalidate_user("user-1")
+
+        assert cache.get("token-a") is None
+        assert cache.get("token-b") is None
+
+    def test_disabled(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=0)
+        cache.put("token", make_principal())
+        assert cache.get("token") is None
+
+
+class TestGetCurrentUserFastPath:
+    """Test get_current_user skips the database for known tokens"""
+
+    def test_second_call_does_not_query(self):
+        token = create_access_token({"sub": "user-1"})
+        mock_db = MagicMock()
+        mock_user = Mock(spec=models.User)
+        for field, value in vars(make_principal()).items():
+            setattr(mock_user, field, value)
+        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+
+        assert get_current_user(token=token, db=mock_db) is mock_user
+        mock_db.query.reset_mock()
+        cached = get_current_user(token=token, db=mock_db)
+
+        assert cached.id == "user-1"
+        assert cached.role == models.UserRole.USER
+        mock_db.query.assert_not_called()
+
+    def test_user_update_invalidates(self, db_session, test_user, auth_token):
+        first = get_current_user(token=auth_token, db=db_session)
+        assert get_current_user(token=auth_token, db=db_session).first_name == first.first_name
+
+        test_user.first_name = "Renamed"
+        db_session.commit()
+
+        assert get_current_user(token=auth_token, db=db_session).first_name == "Renamed"
@@ -0,0 +1,129 @@
+"""
+Tests for on-demand request profiling and the slowest requests list
+"""
+import time
+from threading import Event, Thread
+import pytest
+from app.config import settings
+from app.profiling import (
+    PROFILE_ID_HEADER,
+    RequestProfiles,
+    SlowRequest,
+    StackSampler,
+    request_profiles
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_profiles():
+    request_profiles.clear()
+    yield
+    request_profiles.clear()
+
+
+def spin_for(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def slow_request(duration_ms, at, path="/api/courts"):
+    return SlowRequest(duration_ms=duration_ms, at=at, method="GET", path=path, route=path, status=200)
+
+
+class TestStackSampler:
+    """Test the sampler sees busy threads only"""
+
+    def test_busy_and_idle_threads(self):
+        idle = Event()
+        waiter = Thread(target=idle.wait, args=(5,))
+        waiter.start()
+        sampler = StackSampler(0.001)
+        sampler.start()
+        spin_for(0.05)
+        sampler.stop()
+        idle.set()
+        waiter.join()
+
+        assert sampler.samples > 0
+        assert any(stack.split(";")[-1].startswith("spin_for") for stack in sampler.stacks)
+        assert not any("wait (threading.py" in stack.split(";")[-1] for stack in sampler.stacks)
+
+
+class TestRequestProfiles:
+    """Test the bounded profile store and slowest list"""
+
+    def test_keeps_the_slowest(self):
+        profiles = RequestProfiles(max_profiles=10, slowest=2, window_seconds=60)
+        now = time.time()
+        for duration in (5, 50, 1, 20):
+            profiles.record(slow_request(duration, now))
+        assert [request.duration_ms for request in profiles.slowest()] == [50, 20]
+
+    def test_window_expires_old_requests(self):
+        profiles = RequestProfiles(max_profiles=10, slowest=2, window_seconds=60)
+        now = time.time()
+        profiles.record(slow_request(500, now - 120))
+        profiles.record(slow_request(5, now))
+        assert [request.duration_ms for request in profiles.slowest()] == [5]
+
+
+class TestProfilingMiddleware:
+    """Test profiling a request through the API"""
+
+    def test_admin_profile(self, client, test_court, admin_headers):
+        response = client.get(
+            f"/api/courts/{test_court.id}/available-slots?date=2030-03-04",
+            headers={**admin_headers, "X-Profile": "1"}
+        )
+        assert response.status_code == 200
+        profile_id = response.headers[PROFILE_ID_HEADER]
+
+        report = client.get(f"/api/profiling/profiles/{profile_id}", headers=admin_headers).json()
+        assert report["path"] == f"/api/courts/{test_court.id}/available-slots"
+        assert report["status"] == 200
+        assert report["samples"] >= 0 and isinstance(report["top"], list)
+
+        folded = client.get(f"/api/profiling/profiles/{profile_id}?format=folded", headers=admin_headers)
+        assert folded.headers["content-type"].startswith("text/plain")
+
+    def test_query_flag(self, client, admin_headers):
+        response = client.get("/api/courts?profile=1", headers=admin_headers)
+        assert PROFILE_ID_HEADER in response.headers
+
+    def test_non_admins_are_served_without_profile(self, client, auth_headers):
+        for headers in ({**auth_headers, "X-Profile": "1"}, {"X-Profile": "1"}):
+            response = client.get("/api/courts", headers=headers)
+            assert response.status_code == 200
+            assert PROFILE_ID_HEADER not in response.headers
+        assert PROFILE_ID_HEADER not in client.get("/api/courts?profile=1", headers=auth_headers).headers
+        assert client.get("/api/profiling/slowest", headers=auth_headers).status_code == 403
+
+    def test_unflagged_requests_are_not_profiled(self, client):
+        assert PROFILE_ID_HEADER not in client.get("/api/courts").headers
+        assert PROFILE_ID_HEADER not in client.get("/api/courts?profile=0").headers
+
+    def test_sample_rate(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+        assert PROFILE_ID_HEADER in client.get("/api/courts").headers
+
+    def test_disabled(self, client, monkeypatch, auth_headers):
+        monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+        response = client.get("/api/courts", headers={**auth_headers, "X-Profile": "1"})
+        assert response.status_code == 200
+        assert PROFILE_ID_HEADER not in response.headers
+
+    def test_slowest_list(self, client, test_court, admin_headers):
+        client.get("/api/courts")
+        client.get(f"/api/courts/{test_court.id}/available-slots?date=2030-03-04", headers={
+            **admin_headers, "X-Profile": "1"
+        })
+        slowest = client.get("/api/profiling/slowest", headers=admin_headers).json()
+        assert [request["duration_ms"] for request in slowest] == sorted(
+            (request["duration_ms"] for request in slowest), reverse=True
+        )
+        profiled = [request for request in slowest if request["profile_id"]]
+        assert profiled[0]["route"] == "/api/courts/{court_id}/available-slots"
+
+    def test_unknown_profile(self, client, admin_headers):
+        assert client.get("/api/profiling/profiles/missing", headers=admin_headers).status_code == 404
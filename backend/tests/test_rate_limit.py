@@ -0,0 +1,143 @@
+"""
+Tests for the sliding-window rate limiter
+"""
+from typing import Dict, Tuple
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.rate_limit import InMemoryStore, RateLimiter, RateLimitStore, rate_limiter
+
+
+class FakeSharedStore(RateLimitStore):
+    """Stand-in for a shared backend: plain dict counters, no eviction"""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, int], int] = {}
+
+    def hit(self, key, window_id, cost=1):
+        self.counters[(key, window_id)] = self.counters.get((key, window_id), 0) + cost
+        return self.counters.get((key, window_id - 1), 0), self.counters[(key, window_id)]
+
+    def clear(self):
+        self.counters.clear()
+
+
+class TestSlidingWindow:
+    """Test counting, weighting and Retry-After"""
+
+    @pytest.fixture(params=["memory", "shared"])
+    def limiter(self, request):
+        store = InMemoryStore(max_keys=100) if request.param == "memory" else FakeSharedStore()
+        return RateLimiter(store, window_seconds=60)
+
+    def test_allows_up_to_limit(self, limiter):
+        assert all(limiter.check("k", 3, now=600) is None for _ in range(3))
+        assert limiter.check("k", 3, now=600) is not None
+        assert limiter.check("other", 3, now=600) is None
+
+    def test_previous_window_is_weighted(self, limiter):
+        for _ in range(4):
+            limiter.check("k", 4, now=600)
+        # 3/4 into the next window only a quarter of the previous count remains
+        assert limiter.check("k", 4, now=705) is None
+        assert limiter.check("k", 4, now=705) is None
+        # ...but just after the boundary most of it still counts
+        assert limiter.check("j", 4, now=600) is None
+        for _ in range(3):
+            limiter.check("j", 4, now=630)
+        assert limiter.check("j", 4, now=665) is not None
+
+    def test_retry_after_points_past_the_block(self, limiter):
+        for _ in range(3):
+            limiter.check("k", 3, now=600)
+        wait = limiter.check("k", 3, now=610)
+        assert 1 <= wait <= 120
+        assert limiter.check("k", 3, now=610 + wait + 60) is None
+
+    def test_cost_counts_as_many_requests(self, limiter):
+        assert limiter.check("k", 10, now=600, cost=8) is None
+        assert limiter.check("k", 10, now=600, cost=3) is not None
+        assert limiter.check("other", 10, now=600, cost=11) is not None
+
+    def test_zero_limit_disables(self, limiter):
+        assert all(limiter.check("k", 0, now=600) is None for _ in range(100))
+
+    def test_memory_is_bounded(self):
+        store = InMemoryStore(max_keys=10)
+        limiter = RateLimiter(store, window_seconds=60)
+        for i in range(1000):
+            limiter.check(f"ip-{i}", 5, now=600)
+        assert len(store) == 10
+
+
+def from_ip(ip):
+    """The app as seen from another client address"""
+    async def app_from_ip(scope, receive, send):
+        await app({**scope, "client": (ip, 50000)}, receive, send)
+    return app_from_ip
+
+
+class TestRateLimitedEndpoints:
+    """Test limits on login, register and reservation creation"""
+
+    def login(self, client, email, password="wrong"):
+        return client.post("/api/auth/login", data={"username": email, "password": password})
+
+    def test_login_is_limited_per_account(self, client, test_user, monkeypatch):
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_USER", 2)
+        assert self.login(client, test_user.email).status_code == 401
+        assert self.login(client, test_user.email).status_code == 401
+
+        response = self.login(client, test_user.email, "testpassword")
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+
+        # Other accounts from the same IP are unaffected
+        assert self.login(client, "someone@example.com").status_code == 401
+
+    def test_login_failures_elsewhere_do_not_lock_the_account(self, client, test_user, monkeypatch):
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_USER", 2)
+        attacker = TestClient(from_ip("203.0.113.9"))
+        statuses = [self.login(attacker, test_user.email).status_code for _ in range(3)]
+        assert statuses == [401, 401, 429]
+
+        assert self.login(client, test_user.email, "testpassword").status_code == 200
+
+    def test_login_is_limited_per_ip(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_IP", 3)
+        statuses = [self.login(client, f"user{i}@example.com").status_code for i in range(4)]
+        assert statuses == [401, 401, 401, 429]
+
+    def test_register_is_limited_per_ip(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "REGISTER_RATE_LIMIT_PER_IP", 1)
+        payload = {"email": "a@example.com", "password": "secret123", "first_name": "A", "last_name": "B"}
+        assert client.post("/api/auth/register", json=payload).status_code == 201
+        payload["email"] = "b@example.com"
+        assert client.post("/api/auth/register", json=payload).status_code == 429
+
+    def test_reservations_are_limited_per_user(self, client, auth_headers, monkeypatch):
+        monkeypatch.setattr(settings, "RESERVATION_RATE_LIMIT_PER_USER", 1)
+        payload = {"court_id": "missing", "date": "2030-01-01T00:00:00",
+                   "start_time": "2030-01-01T12:00:00", "end_time": "2030-01-01T13:00:00"}
+        assert client.post("/api/reservations", json=payload, headers=auth_headers).status_code == 404
+        assert client.post("/api/reservations", json=payload, headers=auth_headers).status_code == 429
+        assert rate_limiter.stats()["rejected"] == 1
+
+    def test_batch_items_are_charged_one_by_one(self, client, auth_headers, monkeypatch):
+        monkeypatch.setattr(settings, "RESERVATION_ITEM_RATE_LIMIT_PER_USER", 5)
+        item = {"court_id": "missing", "date": "2030-01-01T00:00:00",
+                "start_time": "2030-01-01T12:00:00", "end_time": "2030-01-01T13:00:00"}
+        batch = client.post("/api/reservations/batch", json={"items": [item] * 4}, headers=auth_headers)
+        assert batch.status_code == 200
+
+        series = {**item, "occurrences": 2}
+        response = client.post("/api/reservations/series", json=series, headers=auth_headers)
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+
+    def test_can_be_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_IP", 1)
+        assert self.login(client, "x@example.com").status_code == 401
+        assert self.login(client, "x@example.com").status_code == 401
@@ -0,0 +1,181 @@
+"""
+Tests for read replica routing and read-your-writes pinning
+"""
+import sqlite3
+from datetime import date
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import database, models
+from app.availability_cache import AvailabilityCache, availability_cache
+from app.database import Base, get_db
+from app.rate_limit import rate_limiter
+from app.read_routing import RecentWriters, recent_writers, replica_lag
+from app.reservation_index import reservation_index
+from app.routes import courts, reservations
+
+
+def sync_replica(primary_file, replica_file):
+    """Copy the primary over the replica, standing in for replication"""
+    source = sqlite3.connect(primary_file)
+    target = sqlite3.connect(replica_file)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+@pytest.fixture
+def primary_file(tmp_path):
+    return tmp_path / "primary.db"
+
+
+@pytest.fixture
+def replica_file(tmp_path):
+    return tmp_path / "replica.db"
+
+
+@pytest.fixture
+def db_session(primary_file):
+    """Primary file database used by the sync fixtures (overrides conftest)"""
+    engine = create_engine(f"sqlite:///{primary_file}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def replica_client(monkeypatch, primary_file, replica_file, db_session):
+    """App whose writes go to the primary file and whose reads go to the replica file"""
+    primary = create_engine(f"sqlite:///{primary_file}", connect_args={"check_same_thread": False})
+    replica = create_engine(f"sqlite:///{replica_file}", connect_args={"check_same_thread": False})
+    PrimarySession = sessionmaker(autocommit=False, autoflush=False, bind=primary)
+    ReplicaSession = sessionmaker(autocommit=False, autoflush=False, bind=replica, info={"replica": True})
+    monkeypatch.setattr(database, "SessionLocal", PrimarySession)
+    monkeypatch.setattr(database, "ReadSessionLocal", ReplicaSession)
+
+    def override_get_db():
+        db = PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(courts.router)
+    app.include_router(reservations.router)
+    app.dependency_overrides[get_db] = override_get_db
+    reservation_index.clear()
+    availability_cache.clear()
+    rate_limiter.clear()
+    with TestClient(app) as client:
+        yield client
+    reservation_index.clear()
+    availability_cache.clear()
+    rate_limiter.clear()
+    primary.dispose()
+    replica.dispose()
+
+
+def booking(court_id):
+    return {
+        "court_id": court_id,
+        "date": "2030-03-04T00:00:00",
+        "start_time": "2030-03-04T14:00:00",
+        "end_time": "2030-03-04T15:00:00",
+    }
+
+
+class TestReplicaReads:
+    """Test GET routes read the replica"""
+
+    def test_reads_see_replica_state(self, replica_client, test_court, primary_file, replica_file):
+        sync_replica(primary_file, replica_file)
+        assert [court["id"] for court in replica_client.get("/api/courts").json()] == [test_court.id]
+
+    def test_unreplicated_rows_are_not_visible(self, replica_client, db_session, test_court, primary_file, replica_file):
+        sync_replica(primary_file, replica_file)
+        db_session.add(models.Court(
+            id="court-late", name="Late", sport_id=test_court.sport_id,
+            location="Test", price_per_hour=10.0, capacity=4
+        ))
+        db_session.commit()
+
+        assert replica_client.get("/api/courts/court-late").status_code == 404
+        sync_replica(primary_file, replica_file)
+        assert replica_client.get("/api/courts/court-late").status_code == 200
+
+
+class TestReadYourWrites:
+    """Test a user who just wrote reads the primary"""
+
+    def test_booker_sees_own_reservation(self, replica_client, test_court, auth_headers, primary_file, replica_file):
+        sync_replica(primary_file, replica_file)
+        created = replica_client.post("/api/reservations", json=booking(test_court.id), headers=auth_headers)
+        assert created.status_code == 201
+
+        mine = replica_client.get("/api/reservations/my-reservations", headers=auth_headers)
+        assert [r["id"] for r in mine.json()] == [created.json()["id"]]
+
+        # Once the pin lapses the stale replica answers
+        recent_writers.clear()
+        mine = replica_client.get("/api/reservations/my-reservations", headers=auth_headers)
+        assert mine.json() == []
+
+    def test_other_users_read_the_replica(self, replica_client, test_court, test_admin, auth_headers, admin_headers,
+                                          primary_file, replica_file):
+        sync_replica(primary_file, replica_file)
+        assert replica_client.post("/api/reservations", json=booking(test_court.id), headers=auth_headers).status_code == 201
+
+        everyone = replica_client.get("/api/reservations/all", headers=admin_headers)
+        assert everyone.json() == []
+
+    def test_reads_alone_do_not_pin(self, replica_client, test_court, auth_headers, primary_file, replica_file):
+        sync_replica(primary_file, replica_file)
+        replica_client.get("/api/reservations/my-reservations", headers=auth_headers)
+        assert len(recent_writers) == 0
+
+
+class TestRecentWriters:
+    """Test pin bookkeeping"""
+
+    def test_pin_expires(self):
+        writers = RecentWriters(window_seconds=0)
+        writers.pin("user-1")
+        assert not writers.is_pinned("user-1")
+
+    def test_pin_lasts_the_window(self):
+        writers = RecentWriters(window_seconds=60)
+        writers.pin("user-1")
+        assert writers.is_pinned("user-1")
+        assert not writers.is_pinned("user-2")
+
+    def test_expired_pins_are_pruned(self):
+        writers = RecentWriters(window_seconds=0)
+        for i in range(100):
+            writers.pin(f"user-{i}")
+        assert len(writers) <= 1
+
+
+class TestReplicaCacheFill:
+    """Test replica reads never cache data older than the last invalidation"""
+
+    def test_replica_lag_of_session(self, db_session):
+        assert replica_lag(db_session) == 0.0
+        db_session.info["replica"] = True
+        assert replica_lag(db_session) > 0
+
+    def test_fill_refused_right_after_invalidation(self):
+        cache = AvailabilityCache(max_entries=10)
+        day = date(2030, 3, 4)
+        cache.invalidate("court-1", day)
+        version = cache.version
+        assert not cache.put("court-1", day, 0, 0b1, version, lag=60)
+        assert cache.put("court-1", day, 0, 0b1, version)
@@ -0,0 +1,133 @@
+"""
+Tests for refresh token rotation and the revocation filter
+"""
+import pytest
+from datetime import datetime, timedelta
+from app import models
+from app.auth import create_refresh_token, decode_token
+from app.revocation import BloomFilter, RevocationList, revocation_list
+
+
+class TestBloomFilter:
+    """Test the probabilistic membership filter"""
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(bits=4096, hashes=5)
+        values = [f"jti-{i}" for i in range(200)]
+        for value in values:
+            bloom.add(value)
+        assert all(value in bloom for value in values)
+
+    def test_few_false_positives(self):
+        bloom = BloomFilter(bits=1 << 16, hashes=7)
+        for i in range(1000):
+            bloom.add(f"revoked-{i}")
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        assert false_positives < 20
+
+
+class TestRefreshTokens:
+    """Test login, refresh rotation and logout"""
+
+    @pytest.fixture
+    def tokens(self, client, test_user):
+        response = client.post("/api/auth/login", data={"username": test_user.email, "password": "testpassword"})
+        assert response.status_code == 200
+        return response.json()
+
+    def refresh(self, client, refresh_token):
+        return client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+    def test_login_returns_refresh_token(self, tokens):
+        assert tokens["refresh_token"]
+        assert tokens["access_token"] != tokens["refresh_token"]
+
+    def test_refresh_rotates_tokens(self, client, tokens):
+        response = self.refresh(client, tokens["refresh_token"])
+        assert response.status_code == 200
+        rotated = response.json()
+        assert rotated["refresh_token"] != tokens["refresh_token"]
+
+        headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+        # A spent refresh token cannot be used again
+        assert self.refresh(client, tokens["refresh_token"]).status_code == 401
+        assert self.refresh(client, rotated["refresh_token"]).status_code == 200
+
+    def test_refresh_token_is_not_an_access_token(self, client, tokens):
+        headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+    def test_access_token_is_not_a_refresh_token(self, client, tokens):
+        assert self.refresh(client, tokens["access_token"]).status_code == 401
+        assert self.refresh(client, "garbage").status_code == 401
+
+    def test_refresh_for_deleted_user(self, client):
+        assert self.refresh(client, create_refresh_token("missing-user")).status_code == 401
+
+    def test_logout_revokes_both_tokens(self, client, tokens):
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+        response = client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+        assert response.status_code == 204
+
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+        assert self.refresh(client, tokens["refresh_token"]).status_code == 401
+
+    def test_unrevoked_tokens_skip_the_database(self, client, auth_headers):
+        for _ in range(3):
+            client.get("/api/auth/me", headers=auth_headers)
+        stats = revocation_list.stats()
+        assert stats["screened"] == 3
+        assert stats["exact_checks"] == 0
+
+    def test_filter_survives_restart(self, client, db_session, tokens):
+        client.post(
+            "/api/auth/logout",
+            json={"refresh_token": tokens["refresh_token"]},
+            headers={"Authorization": f"Bearer {tokens['access_token']}"}
+        )
+        revocation_list.clear()
+        assert revocation_list.load(db_session) == 2
+        assert self.refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+class TestRevocationSync:
+    """Test revocations made by other workers reach this one"""
+
+    def revoke_elsewhere(self, db_session, token, revoked_at=None):
+        """Insert a revocation the way another worker's logout would, bypassing this filter"""
+        payload = decode_token(token)
+        db_session.add(models.RevokedToken(
+            jti=payload["jti"],
+            user_id=payload["sub"],
+            expires_at=datetime.utcnow() + timedelta(hours=1),
+            revoked_at=revoked_at or datetime.utcnow()
+        ))
+        db_session.commit()
+
+    def test_sync_pulls_new_revocations(self, db_session, auth_token):
+        revocations = RevocationList(bits=4096, hashes=5)
+        assert revocations.load(db_session) == 0
+        jti = decode_token(auth_token)["jti"]
+        self.revoke_elsewhere(db_session, auth_token)
+
+        assert revocations.sync(db_session) == 1
+        assert revocations.is_revoked(db_session, jti)
+
+    def test_sync_skips_old_revocations(self, db_session, auth_token):
+        revocations = RevocationList(bits=4096, hashes=5)
+        self.revoke_elsewhere(db_session, auth_token, revoked_at=datetime.utcnow() - timedelta(hours=1))
+        revocations.load(db_session)
+
+        assert revocations.sync(db_session) == 0
+
+    def test_cached_principal_is_rechecked(self, client, db_session, auth_token, auth_headers, monkeypatch):
+        monkeypatch.setattr(revocation_list, "sync_seconds", 0)
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+        self.revoke_elsewhere(db_session, auth_token)
+
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 401
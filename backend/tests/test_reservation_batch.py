@@ -0,0 +1,70 @@
+"""
+Integration tests for batch reservation creation
+"""
+from datetime import datetime
+from app import models
+
+
+def slot(court_id, day, start_hour, end_hour):
+    return {
+        "court_id": court_id,
+        "date": f"{day}T00:00:00",
+        "start_time": f"{day}T{start_hour:02d}:00:00",
+        "end_time": f"{day}T{end_hour:02d}:00:00",
+    }
+
+
+class TestReservationBatch:
+    """Test POST /api/reservations/batch"""
+
+    def test_batch_reports_per_item_outcome(self, client, auth_headers, test_court, test_reservation):
+        items = [
+            slot(test_court.id, "2025-12-01", 12, 13),
+            slot(test_court.id, "2025-12-01", 14, 15),   # clashes with test_reservation
+            slot(test_court.id, "2025-12-01", 12, 13),   # clashes with item 0
+            slot("missing-court", "2025-12-01", 12, 13),
+            slot(test_court.id, "2025-12-02", 15, 14),   # ends before it starts
+            slot(test_court.id, "2025-12-02", 12, 14),
+        ]
+
+        response = client.post("/api/reservations/batch", json={"items": items}, headers=auth_headers)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["created"] == 2
+        assert body["failed"] == 4
+        assert [r["status"] for r in body["results"]] == [
+            "CREATED", "CONFLICT", "CONFLICT", "COURT_NOT_FOUND", "INVALID", "CREATED"
+        ]
+        assert body["results"][5]["reservation"]["total_price"] == 200.0
+
+    def test_batch_bookings_visible_to_single_create(self, client, auth_headers, test_court):
+        items = [slot(test_court.id, "2025-12-03", hour, hour + 1) for hour in range(12, 16)]
+        response = client.post("/api/reservations/batch", json={"items": items}, headers=auth_headers)
+        assert response.json()["created"] == 4
+
+        single = client.post("/api/reservations", json=slot(test_court.id, "2025-12-03", 13, 14),
+                             headers=auth_headers)
+        assert single.status_code == 400
+
+    def test_batch_sees_overlapping_stored_bookings(
+        self, client, auth_headers, db_session, test_user, test_court
+    ):
+        """Test a slot inside the tail of a long booking, with a shorter one stored in between"""
+        for reservation_id, start_hour, end_hour in (("long", 12, 16), ("short", 13, 14)):
+            db_session.add(models.Reservation(
+                id=reservation_id, user_id=test_user.id, court_id=test_court.id,
+                date=datetime(2025, 12, 4), start_time=datetime(2025, 12, 4, start_hour),
+                end_time=datetime(2025, 12, 4, end_hour), total_price=10.0,
+                status=models.ReservationStatus.CONFIRMED
+            ))
+        db_session.commit()
+
+        item = slot(test_court.id, "2025-12-04", 15, 16)
+        response = client.post("/api/reservations/batch", json={"items": [item]}, headers=auth_headers)
+        assert response.json()["results"][0]["status"] == "CONFLICT"
+        assert client.post("/api/reservations", json=item, headers=auth_headers).status_code == 400
+
+    def test_batch_rejects_empty_list(self, client, auth_headers):
+        response = client.post("/api/reservations/batch", json={"items": []}, headers=auth_headers)
+        assert response.status_code == 422
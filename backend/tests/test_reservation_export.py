@@ -0,0 +1,96 @@
+"""
+Tests for the streaming reservation export
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from app import export, models
+from app.export import EXPORT_COLUMNS, iter_csv, iter_ndjson
+
+
+def make_row(n):
+    row = {column: None for column in EXPORT_COLUMNS}
+    row.update({
+        "id": f"res-{n}",
+        "date": datetime(2025, 12, 1),
+        "status": models.ReservationStatus.CONFIRMED,
+        "total_price": 100.0,
+    })
+    return row
+
+
+class TestExportSerializers:
+    """Test NDJSON and CSV chunking"""
+
+    def test_ndjson_one_object_per_line(self):
+        lines = "".join(iter_ndjson(make_row(n) for n in range(3))).splitlines()
+
+        assert len(lines) == 3
+        first = json.loads(lines[0])
+        assert first["id"] == "res-0"
+        assert first["date"] == "2025-12-01T00:00:00"
+        assert first["status"] == "CONFIRMED"
+
+    def test_csv_header_and_rows(self):
+        text = "".join(iter_csv(make_row(n) for n in range(3)))
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+        assert list(rows[0].keys()) == EXPORT_COLUMNS
+        assert [r["id"] for r in rows] == ["res-0", "res-1", "res-2"]
+
+    def test_output_is_chunked(self, monkeypatch):
+        monkeypatch.setattr(export, "CHUNK_ROWS", 2)
+
+        assert len(list(iter_ndjson(make_row(n) for n in range(5)))) == 3
+        assert len(list(iter_csv(make_row(n) for n in range(5)))) == 3
+
+    def test_csv_neutralizes_formulas(self):
+        row = make_row(0)
+        row.update(notes="=HYPERLINK(\"http://x\")", user_first_name="@SUM(A1)",
+                   user_last_name="-2+3", court_name="Court 1")
+        parsed = next(csv.DictReader(io.StringIO("".join(iter_csv([row])))))
+
+        assert parsed["notes"] == "'=HYPERLINK(\"http://x\")"
+        assert parsed["user_first_name"] == "'@SUM(A1)"
+        assert parsed["user_last_name"] == "'-2+3"
+        assert parsed["court_name"] == "Court 1"
+        assert parsed["total_price"] == "100.0"
+
+    def test_ndjson_keeps_values_verbatim(self):
+        row = make_row(0)
+        row["notes"] = "=1+1"
+        assert json.loads("".join(iter_ndjson([row])))["notes"] == "=1+1"
+
+    def test_csv_empty_export_has_header(self):
+        assert "".join(iter_csv([])).strip() == ",".join(EXPORT_COLUMNS)
+
+
+class TestExportEndpoint:
+    """Test GET /api/reservations/export"""
+
+    def test_ndjson_export(self, client, admin_headers, test_reservation):
+        response = client.get("/api/reservations/export", headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 1
+        assert rows[0]["court_name"] == "Court 1"
+        assert rows[0]["sport_name"] == "Football"
+        assert rows[0]["user_email"] == "test@example.com"
+
+    def test_csv_export_with_status_filter(self, client, admin_headers, test_reservation):
+        response = client.get(
+            "/api/reservations/export",
+            params={"format": "csv", "status": "CANCELLED"},
+            headers=admin_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert list(csv.DictReader(io.StringIO(response.text))) == []
+
+    def test_export_requires_admin(self, client, auth_headers):
+        response = client.get("/api/reservations/export", headers=auth_headers)
+        assert response.status_code == 403
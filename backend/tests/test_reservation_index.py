@@ -0,0 +1,221 @@
+"""
+Unit tests for the in-memory reservation interval index
+"""
+import pytest
+from unittest.mock import Mock
+from datetime import datetime, date, timedelta
+from app import models
+from app.config import settings
+from app.reservation_index import IntervalBucket, ReservationIndex
+from app.routes.reservations import has_overlapping_reservation
+from tests.conftest import TestingSessionLocal
+
+
+def make_reservation(reservation_id, start_hour, end_hour, court_id="court-123",
+                     status=models.ReservationStatus.CONFIRMED):
+    reservation = Mock(spec=models.Reservation)
+    reservation.id = reservation_id
+    reservation.court_id = court_id
+    reservation.date = datetime(2025, 12, 1)
+    reservation.start_time = datetime(2025, 12, 1, start_hour, 0)
+    reservation.end_time = datetime(2025, 12, 1, end_hour, 0)
+    reservation.status = status
+    return reservation
+
+
+def check(index, start_hour, end_hour, court_id="court-123", start_minute=0, end_minute=0):
+    return index.has_overlap(
+        Mock(),
+        court_id,
+        datetime(2025, 12, 1),
+        datetime(2025, 12, 1, start_hour, start_minute),
+        datetime(2025, 12, 1, end_hour, end_minute)
+    )
+
+
+class TestReservationIndex:
+    """Test overlap answers from loaded buckets"""
+
+    @pytest.fixture
+    def index(self):
+        index = ReservationIndex()
+        index.load([
+            make_reservation("r1", 14, 15),
+            make_reservation("r2", 17, 19),
+            make_reservation("r3", 12, 13, status=models.ReservationStatus.CANCELLED),
+        ])
+        return index
+
+    def test_load_skips_cancelled(self, index):
+        """Test cancelled reservations are not indexed"""
+        assert index.is_loaded("court-123", date(2025, 12, 1))
+        assert check(index, 12, 13) is False
+
+    def test_adjacent_slots_do_not_overlap(self, index):
+        """Test [start, end) semantics for back-to-back bookings"""
+        assert check(index, 13, 14) is False
+        assert check(index, 15, 16) is False
+
+    def test_partial_and_containing_overlaps(self, index):
+        """Test partial overlaps and intervals containing an existing one"""
+        assert check(index, 14, 15, start_minute=30, end_minute=30) is True
+        assert check(index, 16, 20) is True
+        assert check(index, 18, 18, end_minute=30) is True
+
+    def test_overlapping_stored_intervals(self):
+        """Test a short booking inside a long one does not hide the long one's tail"""
+        index = ReservationIndex()
+        index.load([make_reservation("long", 12, 16), make_reservation("short", 13, 14)])
+        assert check(index, 15, 16) is True
+        assert check(index, 16, 17) is False
+
+        index.remove(make_reservation("long", 12, 16))
+        assert check(index, 15, 16) is False
+        assert check(index, 13, 14) is True
+
+    def test_add_and_remove(self, index):
+        """Test write paths keep the bucket in sync"""
+        new = make_reservation("r4", 15, 16)
+        index.add(new)
+        assert check(index, 15, 16) is True
+
+        index.remove(new)
+        assert check(index, 15, 16) is False
+
+    def test_discard_court(self, index):
+        """Test dropping a court forgets its buckets"""
+        index.discard_court("court-123")
+        assert not index.is_loaded("court-123", date(2025, 12, 1))
+
+    def test_timezone_aware_input(self, index):
+        """Test tz-aware datetimes are compared as stored (naive) values"""
+        from datetime import timezone
+        assert index.has_overlap(
+            Mock(),
+            "court-123",
+            datetime(2025, 12, 1),
+            datetime(2025, 12, 1, 14, 30, tzinfo=timezone.utc),
+            datetime(2025, 12, 1, 15, 30, tzinfo=timezone.utc)
+        ) is True
+
+
+class TestReservationIndexFallback:
+    """Test cold buckets are loaded from the database"""
+
+    def test_cold_bucket_loads_from_database(self, db_session, test_reservation):
+        """Test an unknown court/day is filled from the DB once"""
+        upcoming = datetime.combine(date.today() + timedelta(days=7), datetime.min.time())
+        test_reservation.date = upcoming
+        test_reservation.start_time = upcoming.replace(hour=14)
+        test_reservation.end_time = upcoming.replace(hour=15)
+        db_session.commit()
+        index = ReservationIndex()
+        assert not index.is_loaded(test_reservation.court_id, upcoming)
+
+        assert index.has_overlap(
+            db_session,
+            test_reservation.court_id,
+            upcoming,
+            upcoming.replace(hour=14, minute=30),
+            upcoming.replace(hour=15, minute=30)
+        ) is True
+        assert index.is_loaded(test_reservation.court_id, upcoming)
+
+    def test_write_during_cold_load_is_kept(self, monkeypatch):
+        """Test a booking committed while its bucket loads is not lost"""
+        index = ReservationIndex()
+        upcoming = datetime.combine(date.today() + timedelta(days=7), datetime.min.time())
+        booking = make_reservation("r-late", 14, 15)
+        booking.date = upcoming
+        booking.start_time = upcoming.replace(hour=14)
+        booking.end_time = upcoming.replace(hour=15)
+        snapshot_before_commit = IntervalBucket()
+
+        def load_while_another_worker_commits(db, court_id, day):
+            index.add(booking)
+            return snapshot_before_commit
+
+        monkeypatch.setattr(index, "_load_bucket", load_while_another_worker_commits)
+        assert index.has_overlap(
+            Mock(), "court-123", upcoming, upcoming.replace(hour=14), upcoming.replace(hour=16)
+        ) is True
+
+        monkeypatch.setattr(index, "_load_bucket", Mock(side_effect=AssertionError("reloaded")))
+        assert index.has_overlap(
+            Mock(), "court-123", upcoming, upcoming.replace(hour=14, minute=30),
+            upcoming.replace(hour=15)
+        ) is True
+
+    def test_past_days_are_not_kept(self, db_session, test_reservation):
+        """Test buckets of past days are answered from the DB but not cached"""
+        index = ReservationIndex()
+        assert index.has_overlap(
+            db_session,
+            test_reservation.court_id,
+            test_reservation.date,
+            datetime(2025, 12, 1, 14, 30),
+            datetime(2025, 12, 1, 15, 30)
+        ) is True
+        assert not index.is_loaded(test_reservation.court_id, test_reservation.date)
+
+    def test_buckets_are_bounded(self):
+        """Test the least recently used buckets are evicted past max_buckets"""
+        index = ReservationIndex(max_buckets=2)
+        index.load([make_reservation(f"r{i}", 14, 15, court_id=f"court-{i}") for i in range(3)])
+        assert len(index) == 2
+        assert not index.is_loaded("court-0", date(2025, 12, 1))
+        assert index.is_loaded("court-2", date(2025, 12, 1))
+
+    def test_warm_load(self, db_session, test_reservation):
+        """Test warm load indexes reservations from the given day on"""
+        index = ReservationIndex()
+
+        assert index.warm_load(db_session, since=date(2025, 1, 1)) == 1
+        assert index.warm_load(db_session, since=date(2026, 1, 1)) == 0
+
+
+class TestReservationRoutesWithIndex:
+    """Test create/cancel keep the index consistent with the database"""
+
+    @pytest.fixture(autouse=True)
+    def index_enabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "RESERVATION_INDEX_ENABLED", True)
+
+    def test_double_booking_rejected_and_cancel_frees_slot(self, client, auth_headers, test_court):
+        payload = {
+            "court_id": test_court.id,
+            "date": "2025-12-01T00:00:00",
+            "start_time": "2025-12-01T14:00:00",
+            "end_time": "2025-12-01T15:00:00",
+        }
+        first = client.post("/api/reservations", json=payload, headers=auth_headers)
+        assert first.status_code == 201
+
+        second = client.post("/api/reservations", json=payload, headers=auth_headers)
+        assert second.status_code == 400
+
+        cancel = client.delete(f"/api/reservations/{first.json()['id']}", headers=auth_headers)
+        assert cancel.status_code == 200
+
+        again = client.post("/api/reservations", json=payload, headers=auth_headers)
+        assert again.status_code == 201
+
+
+class TestOtherWriters:
+    """Test bookings committed elsewhere are seen by the default overlap check"""
+
+    def test_booking_from_another_session(self, db_session, test_user, test_court):
+        day = datetime(2030, 3, 4)
+        assert not has_overlapping_reservation(db_session, test_court.id, day, day.replace(hour=14), day.replace(hour=15))
+
+        # Another session (as another worker would) commits the slot
+        other = TestingSessionLocal()
+        other.add(models.Reservation(
+            id="elsewhere", user_id=test_user.id, court_id=test_court.id, date=day,
+            start_time=day.replace(hour=14), end_time=day.replace(hour=15), total_price=10.0,
+            status=models.ReservationStatus.CONFIRMED
+        ))
+        other.commit()
+        other.close()
+
+        assert has_overlapping_reservation(db_session, test_court.id, day, day.replace(hour=14), day.replace(hour=15))
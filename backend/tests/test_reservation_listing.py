@@ -0,0 +1,122 @@
+"""
+Tests for paginated reservation listings
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import models
+from app.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from tests.conftest import engine
+
+
+class TestCursorEncoding:
+    """Test cursor round trips"""
+
+    def test_round_trip(self):
+        cursor = encode_cursor(datetime(2025, 12, 1, 0, 0), "reservation-123")
+        assert decode_cursor(cursor) == (datetime(2025, 12, 1, 0, 0), "reservation-123")
+
+    def test_malformed_cursor(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+def seed_reservations(db_session, user_id, sport_id, count, status=models.ReservationStatus.CONFIRMED):
+    """Create `count` reservations, each on its own court"""
+    first_day = datetime(2025, 1, 1)
+    for n in range(count):
+        day = first_day + timedelta(days=n)
+        court_id = f"court-{n:04d}"
+        db_session.add(models.Court(
+            id=court_id,
+            name=f"Court {n}",
+            sport_id=sport_id,
+            location="Test Location",
+            price_per_hour=100.0,
+            capacity=10
+        ))
+        db_session.add(models.Reservation(
+            id=f"res-{n:04d}",
+            user_id=user_id,
+            court_id=court_id,
+            date=day,
+            start_time=day.replace(hour=14),
+            end_time=day.replace(hour=15),
+            total_price=100.0,
+            status=status
+        ))
+    db_session.commit()
+    # Drop cached objects so the listing has to load relationships itself
+    db_session.expunge_all()
+
+
+class TestReservationListing:
+    """Test keyset pagination and filters"""
+
+    def test_pages_cover_everything_once(self, client, db_session, test_user, test_sport, auth_headers):
+        user_id, sport_id = test_user.id, test_sport.id
+        seed_reservations(db_session, user_id, sport_id, 25)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 10}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/reservations/my-reservations", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            seen.extend(r["id"] for r in response.json())
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                break
+
+        assert seen == [f"res-{n:04d}" for n in reversed(range(25))]
+
+    def test_date_and_status_filters(self, client, db_session, test_user, test_sport, admin_headers):
+        user_id, sport_id = test_user.id, test_sport.id
+        seed_reservations(db_session, user_id, sport_id, 10)
+
+        response = client.get(
+            "/api/reservations/all",
+            params={"date_from": "2025-01-03T00:00:00", "date_to": "2025-01-05T00:00:00", "status": "CONFIRMED"},
+            headers=admin_headers
+        )
+        assert [r["id"] for r in response.json()] == ["res-0004", "res-0003", "res-0002"]
+
+        response = client.get("/api/reservations/all", params={"status": "CANCELLED"}, headers=admin_headers)
+        assert response.json() == []
+
+    def test_invalid_cursor(self, client, admin_headers):
+        response = client.get("/api/reservations/all", params={"cursor": "bogus"}, headers=admin_headers)
+        assert response.status_code == 400
+
+    def test_query_count_is_flat(self, client, db_session, test_user, test_sport, test_admin, admin_headers):
+        """Test listing cost does not grow with the number of rows returned"""
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        def queries_for_listing():
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", count)
+            try:
+                response = client.get("/api/reservations/all", params={"limit": 500}, headers=admin_headers)
+            finally:
+                event.remove(engine, "before_cursor_execute", count)
+            assert response.status_code == 200
+            return len(response.json()), len(statements)
+
+        user_id, sport_id = test_user.id, test_sport.id
+        seed_reservations(db_session, user_id, sport_id, 3)
+        queries_for_listing()  # warm the principal cache
+        small_rows, small_queries = queries_for_listing()
+
+        db_session.query(models.Reservation).delete()
+        db_session.query(models.Court).delete()
+        db_session.commit()
+        seed_reservations(db_session, user_id, sport_id, 60)
+        large_rows, large_queries = queries_for_listing()
+
+        assert (small_rows, large_rows) == (3, 60)
+        assert small_queries == large_queries
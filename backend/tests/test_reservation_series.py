@@ -0,0 +1,57 @@
+"""
+Integration tests for weekly recurring reservations
+"""
+
+
+def series(court_id, occurrences, allow_partial=True):
+    # 2025-11-17 is a Monday; the series repeats on Mondays 14:00-15:00
+    return {
+        "court_id": court_id,
+        "date": "2025-11-17T00:00:00",
+        "start_time": "2025-11-17T14:00:00",
+        "end_time": "2025-11-17T15:00:00",
+        "occurrences": occurrences,
+        "allow_partial": allow_partial,
+    }
+
+
+class TestReservationSeries:
+    """Test POST /api/reservations/series"""
+
+    def test_series_books_every_week(self, client, auth_headers, test_court):
+        response = client.post("/api/reservations/series", json=series(test_court.id, 4),
+                               headers=auth_headers)
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["created"] == 4
+        assert body["series_id"] is not None
+        starts = [r["reservation"]["start_time"] for r in body["results"]]
+        assert starts == [
+            "2025-11-17T14:00:00", "2025-11-24T14:00:00",
+            "2025-12-01T14:00:00", "2025-12-08T14:00:00",
+        ]
+        assert all(r["reservation"]["series_id"] == body["series_id"] for r in body["results"])
+
+    def test_series_reports_partial_failure(self, client, auth_headers, test_court, test_reservation):
+        """Test the occurrence on 2025-12-01 clashes with the existing booking"""
+        response = client.post("/api/reservations/series", json=series(test_court.id, 4),
+                               headers=auth_headers)
+
+        body = response.json()
+        assert body["created"] == 3
+        assert body["failed"] == 1
+        assert body["results"][2]["status"] == "CONFLICT"
+
+    def test_series_all_or_nothing(self, client, auth_headers, test_court, test_reservation):
+        response = client.post("/api/reservations/series",
+                               json=series(test_court.id, 4, allow_partial=False),
+                               headers=auth_headers)
+
+        body = response.json()
+        assert body["created"] == 0
+        assert body["series_id"] is None
+        assert [r["status"] for r in body["results"]] == ["SKIPPED", "SKIPPED", "CONFLICT", "SKIPPED"]
+
+        mine = client.get("/api/reservations/my-reservations", headers=auth_headers).json()
+        assert len(mine) == 1
@@ -0,0 +1,93 @@
+"""
+Tests for per-request SQL instrumentation
+"""
+import logging
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from app import models
+from app.config import settings
+from app.sql_instrumentation import SERVER_TIMING_HEADER, instrument_engine, track_queries
+from tests.conftest import engine
+
+
+@pytest.fixture
+def instrumented(monkeypatch):
+    """SQL instrumentation on, with the hooks on the test engine"""
+    monkeypatch.setattr(settings, "SQL_INSTRUMENTATION_ENABLED", True)
+    instrument_engine(engine)
+
+
+def add_reservations(db_session, user, sport, count):
+    start = datetime(2030, 3, 4, 14)
+    for i in range(count):
+        court = models.Court(id=f"court-{i}", name=f"Court {i}", sport_id=sport.id,
+                             location="Here", price_per_hour=10.0, capacity=4)
+        db_session.add(court)
+        db_session.add(models.Reservation(
+            id=f"reservation-{i}", user_id=user.id, court_id=court.id, date=start.replace(hour=0),
+            start_time=start, end_time=start + timedelta(hours=1), total_price=10.0,
+            status=models.ReservationStatus.CONFIRMED
+        ))
+    db_session.commit()
+    db_session.expunge_all()
+
+
+class TestQueryStats:
+    """Test statement counting and N+1 detection"""
+
+    def test_counts_only_while_tracking(self, db_session, instrumented):
+        db_session.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            db_session.execute(text("SELECT 1"))
+            db_session.execute(text("SELECT 2"))
+        db_session.execute(text("SELECT 1"))
+        assert stats.count == 2
+        assert stats.duration_ms >= 0
+
+    def test_lazy_loads_are_repeated_shapes(self, db_session, instrumented, test_user, test_sport):
+        add_reservations(db_session, test_user, test_sport, 5)
+        with track_queries() as stats:
+            for reservation in db_session.query(models.Reservation).all():
+                reservation.court.name
+        (shape, count), = stats.repeated(threshold=5)
+        assert count == 5
+        assert "FROM courts" in shape
+
+    def test_threshold_zero_disables(self, db_session, instrumented):
+        with track_queries() as stats:
+            db_session.execute(text("SELECT 1"))
+        assert stats.repeated(threshold=0) == []
+
+
+class TestMiddleware:
+    """Test the Server-Timing header and the logs"""
+
+    def test_off_by_default(self, client):
+        assert SERVER_TIMING_HEADER not in client.get("/api/courts").headers
+
+    def test_server_timing(self, client, instrumented, test_court):
+        timing = client.get("/api/courts").headers[SERVER_TIMING_HEADER]
+        assert timing.startswith("db;dur=")
+        assert timing.endswith('queries"') and '"0 queries"' not in timing
+
+    def test_slow_queries_logged(self, client, instrumented, monkeypatch, caplog):
+        monkeypatch.setattr(settings, "SLOW_QUERY_MS", 1e-9)
+        with caplog.at_level(logging.WARNING, logger="app.sql_instrumentation"):
+            client.get("/api/courts")
+        assert any(record.message.startswith("Slow query") for record in caplog.records)
+
+    def test_n_plus_one_logged(self, client, instrumented, monkeypatch, caplog, test_court):
+        monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 1)
+        with caplog.at_level(logging.WARNING, logger="app.sql_instrumentation"):
+            client.get("/api/courts")
+        assert any("Possible N+1 in GET /api/courts" in record.message for record in caplog.records)
+
+    def test_no_n_plus_one_on_reservation_listing(
+        self, client, instrumented, db_session, test_user, test_sport, auth_headers, caplog
+    ):
+        add_reservations(db_session, test_user, test_sport, settings.N_PLUS_ONE_THRESHOLD + 1)
+        with caplog.at_level(logging.WARNING, logger="app.sql_instrumentation"):
+            response = client.get("/api/reservations/my-reservations", headers=auth_headers)
+        assert len(response.json()) == settings.N_PLUS_ONE_THRESHOLD + 1
+        assert not [record for record in caplog.records if "N+1" in record.message]
@@ -0,0 +1,236 @@
+"""
+Tests for asymmetric JWT signing, JWKS publishing and key rotation
+"""
+from datetime import datetime, timedelta
+import pytest
+from jose import JWTError
+from app import token_keys
+from app.token_keys import TokenKeySet, generate_private_key_pem, new_kid
+
+
+def claims():
+    return {"sub": "user-1", "exp": datetime.utcnow() + timedelta(minutes=5)}
+
+
+@pytest.fixture(params=["RS256", "ES256"])
+def signer(request):
+    keys = TokenKeySet(request.param)
+    keys.rotate()
+    return keys
+
+
+class TestTokenKeySet:
+    """Test signing, verification and rotation"""
+
+    def test_round_trip(self, signer):
+        token = signer.encode(claims())
+        assert signer.decode(token)["sub"] == "user-1"
+
+    def test_jwks_holds_only_public_keys(self, signer):
+        keys = signer.jwks()["keys"]
+        assert len(keys) == 1
+        assert keys[0]["kid"] == signer.active_kid
+        assert keys[0]["alg"] == signer.algorithm
+        assert "d" not in keys[0]
+
+    def test_verify_only_node(self, signer):
+        verifier = TokenKeySet(signer.algorithm)
+        verifier.load_jwks(signer.jwks())
+        assert verifier.decode(signer.encode(claims()))["sub"] == "user-1"
+        with pytest.raises(RuntimeError):
+            verifier.encode(claims())
+
+    def test_rotation_keeps_old_tokens_valid(self, signer):
+        old_kid = signer.active_kid
+        old_token = signer.encode(claims())
+        new_kid = signer.rotate()
+
+        assert new_kid != old_kid
+        assert signer.decode(old_token)["sub"] == "user-1"
+        assert signer.decode(signer.encode(claims()))["sub"] == "user-1"
+
+        signer.retire(old_kid)
+        with pytest.raises(JWTError):
+            signer.decode(old_token)
+        with pytest.raises(ValueError):
+            signer.retire(new_kid)
+
+    def test_unknown_kid_refetches_jwks_once(self, signer):
+        fetches = []
+
+        def fetch():
+            fetches.append(1)
+            return signer.jwks()
+
+        verifier = TokenKeySet(signer.algorithm, jwks_fetcher=fetch)
+        assert verifier.decode(signer.encode(claims()))["sub"] == "user-1"
+
+        # A newer key shows up on the next fetch, but refetches are throttled
+        signer.rotate()
+        with pytest.raises(JWTError):
+            verifier.decode(signer.encode(claims()))
+        assert len(fetches) == 1
+
+    def test_jwks_fetch_failure_is_a_jwt_error(self, signer):
+        def unreachable():
+            raise OSError("connection refused")
+
+        verifier = TokenKeySet(signer.algorithm, jwks_fetcher=unreachable)
+        with pytest.raises(JWTError):
+            verifier.decode(signer.encode(claims()))
+
+    def test_jwks_fetch_drops_retired_keys(self, signer):
+        old_kid = signer.active_kid
+        old_token = signer.encode(claims())
+        verifier = TokenKeySet(signer.algorithm)
+        verifier.load_jwks(signer.jwks())
+
+        signer.rotate()
+        signer.retire(old_kid)
+        verifier.load_jwks(signer.jwks())
+
+        assert old_kid not in verifier
+        with pytest.raises(JWTError):
+            verifier.decode(old_token)
+        assert verifier.decode(signer.encode(claims()))["sub"] == "user-1"
+
+    def test_rejects_wrong_signer(self, signer):
+        other = TokenKeySet(signer.algorithm)
+        other.add_private_key(signer.active_kid, generate_private_key_pem(signer.algorithm))
+        with pytest.raises(JWTError):
+            signer.decode(other.encode(claims()))
+
+    def test_load_directory_signs_with_newest(self, tmp_path):
+        keys = TokenKeySet("ES256")
+        first = keys.rotate(str(tmp_path))
+        second = keys.rotate(str(tmp_path))
+
+        loaded = TokenKeySet("ES256")
+        loaded.load_directory(str(tmp_path))
+        assert loaded.active_kid == max(first, second)
+        assert keys.decode(loaded.encode(claims()))["sub"] == "user-1"
+
+        pinned = TokenKeySet("ES256")
+        pinned.load_directory(str(tmp_path), active_kid=first)
+        assert pinned.active_kid == first
+
+    def test_kids_sort_by_creation(self):
+        kids = [new_kid() for _ in range(50)]
+        assert sorted(kids) == kids
+
+    def test_load_directory_skips_partial_keys(self, tmp_path):
+        (tmp_path / ".20300101000000-abcd.pem.partial").write_text("-----BEGIN")
+        (tmp_path / "20300101000000-abcd.pem").write_text("not a key")
+        keys = TokenKeySet("ES256")
+        keys.load_directory(str(tmp_path))
+        assert keys.active_kid is None
+
+    def test_hs256_uses_shared_secret(self):
+        keys = TokenKeySet("HS256", secret="s3cret")
+        assert keys.jwks() == {"keys": []}
+        assert TokenKeySet("HS256", secret="s3cret").decode(keys.encode(claims()))["sub"] == "user-1"
+        with pytest.raises(JWTError):
+            TokenKeySet("HS256", secret="other").decode(keys.encode(claims()))
+
+
+class TestSharedKeysDirectory:
+    """Test workers sharing JWT_KEYS_DIR follow each other's rotations"""
+
+    @pytest.fixture
+    def workers(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(token_keys, "KEYS_DIR_RESCAN_SECONDS", 0)
+        TokenKeySet("ES256").rotate(str(tmp_path))
+        pair = []
+        for _ in range(2):
+            keys = TokenKeySet("ES256")
+            keys.load_directory(str(tmp_path))
+            pair.append(keys)
+        return pair
+
+    def test_rotation_reaches_other_workers(self, workers, tmp_path):
+        rotating, other = workers
+        new_kid = rotating.rotate(str(tmp_path))
+
+        assert other.decode(rotating.encode(claims()))["sub"] == "user-1"
+        assert other.active_kid == new_kid
+        assert {key["kid"] for key in other.jwks()["keys"]} == {key["kid"] for key in rotating.jwks()["keys"]}
+
+    def test_retirement_reaches_other_workers(self, workers, tmp_path):
+        rotating, other = workers
+        old_token = other.encode(claims())
+        old_kid = rotating.active_kid
+        rotating.rotate(str(tmp_path))
+
+        rotating.retire(old_kid, str(tmp_path))
+        assert not (tmp_path / f"{old_kid}.pem").exists()
+        with pytest.raises(JWTError):
+            other.decode(old_token)
+
+    def test_rescans_are_throttled(self, workers, tmp_path, monkeypatch):
+        rotating, other = workers
+        monkeypatch.setattr(token_keys, "KEYS_DIR_RESCAN_SECONDS", 60)
+        other.jwks()
+        rotating.rotate(str(tmp_path))
+        with pytest.raises(JWTError):
+            other.decode(rotating.encode(claims()))
+
+    def test_pinned_key_stays_active(self, workers, tmp_path):
+        rotating, _ = workers
+        pinned = TokenKeySet("ES256")
+        pinned.load_directory(str(tmp_path), active_kid=rotating.active_kid)
+        rotating.rotate(str(tmp_path))
+        assert pinned.decode(rotating.encode(claims()))["sub"] == "user-1"
+        assert pinned.active_kid != rotating.active_kid
+
+
+class TestAsymmetricAuth:
+    """Test the API end to end with ES256 tokens"""
+
+    @pytest.fixture
+    def es256(self, monkeypatch):
+        keys = TokenKeySet("ES256")
+        keys.rotate()
+        monkeypatch.setattr("app.auth.token_keys", keys)
+        monkeypatch.setattr("app.routes.auth.token_keys", keys)
+        return keys
+
+    def test_login_and_verify(self, client, test_user, es256):
+        response = client.post("/api/auth/login", data={"username": test_user.email, "password": "testpassword"})
+        token = response.json()["access_token"]
+
+        verifier = TokenKeySet("ES256")
+        verifier.load_jwks(client.get("/api/auth/jwks.json").json())
+        assert verifier.decode(token)["sub"] == test_user.id
+
+        response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+
+    def test_rotate_endpoint(self, client, es256, admin_headers, auth_headers):
+        old_kid = es256.active_kid
+        assert client.post("/api/auth/keys/rotate", headers=auth_headers).status_code == 403
+
+        response = client.post("/api/auth/keys/rotate", headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()["kid"] != old_kid
+        assert len(client.get("/api/auth/jwks.json").json()["keys"]) == 2
+        # Tokens signed before the rotation still work
+        assert client.get("/api/auth/me", headers=admin_headers).status_code == 200
+
+    def test_retire_endpoint(self, client, es256, admin_headers, auth_headers):
+        old_kid = es256.active_kid
+        new_kid = client.post("/api/auth/keys/rotate", headers=admin_headers).json()["kid"]
+        assert client.post(f"/api/auth/keys/{old_kid}/retire", headers=auth_headers).status_code == 403
+        assert client.post(f"/api/auth/keys/{new_kid}/retire", headers=admin_headers).status_code == 400
+        assert client.post("/api/auth/keys/missing/retire", headers=admin_headers).status_code == 404
+
+        assert client.post(f"/api/auth/keys/{old_kid}/retire", headers=admin_headers).status_code == 204
+        assert [key["kid"] for key in client.get("/api/auth/jwks.json").json()["keys"]] == [new_kid]
+        # The admin's token was signed with the retired key
+        assert client.get("/api/auth/me", headers=admin_headers).status_code == 401
+
+    def test_rotate_refused_when_pinned(self, client, es256, admin_headers, monkeypatch):
+        monkeypatch.setattr(es256, "_pinned_kid", es256.active_kid)
+        assert client.post("/api/auth/keys/rotate", headers=admin_headers).status_code == 409
+
+    def test_rotate_needs_asymmetric_keys(self, client, admin_headers):
+        assert client.post("/api/auth/keys/rotate", headers=admin_headers).status_code == 400
@@ -0,0 +1,285 @@
+"""
+Tests for the single-writer group commit queue
+"""
+from threading import Event
+import pytest
+from fastapi import HTTPException
+from app.config import settings
+from app.routes.reservations import (
+    BookingWrite,
+    CancellationWrite,
+    apply_reservation_writes,
+    reservation_writes
+)
+from app.write_queue import WriteQueue, WriteQueueTimeout
+from app import models, schemas
+from tests.conftest import TestingSessionLocal
+
+
+class FakeSession:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def booking(court_id, hour=14):
+    return schemas.ReservationCreate(
+        court_id=court_id,
+        date="2030-03-04T00:00:00",
+        start_time=f"2030-03-04T{hour}:00:00",
+        end_time=f"2030-03-04T{hour + 1}:00:00",
+    )
+
+
+@pytest.fixture
+def queued_writes(monkeypatch):
+    """Route reservation writes through the queue, on the test database"""
+    monkeypatch.setattr(settings, "RESERVATION_WRITE_QUEUE_ENABLED", True)
+    monkeypatch.setattr(reservation_writes, "session_factory", TestingSessionLocal)
+    yield reservation_writes
+    reservation_writes.shutdown()
+
+
+class TestWriteQueue:
+    """Test batching and failure isolation"""
+
+    def test_pending_writes_share_a_batch(self):
+        started, release = Event(), Event()
+        batches = []
+
+        def apply_batch(db, ops):
+            if ops == ["first"]:
+                started.set()
+                release.wait(5)
+            batches.append(list(ops))
+            return [op.upper() for op in ops]
+
+        writes = WriteQueue(apply_batch, FakeSession, max_batch=64)
+        first = writes.submit("first")
+        started.wait(5)
+        rest = [writes.submit(f"op{i}") for i in range(5)]
+        release.set()
+
+        assert first.result(5) == "FIRST"
+        assert [future.result(5) for future in rest] == [f"OP{i}" for i in range(5)]
+        assert batches == [["first"], [f"op{i}" for i in range(5)]]
+        assert writes.stats()["largest_batch"] == 5
+        writes.shutdown()
+
+    def test_max_batch(self):
+        release = Event()
+        sizes = []
+
+        def apply_batch(db, ops):
+            release.wait(5)
+            sizes.append(len(ops))
+            return ops
+
+        writes = WriteQueue(apply_batch, FakeSession, max_batch=2)
+        futures = [writes.submit(i) for i in range(5)]
+        release.set()
+        assert [future.result(5) for future in futures] == list(range(5))
+        assert max(sizes) <= 2
+        writes.shutdown()
+
+    def test_failing_batch_is_retried_one_by_one(self):
+        started, release = Event(), Event()
+
+        def apply_batch(db, ops):
+            started.set()
+            release.wait(5)
+            if "bad" in ops:
+                raise ValueError("bad write")
+            return ops
+
+        writes = WriteQueue(apply_batch, FakeSession, max_batch=64)
+        blocker = writes.submit("blocker")
+        started.wait(5)
+        good, bad = writes.submit("good"), writes.submit("bad")
+        release.set()
+
+        assert blocker.result(5) == "blocker"
+        assert good.result(5) == "good"
+        with pytest.raises(ValueError):
+            bad.result(5)
+        assert writes.stats()["isolated_batches"] == 1
+        writes.shutdown()
+
+    def test_shutdown_applies_queued_writes(self):
+        writes = WriteQueue(lambda db, ops: ops, FakeSession, max_batch=64)
+        futures = [writes.submit(i) for i in range(10)]
+        writes.shutdown()
+        assert all(future.done() for future in futures)
+        # Restarts on next use
+        assert writes.run("again") == "again"
+        writes.shutdown()
+
+
+class TestWriteQueueFailures:
+    """Test every caller gets an answer whatever fails"""
+
+    def test_post_commit_failure_keeps_results(self):
+        applied = []
+
+        def apply_batch(db, ops):
+            applied.append(list(ops))
+            return ops
+
+        def after_commit(ops, outcomes):
+            raise RuntimeError("cache sync failed")
+
+        writes = WriteQueue(apply_batch, FakeSession, max_batch=64, after_commit=after_commit)
+        assert writes.run("booked") == "booked"
+        # Committed writes are never applied a second time
+        assert applied == [["booked"]]
+        assert writes.stats()["isolated_batches"] == 0
+        writes.shutdown()
+
+    def test_commit_failure_is_retried_one_by_one(self):
+        started, release = Event(), Event()
+
+        class FailingCommit(FakeSession):
+            def __init__(self):
+                self.ops = []
+
+            def commit(self):
+                if "bad" in self.ops:
+                    raise ValueError("commit failed")
+
+        def apply_batch(db, ops):
+            started.set()
+            release.wait(5)
+            db.ops = ops
+            return ops
+
+        writes = WriteQueue(apply_batch, FailingCommit, max_batch=64)
+        blocker = writes.submit("blocker")
+        started.wait(5)
+        good, bad = writes.submit("good"), writes.submit("bad")
+        release.set()
+
+        assert blocker.result(5) == "blocker"
+        assert good.result(5) == "good"
+        with pytest.raises(ValueError):
+            bad.result(5)
+        writes.shutdown()
+
+    def test_session_failure_fails_the_write(self):
+        def broken_session():
+            raise ConnectionError("database unavailable")
+
+        writes = WriteQueue(lambda db, ops: ops, broken_session, max_batch=64)
+        with pytest.raises(ConnectionError):
+            writes.run("op")
+        writes.session_factory = FakeSession
+        assert writes.run("op") == "op"
+        writes.shutdown()
+
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_dead_writer_is_replaced(self):
+        def apply_batch(db, ops):
+            if "fatal" in ops:
+                raise SystemExit()
+            return ops
+
+        writes = WriteQueue(apply_batch, FakeSession, max_batch=64)
+        with pytest.raises(SystemExit):
+            writes.run("fatal")
+        assert writes.run("next") == "next"
+        writes.shutdown()
+
+    def test_timeout_drops_queued_write(self):
+        started, release = Event(), Event()
+        applied = []
+
+        def apply_batch(db, ops):
+            started.set()
+            release.wait(5)
+            applied.extend(ops)
+            return ops
+
+        writes = WriteQueue(apply_batch, FakeSession, max_batch=64, timeout_seconds=0.05)
+        blocker = writes.submit("blocker")
+        started.wait(5)
+        with pytest.raises(WriteQueueTimeout):
+            writes.run("late")
+        release.set()
+
+        assert blocker.result(5) == "blocker"
+        writes.shutdown()
+        assert applied == ["blocker"]
+
+
+class TestApplyReservationWrites:
+    """Test conflict checks inside one group-committed batch"""
+
+    def test_same_slot_in_one_batch_books_once(self, db_session, test_user, test_court):
+        outcomes = apply_reservation_writes(db_session, [
+            BookingWrite(booking(test_court.id), test_user.id),
+            BookingWrite(booking(test_court.id), test_user.id),
+            BookingWrite(booking(test_court.id, hour=16), test_user.id),
+        ])
+
+        assert isinstance(outcomes[0], schemas.ReservationResponse)
+        assert isinstance(outcomes[1], HTTPException) and outcomes[1].status_code == 400
+        assert isinstance(outcomes[2], schemas.ReservationResponse)
+        assert db_session.query(models.Reservation).count() == 2
+
+    def test_cancellation_frees_slot_for_batch(self, db_session, test_user, test_reservation):
+        rebook = schemas.ReservationCreate(
+            court_id=test_reservation.court_id,
+            date=test_reservation.date,
+            start_time=test_reservation.start_time,
+            end_time=test_reservation.end_time,
+        )
+        outcomes = apply_reservation_writes(db_session, [
+            BookingWrite(rebook, test_user.id),
+            CancellationWrite(test_reservation.id, test_user.id, is_admin=False),
+        ])
+
+        assert isinstance(outcomes[0], schemas.ReservationResponse)
+        assert outcomes[1].id == test_reservation.id
+        assert outcomes[1].status == models.ReservationStatus.CANCELLED
+
+    def test_cancellation_permissions(self, db_session, test_reservation):
+        outcomes = apply_reservation_writes(db_session, [
+            CancellationWrite(test_reservation.id, "someone-else", is_admin=False),
+            CancellationWrite("missing", "someone-else", is_admin=True),
+        ])
+        assert [outcome.status_code for outcome in outcomes] == [403, 404]
+
+
+class TestQueuedRoutes:
+    """Test the routes when the write queue is enabled"""
+
+    def test_create_and_conflict(self, client, queued_writes, test_court, auth_headers):
+        data = booking(test_court.id).model_dump(mode="json")
+        writes_before = queued_writes.stats()["writes"]
+        created = client.post("/api/reservations", json=data, headers=auth_headers)
+        assert created.status_code == 201
+        assert created.json()["court_id"] == test_court.id
+
+        conflict = client.post("/api/reservations", json=data, headers=auth_headers)
+        assert conflict.status_code == 400
+        assert conflict.json()["detail"] == "This time slot is already reserved"
+        assert queued_writes.stats()["writes"] == writes_before + 2
+
+    def test_unknown_court(self, client, queued_writes, auth_headers):
+        response = client.post("/api/reservations", json=booking("missing").model_dump(mode="json"), headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_cancel(self, client, queued_writes, db_session, test_reservation, auth_headers):
+        response = client.delete(f"/api/reservations/{test_reservation.id}", headers=auth_headers)
+        assert response.status_code == 200
+        # The writer committed through its own session
+        db_session.refresh(test_reservation)
+        assert test_reservation.status == models.ReservationStatus.CANCELLED
+
+    def test_stats_admin_only(self, client, admin_headers, auth_headers):
+        assert client.get("/api/reservations/write-queue/stats", headers=auth_headers).status_code == 403
+        assert client.get("/api/reservations/write-queue/stats", headers=admin_headers).json()["batches"] >= 0
@@ -22,6 +22,33 @@ describe('Auth Service', () => {
     expect(result).toEqual(mockResponse.data);
   });
 
+  it('should store the refresh token on login', async () => {
+    api.post.mockResolvedValue({
+      data: { access_token: 'access-123', refresh_token: 'refresh-456', token_type: 'bearer' },
+    });
+
+    await authService.login('test@example.com', 'password123');
+
+    expect(localStorage.setItem).toHaveBeenCalledWith('refreshToken', 'refresh-456');
+  });
+
+  it('should revoke the refresh token on logout', () => {
+    const stored = { token: 'token-123', refreshToken: 'refresh-456' };
+    localStorage.getItem.mockImplementation((key) => stored[key] ?? null);
+    api.post.mockResolvedValue({});
+
+    authService.logout();
+
+    // The header is passed explicitly: storage is already cleared when the interceptor runs
+    expect(api.post).toHaveBeenCalledWith(
+      '/api/auth/logout',
+      { refresh_token: 'refresh-456' },
+      { headers: { Authorization: 'Bearer token-123' } }
+    );
+    expect(localStorage.removeItem).toHaveBeenCalledWith('token');
+    expect(localStorage.removeItem).toHaveBeenCalledWith('refreshToken');
+  });
+
   it('should logout and clear localStorage', () => {
     localStorage.setItem('token', 'test-token');
     authService.logout();
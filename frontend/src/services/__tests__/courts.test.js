@@ -38,6 +38,22 @@ describe('Courts Service', () => {
     expect(result).toEqual(mockSlots);
   });
 
+  it('should fetch the availability matrix in one request', async () => {
+    const mockMatrix = {
+      dates: ['2025-12-01'],
+      slot_templates: [['12:00 - 13:00']],
+      courts: [{ court_id: 'court-1', templates: [0], occupied: [1] }],
+    };
+    api.get.mockResolvedValue({ data: mockMatrix });
+
+    const result = await courtsService.getAvailabilityMatrix('2025-12-01', '2025-12-07', 'sport-1');
+
+    expect(api.get).toHaveBeenCalledWith('/api/courts/availability', {
+      params: { date_from: '2025-12-01', date_to: '2025-12-07', sport_id: 'sport-1' },
+    });
+    expect(result).toEqual(mockMatrix);
+  });
+
   it('should get court by id', async () => {
     const mockCourt = { id: 'court-1', name: 'Court A' };
     api.get.mockResolvedValue({ data: mockCourt });
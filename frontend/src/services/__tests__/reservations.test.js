@@ -32,6 +32,20 @@ describe('Reservations Service', () => {
     expect(result).toEqual(mockReservations);
   });
 
+  it('should follow the next cursor until the last page', async () => {
+    api.get
+      .mockResolvedValueOnce({ data: [{ id: 'res-1' }], headers: { 'x-next-cursor': 'abc' } })
+      .mockResolvedValueOnce({ data: [{ id: 'res-2' }], headers: {} });
+
+    const result = await reservationsService.getMyReservations();
+
+    expect(result).toEqual([{ id: 'res-1' }, { id: 'res-2' }]);
+    expect(api.get).toHaveBeenCalledTimes(2);
+    expect(api.get).toHaveBeenLastCalledWith('/api/reservations/my-reservations', {
+      params: { limit: 500, cursor: 'abc' },
+    });
+  });
+
   it('should cancel a reservation', async () => {
     const mockResponse = { message: 'Cancelled' };
     api.delete.mockResolvedValue({ data: mockResponse });
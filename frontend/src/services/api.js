@@ -23,12 +23,44 @@ api.interceptors.request.use(
   }
 );
 
-// Handle 401 errors (unauthorized)
+// Concurrent 401s share a single refresh request
+let refreshRequest = null;
+
+const refreshTokens = (refreshToken) => {
+  if (!refreshRequest) {
+    refreshRequest = axios
+      .post(`${API_URL}/api/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        localStorage.setItem('token', response.data.access_token);
+        localStorage.setItem('refreshToken', response.data.refresh_token);
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshRequest = null;
+      });
+  }
+  return refreshRequest;
+};
+
+// Handle 401 errors (unauthorized): refresh once, then give up
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const original = error.config;
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (error.response?.status === 401 && refreshToken && original && !original._retried) {
+      original._retried = true;
+      try {
+        const token = await refreshTokens(refreshToken);
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch {
+        // Fall through to a fresh login
+      }
+    }
     if (error.response?.status === 401) {
       localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
@@ -21,6 +21,9 @@ export const authService = {
     if (response.data.access_token) {
       localStorage.setItem('token', response.data.access_token);
     }
+    if (response.data.refresh_token) {
+      localStorage.setItem('refreshToken', response.data.refresh_token);
+    }
 
     return response.data;
   },
@@ -34,7 +37,22 @@ export const authService = {
   },
 
   logout() {
+    const token = localStorage.getItem('token');
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (refreshToken) {
+      // Best effort: the local session ends even if revocation fails. The
+      // request interceptor runs after storage is cleared below, so the
+      // access token is attached here.
+      Promise.resolve(
+        api.post(
+          '/api/auth/logout',
+          { refresh_token: refreshToken },
+          { headers: token ? { Authorization: `Bearer ${token}` } : {} }
+        )
+      ).catch(() => {});
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
   },
 
@@ -18,6 +18,15 @@ export const courtsService = {
     return response.data;
   },
 
+  async getAvailabilityMatrix(dateFrom, dateTo, sportId) {
+    const params = { date_from: dateFrom, date_to: dateTo };
+    if (sportId) {
+      params.sport_id = sportId;
+    }
+    const response = await api.get('/api/courts/availability', { params });
+    return response.data;
+  },
+
   async createCourt(courtData) {
     const response = await api.post('/api/courts', courtData);
     return response.data;
@@ -1,5 +1,23 @@
 import api from './api';
 
+// Largest page the API serves; listings follow X-Next-Cursor until the last one
+const PAGE_SIZE = 500;
+
+async function getAllPages(url) {
+  const items = [];
+  let cursor = null;
+  do {
+    const params = { limit: PAGE_SIZE };
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    const response = await api.get(url, { params });
+    items.push(...response.data);
+    cursor = response.headers?.['x-next-cursor'];
+  } while (cursor);
+  return items;
+}
+
 export const reservationsService = {
   async createReservation(reservationData) {
     const response = await api.post('/api/reservations', reservationData);
@@ -7,13 +25,11 @@ export const reservationsService = {
   },
 
   async getMyReservations() {
-    const response = await api.get('/api/reservations/my-reservations');
-    return response.data;
+    return getAllPages('/api/reservations/my-reservations');
   },
 
   async getAllReservations() {
-    const response = await api.get('/api/reservations/all');
-    return response.data;
+    return getAllPages('/api/reservations/all');
   },
 
   async getReservationById(id) {